@@ -1,18 +1,31 @@
 '''This module contains the server implmentation of Course Website Merger.'''
 
-from datetime import date
+from datetime import date, timedelta
+import hashlib
+import json
 import secrets
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, render_template, request, redirect, url_for, session, make_response
 from services.exceptions import InvalidCredentials, InvalidUsername
-from services.exceptions import CourseAlreadySelected, NoCourseSelected
+from services.exceptions import CourseAlreadySelected, NoCourseSelected, AssignmentNotFound
+from services.exceptions import InvalidCursor
 from services.database import initialize_user_info, initialize_courses_db
-from services.database import list_courses, list_user_courses
+from services.db_connections import release_db_connections
+from services.scrape_database import initialize_scrape_cache_db, initialize_course_pages_db
+from services.scrape_database import initialize_course_refresh_db
+from services.database import list_courses, list_user_courses, get_course_name, get_course_link
 from services.functions import register_user, login_user
 from services.functions import add_course_to_user, remove_course_from_user
 from services.functions import add_new_course_assignments, remove_course_assignments
 from services.functions import mark_assignment_complete, mark_assignment_incomplete
-from services.constants import ALPHABET
-from services.assignment_data import all_pending_assignments, all_completed_assignments
+from services.functions import mark_assignments_complete, mark_assignments_incomplete
+from services.functions import mark_course_assignments_complete, mark_course_assignments_incomplete
+from services.functions import mark_past_due_assignments_complete, add_refreshed_assignments
+from services.refresher import start_course_refresher
+from services.constants import ALPHABET, COURSE_REFRESHER_ENABLED
+from services.constants import ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED
+from services.constants import ASSIGNMENTS_PAGE_SIZE, API_MAX_PAGE_SIZE, API_MAX_DUE_WITHIN
+from services.assignment_data import assignments_page, decode_cursor, user_view_version
+from services.page_cache import RENDERED_PAGES, ROW_FRAGMENTS
 
 app = Flask(__name__)
 
@@ -20,6 +33,20 @@ app.secret_key = ''.join(secrets.choice(ALPHABET) for _ in range(16))
 
 initialize_user_info(reset=True)
 initialize_courses_db(update=False)
+initialize_scrape_cache_db(reset=False)
+initialize_course_pages_db(reset=False)
+initialize_course_refresh_db(reset=False)
+
+if COURSE_REFRESHER_ENABLED:
+    start_course_refresher()
+
+@app.teardown_appcontext
+def release_connections(exception):
+    '''
+    Returns the database connections checked out while handling a request to the connection
+    pool, so that the next request reuses them no matter which thread handles it.
+    '''
+    release_db_connections()
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -108,6 +135,56 @@ def select_courses():
     }
     return render_template('course-selection.html', context=context)
 
+def render_assignment_row(assignment) -> str:
+    '''
+    Renders the cells of an assignment's row which are the same for every user of its course.
+    '''
+    return render_template('assignment-row.html', assignment=assignment)
+
+def encode_json(data) -> str:
+    '''
+    Returns data encoded as compact JSON.
+    '''
+    return json.dumps(data, separators=(',', ':'))
+
+def json_response(body: str, status: int = 200):
+    '''
+    Returns a response with a body encoded as JSON.
+    '''
+    response = make_response(body, status)
+    response.mimetype = 'application/json'
+    return response
+
+def conditional_response(response, etag: str):
+    '''
+    Sets the ETag of a response and answers with 304 if the client already has the current copy.
+
+    Clients must revalidate their cached copy before using it.
+    '''
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+def json_error(message: str, status: int):
+    '''
+    Returns a JSON response describing an error.
+    '''
+    return json_response(encode_json({'error' : message}), status)
+
+def assignment_json(assignment) -> dict:
+    '''
+    Returns the information of an assignment sent by the assignments API.
+    '''
+    return {
+        'id' : assignment.id,
+        'course' : assignment.course,
+        'type' : assignment.assignment_type,
+        'name' : assignment.name,
+        'due_date' : assignment.due_date,
+        'links' : [{'url' : link, 'label' : link_label}
+                   for link, link_label in assignment.links_info if link is not None]
+    }
+
 @app.route('/assignments', methods=['GET', 'POST'])
 def assignments():
     '''
@@ -125,22 +202,165 @@ def assignments():
         if assignments_view:
             session['assignments-view'] = assignments_view
         assignments_view = session['assignments-view']
-        minimum_assignment_info_str = request.form.get('marked-assignment')
-        if minimum_assignment_info_str:
+        marked_assignment_id = request.form.get('marked-assignment')
+        if marked_assignment_id:
+            try:
+                if assignments_view == 'pending':
+                    mark_assignment_complete(username, marked_assignment_id)
+                else:
+                    mark_assignment_incomplete(username, marked_assignment_id)
+            except AssignmentNotFound:
+                # Assignment was already moved, e.g. by submitting the same form twice
+                pass
+        bulk_action = request.form.get('bulk-action')
+        if bulk_action == 'selected':
+            # User moves all checked assignments
+            selected_assignment_ids = request.form.getlist('selected-assignment')
+            if assignments_view == 'pending':
+                mark_assignments_complete(username, selected_assignment_ids)
+            else:
+                mark_assignments_incomplete(username, selected_assignment_ids)
+        elif bulk_action == 'past-due' and assignments_view == 'pending':
+            # User completes all assignments whose due date has passed
+            mark_past_due_assignments_complete(username, date.today())
+        elif bulk_action == 'course':
+            # User moves all assignments of a course
+            course_code = request.form.get('bulk-course')
             if assignments_view == 'pending':
-                mark_assignment_complete(username, minimum_assignment_info_str)
+                mark_course_assignments_complete(username, course_code)
             else:
-                mark_assignment_incomplete(username, minimum_assignment_info_str)
+                mark_course_assignments_incomplete(username, course_code)
     assignments_view = session['assignments-view']
-    if assignments_view == 'completed':
-        assignments_info = all_completed_assignments(username)
+    status = ASSIGNMENT_COMPLETED if assignments_view == 'completed' else ASSIGNMENT_PENDING
+    cursor = request.args.get('cursor')
+    try:
+        if cursor:
+            decode_cursor(cursor)
+    except InvalidCursor:
+        # Cursor was not handed out by a previous page, so start from the first page
+        cursor = None
+    # Pages are rendered again only after the user's state, the stored assignments or the cached
+    # scrapes of the user's courses or the date changed
+    today = date.today()
+    version = user_view_version(username, today)
+    page_key = (username, assignments_view, cursor)
+    cached_page = RENDERED_PAGES.get(page_key, version)
+    if cached_page:
+        etag, body = cached_page
     else:
-        assignments_info = all_pending_assignments(username)
-    context = {
-        'assignments_info' : assignments_info,
-        'assignments_view' : assignments_view
-    }
-    return render_template('assignments-calendar.html', context=context)
+        add_refreshed_assignments(username, today)
+        # Versions are read before assignments, so rows are never cached under a newer version
+        # than the one they were rendered from
+        version = user_view_version(username, today)
+        course_versions = dict(version[1])
+        assignments_info, next_cursor = assignments_page(username, status, cursor)
+        assignment_rows = [
+            (assignment, ROW_FRAGMENTS.fragment(
+                course_versions.get(assignment.course, 0), assignment, render_assignment_row))
+            for assignment in assignments_info
+        ]
+        context = {
+            'assignment_rows' : assignment_rows,
+            'assignments_view' : assignments_view,
+            'user_courses' : list_user_courses(username),
+            'cursor' : cursor,
+            'next_cursor' : next_cursor
+        }
+        body = render_template('assignments-calendar.html', context=context)
+        etag = RENDERED_PAGES.put(page_key, version, body)
+    return conditional_response(make_response(body), etag)
+
+@app.route('/api/assignments', methods=['GET'])
+def api_assignments():
+    '''
+    Returns one page of the user's pending or completed assignments as JSON.
+
+    Query arguments select the status, the page cursor, the number of assignments on the page and
+    optionally a course, an assignment type and a number of days after today within which
+    assignments are due, where 0 lists the assignments due today. The response holds the cursor
+    of the next page, which is null on the last page. Unchanged pages are answered with 304 when
+    requested with their ETag.
+    '''
+    if 'username' not in session:
+        return json_error('Not logged in.', 401)
+    username = session['username']
+    status = request.args.get('status', ASSIGNMENT_PENDING)
+    if status not in (ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED):
+        return json_error('Status must be pending or completed.', 400)
+    cursor = request.args.get('cursor') or None
+    limit = min(max(request.args.get('limit', ASSIGNMENTS_PAGE_SIZE, type=int), 1),
+                API_MAX_PAGE_SIZE)
+    course_code = request.args.get('course') or None
+    assignment_type = request.args.get('type') or None
+    due_within = request.args.get('due_within', type=int)
+    if due_within is not None and not 0 <= due_within <= API_MAX_DUE_WITHIN:
+        return json_error(f'Due window must be between 0 and {API_MAX_DUE_WITHIN} days.', 400)
+    try:
+        if cursor:
+            decode_cursor(cursor)
+    except InvalidCursor:
+        return json_error('Invalid cursor.', 400)
+    today = date.today()
+    start = end = None
+    if due_within is not None:
+        # Only assignments due from today until the last day of the window are read
+        start, end = today, today + timedelta(days=due_within + 1)
+    # Pages are encoded again only after the user's state, the stored assignments or the cached
+    # scrapes of the user's courses or the date changed
+    version = user_view_version(username, today)
+    page_key = ('api', username, status, cursor, limit, course_code, assignment_type, start, end)
+    cached_page = RENDERED_PAGES.get(page_key, version)
+    if cached_page:
+        etag, body = cached_page
+    else:
+        add_refreshed_assignments(username, today)
+        version = user_view_version(username, today)
+        assignments_info, next_cursor = assignments_page(
+            username, status, cursor, limit, start, end, course_code, assignment_type)
+        body = encode_json({
+            'assignments' : [assignment_json(assignment) for assignment in assignments_info],
+            'next_cursor' : next_cursor
+        })
+        etag = RENDERED_PAGES.put(page_key, version, body)
+    return conditional_response(json_response(body), etag)
+
+@app.route('/api/assignments/<assignment_id>/<new_status>', methods=['POST'])
+def api_mark_assignment(assignment_id: str, new_status: str):
+    '''
+    Moves one of the user's assignments to its completed or pending assignments.
+
+    Returns the id and new status of the assignment, 400 if the new status is neither complete
+    nor incomplete, or 404 if the user has no such assignment with the other status.
+    '''
+    if 'username' not in session:
+        return json_error('Not logged in.', 401)
+    username = session['username']
+    try:
+        if new_status == 'complete':
+            mark_assignment_complete(username, assignment_id)
+            status = ASSIGNMENT_COMPLETED
+        elif new_status == 'incomplete':
+            mark_assignment_incomplete(username, assignment_id)
+            status = ASSIGNMENT_PENDING
+        else:
+            return json_error('Assignments can only be marked complete or incomplete.', 400)
+    except AssignmentNotFound:
+        return json_error('Assignment not found.', 404)
+    return json_response(encode_json({'id' : assignment_id, 'status' : status}))
+
+@app.route('/api/courses', methods=['GET'])
+def api_courses():
+    '''
+    Returns the catalog of courses users can choose as JSON.
+    '''
+    catalog = [
+        {'course_code' : course_code, 'name' : get_course_name(course_code),
+         'link' : get_course_link(course_code)}
+        for course_code in list_courses()
+    ]
+    body = encode_json(catalog)
+    etag = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+    return conditional_response(json_response(body), etag)
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,309 @@
+'''Benchmarks course scrapers on recorded and synthetically enlarged course websites.
+
+Run from the src directory:
+
+    python benchmarks/benchmark_scrapers.py             # print results
+    python benchmarks/benchmark_scrapers.py --save      # overwrite baseline
+    python benchmarks/benchmark_scrapers.py --check     # fail on regressions against baseline
+
+Wall times depend on the machine, so the baseline should be regenerated with --save before
+checking for regressions on a different machine.
+'''
+
+import argparse
+import copy
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.scrapers.engine import SCRAPERS, HTML_PARSER, parse_schedule, extract_assignments
+from services.scrapers.cs61b_scraper import scrape_cs61b
+from services.scrapers.data8_scraper import scrape_data8
+from services.scrapers.eecs16b_scraper import scrape_eecs16b
+from services.assignment_data import TEST_FILES
+
+# directory of recorded course websites and test databases
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests'))
+
+# file containing benchmark results regressions are checked against
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# map containing course and its benchmarked scrape function pairs
+BENCHMARK_FUNCS = {
+    'EECS16B': scrape_eecs16b,
+    'COMPSCI61B': scrape_cs61b,
+    'DATAC8': scrape_data8
+}
+
+# factors by which the number of weeks of recorded course websites is multiplied
+SCALES = [1, 10, 100]
+
+# increase in wall time too small to be told apart from noise
+NOISE_SECONDS = 0.005
+
+# module containing date conversion functions
+DATES_MODULE = os.path.join('services', 'dates.py')
+
+def scale_website(course_code: str, website_text: str, scale: int) -> str:
+    """Returns course website with every schedule row repeated scale times.
+
+    Repeated rows are inserted right after the original row, so that rows stay in date order.
+
+    Args:
+        course_code (str): course code of course
+        website_text (str): html text for course website
+        scale (int): number of copies of each schedule row
+
+    Returns:
+        str: html text for enlarged course website
+    """
+    if scale == 1:
+        return website_text
+    scraper = SCRAPERS[course_code]
+    soup = BeautifulSoup(website_text, 'html.parser')
+    for row in soup.find_all(scraper.row_name, attrs=scraper.row_attrs):
+        for _ in range(scale - 1):
+            row.insert_after(copy.copy(row))
+    return str(soup)
+
+def measure(function, repeat: int) -> dict:
+    """Returns the best wall time and the memory use of calling function after a warm up call.
+
+    Args:
+        function (Callable): function taking no arguments
+        repeat (int): number of timed calls
+
+    Returns:
+        dict: best wall time in seconds, peak bytes allocated during a call, and bytes and
+        number of memory blocks allocated during a call which are still allocated after it
+    """
+    # Warm up caches, such as compiled regular expressions, before timing
+    function()
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        start_snapshot = tracemalloc.take_snapshot()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        result = function()
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        'seconds': seconds,
+        'peak_bytes': peak_bytes - start_bytes,
+        'retained_bytes': current_bytes - start_bytes,
+        'retained_blocks': retained_allocations(snapshot, start_snapshot)[1]
+    }
+
+def retained_allocations(snapshot, start_snapshot, filename_pattern: str = None) -> tuple:
+    """Returns the memory allocated between two tracemalloc snapshots which is still allocated
+    at the second snapshot.
+
+    Memory allocated and freed again in between is not counted.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): snapshot taken after the allocations
+        start_snapshot (tracemalloc.Snapshot): snapshot taken before the allocations
+        filename_pattern (str, optional): only memory allocated by files matching the pattern
+        is counted. Defaults to None.
+
+    Returns:
+        tuple: number of retained bytes and number of retained memory blocks
+    """
+    if filename_pattern is not None:
+        filters = [tracemalloc.Filter(True, filename_pattern)]
+        snapshot = snapshot.filter_traces(filters)
+        start_snapshot = start_snapshot.filter_traces(filters)
+    statistics = snapshot.compare_to(start_snapshot, 'filename')
+    return sum(stat.size_diff for stat in statistics), sum(stat.count_diff for stat in statistics)
+
+def date_conversion_allocations(function) -> dict:
+    """Returns the memory allocated by functions of the dates module while calling function
+    which is still allocated after the call.
+
+    Once date conversions are memoized by an earlier call, converting the same dates again
+    retains nothing, so nonzero values show conversions which are not memoized.
+
+    Args:
+        function (Callable): function taking no arguments
+
+    Returns:
+        dict: retained bytes and number of retained memory blocks allocated by the dates module
+    """
+    tracemalloc.start()
+    try:
+        start_snapshot = tracemalloc.take_snapshot()
+        result = function()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    retained_bytes, retained_blocks = retained_allocations(
+        snapshot, start_snapshot, f'*{DATES_MODULE}')
+    return {'retained_bytes': retained_bytes, 'retained_blocks': retained_blocks}
+
+def date_conversion_fraction(function) -> float:
+    """Returns the fraction of the run time of function spent converting dates.
+
+    Args:
+        function (Callable): function taking no arguments
+
+    Returns:
+        float: fraction of run time spent in functions of the dates module
+    """
+    profile = cProfile.Profile()
+    profile.runcall(function)
+    stats = pstats.Stats(profile).stats
+    total = sum(stat[2] for stat in stats.values())
+    # Only count calls from outside of the dates module so nested calls are counted once
+    date_conversion = sum(
+        stat[3] for (filename, _, _), stat in stats.items()
+        if filename.endswith(DATES_MODULE) and any(
+            not caller[0].endswith(DATES_MODULE) for caller in stat[4]))
+    return date_conversion / total if total else 0.0
+
+def benchmark_course(course_code: str, website_text: str, repeat: int) -> dict:
+    """Returns benchmark results of scraping a course website in total and per stage.
+
+    Args:
+        course_code (str): course code of course
+        website_text (str): html text for course website
+        repeat (int): number of timed calls of every stage
+
+    Returns:
+        dict: benchmark results of whole scrape, parse, extract and date conversion stages
+    """
+    scraper = SCRAPERS[course_code]
+    rows = parse_schedule(scraper, website_text).find_all(scraper.row_name,
+                                                          attrs=scraper.row_attrs)
+    extract = lambda: extract_assignments(scraper, rows, None)
+    results = {
+        'rows': len(rows),
+        'assignments': len(extract().assignment_names),
+        'total': measure(lambda: BENCHMARK_FUNCS[course_code](website_text, None), repeat),
+        'parse': measure(lambda: parse_schedule(scraper, website_text).find_all(
+            scraper.row_name, attrs=scraper.row_attrs), repeat),
+        'extract': measure(extract, repeat)
+    }
+    results['date_conversion'] = {
+        'seconds': results['extract']['seconds'] * date_conversion_fraction(extract),
+        **date_conversion_allocations(extract)
+    }
+    return results
+
+def run_benchmarks(scales: list = None, repeat: int = 3) -> dict:
+    """Returns benchmark results of every course scraper on every scale of its course website.
+
+    Args:
+        scales (list, optional): factors by which the number of weeks is multiplied. Defaults
+        to SCALES.
+        repeat (int, optional): number of timed calls of every stage. Defaults to 3.
+
+    Returns:
+        dict: benchmark environment and map from course code and scale to benchmark results
+    """
+    results = {}
+    for course_code, test_file in TEST_FILES.items():
+        with open(os.path.join(TESTS_DIR, test_file), 'r', encoding='utf-8') as file:
+            website_text = file.read()
+        for scale in scales or SCALES:
+            scaled_text = scale_website(course_code, website_text, scale)
+            results[f'{course_code}/x{scale}'] = benchmark_course(course_code, scaled_text, repeat)
+    return {
+        'python': platform.python_version(),
+        'parser': HTML_PARSER,
+        'results': results
+    }
+
+def find_regressions(benchmarks: dict, baseline: dict, tolerance: float) -> list:
+    """Returns descriptions of every measurement which regressed compared to baseline.
+
+    Args:
+        benchmarks (dict): benchmark results
+        baseline (dict): baseline benchmark results
+        tolerance (float): allowed relative increase of every measurement, wall times may
+        additionally increase by NOISE_SECONDS
+
+    Returns:
+        list: descriptions of regressed measurements
+    """
+    regressions = []
+    for key, results in benchmarks['results'].items():
+        baseline_results = baseline['results'].get(key)
+        if baseline_results is None:
+            continue
+        for stage in ['total', 'parse', 'extract']:
+            for measurement in ['seconds', 'peak_bytes', 'retained_blocks']:
+                value = results[stage][measurement]
+                baseline_value = baseline_results[stage][measurement]
+                noise = NOISE_SECONDS if measurement == 'seconds' else 0
+                if value > baseline_value * (1 + tolerance) + noise:
+                    regressions.append(
+                        f'{key} {stage} {measurement}: {value:.6g} > {baseline_value:.6g}')
+    return regressions
+
+def print_benchmarks(benchmarks: dict) -> None:
+    """Prints benchmark results as a table.
+
+    Args:
+        benchmarks (dict): benchmark results
+    """
+    print(f'python {benchmarks["python"]}, parser {benchmarks["parser"]}')
+    print(f'{"course/scale":<18}{"rows":>7}{"total ms":>11}{"parse ms":>11}{"extract ms":>12}'
+          f'{"dates ms":>10}{"peak KiB":>11}{"kept blocks":>13}')
+    for key, results in benchmarks['results'].items():
+        print(f'{key:<18}{results["rows"]:>7}'
+              f'{results["total"]["seconds"] * 1000:>11.2f}'
+              f'{results["parse"]["seconds"] * 1000:>11.2f}'
+              f'{results["extract"]["seconds"] * 1000:>12.2f}'
+              f'{results["date_conversion"]["seconds"] * 1000:>10.2f}'
+              f'{results["total"]["peak_bytes"] / 1024:>11.0f}'
+              f'{results["total"]["retained_blocks"]:>13}')
+
+def main() -> int:
+    """Runs the benchmarks and saves or checks them against the baseline.
+
+    Returns:
+        int: exit status, nonzero if a regression was found
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', action='store_true', help='overwrite baseline file')
+    parser.add_argument('--check', action='store_true', help='compare against baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    # Course links are looked up in the test databases
+    os.chdir(TESTS_DIR)
+    benchmarks = run_benchmarks(args.scales, args.repeat)
+    print_benchmarks(benchmarks)
+
+    if args.save:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as file:
+            json.dump(benchmarks, file, indent=2, sort_keys=True)
+            file.write('\n')
+    if args.check:
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as file:
+            regressions = find_regressions(benchmarks, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f'regression: {regression}')
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
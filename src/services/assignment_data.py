@@ -1,19 +1,29 @@
 '''Module containing all assignment data handling functions.'''
 
+from concurrent.futures import Future
 from datetime import date
-import requests
+import functools
+import threading
+from services.fetch import fetch_course_page, stream_course_page, map_concurrently, submit_fetch
 from services.database import get_course_link
-from services.database import get_pending_assignments, get_completed_assignments
-from services.scrapers.eecs16b_scraper import scrape_eecs16b
-from services.scrapers.cs61b_scraper import scrape_cs61b
-from services.scrapers.data8_scraper import scrape_data8
-from services.constants import SCRAPE_TIMEOUT
+from services.scrape_database import get_course_page, get_cached_course_assignments
+from services.scrape_database import cache_course_assignments, get_cached_course_scrape_ids
+from services.database import list_user_assignments, list_user_assignments_page
+from services.database import list_user_assignment_courses
+from services.database import get_user_state_version, get_user_course_scrape_versions
+from services.scrapers.engine import SCRAPERS, scrape_course, scrape_course_stream
+# Importing course scraper declarations registers them with the scraping engine
+from services.scrapers import (  # pylint: disable=unused-import
+    eecs16b_scraper, cs61b_scraper, data8_scraper)
+from services.assignments_info import AssignmentsInfo
+from services.exceptions import InvalidCursor
+from services.constants import SCRAPE_STREAMING, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED
+from services.constants import ASSIGNMENTS_PAGE_SIZE
 
 # map containing course and its scrape function pairs
 SCRAPE_FUNCS = {
-    'EECS16B' : scrape_eecs16b,
-    'COMPSCI61B' : scrape_cs61b,
-    'DATAC8' : scrape_data8
+    course_code : functools.partial(scrape_course, scraper)
+    for course_code, scraper in SCRAPERS.items()
 }
 
 # map containing course and its test file pairs
@@ -23,9 +33,141 @@ TEST_FILES = {
     'DATAC8' : 'course_websites/data8_full.txt'
 }
 
+# streamed scrapes of course websites by course code and scope date, kept until the scrape of the
+# whole semester read from the rest of the streamed course website is stored in the scrape cache
+_cold_scrapes = {}
+_cold_scrapes_lock = threading.Lock()
+
+def zip_assignments_info(assignments_info: AssignmentsInfo) -> list:
+    """Returns a list of all assignments in assignments_info without their scope dates.
+
+    Args:
+        assignments_info (AssignmentsInfo): scraped assignment information
+
+    Returns:
+        list: list of Assignment named tuples
+    """
+    return list(assignments_info.assignments)
+
+def scrape_course_assignments(course_code: str, curr_date: date) -> tuple:
+    """Scrapes all assignment information of the semester from course website, stores it in the
+    scrape cache and returns the assignments in scope on curr_date.
+
+    The course website is only parsed again if its content changed since it was last scraped.
+    Returns None if the course website could not be fetched.
+
+    Args:
+        course_code (str): course code of course
+        curr_date (date): date for assignments in scope
+
+    Returns:
+        tuple: zipped list of all in scope assignment information and content hash of course
+        website
+    """
+    course_page = fetch_course_page(get_course_link(course_code))
+    if not course_page:
+        return None
+    page_text, page_hash = course_page
+    cached_assignments = get_cached_course_assignments(
+        course_code, curr_date, content_hash=page_hash)
+    if cached_assignments is None:
+        cache_course_page_scrape(course_code, page_text, page_hash)
+        cached_assignments = get_cached_course_assignments(
+            course_code, curr_date, content_hash=page_hash)
+    return cached_assignments, page_hash
+
+def cache_course_page_scrape(course_code: str, page_text: str, page_hash: str) -> None:
+    """Scrapes all assignment information of the semester from the html text of course website
+    and stores it in the scrape cache.
+
+    Args:
+        course_code (str): course code of course
+        page_text (str): html text of course website
+        page_hash (str): content hash of course website
+    """
+    assignments_info = SCRAPE_FUNCS[course_code](page_text, None)
+    cache_course_assignments(
+        course_code,
+        zip_assignments_info(assignments_info),
+        assignments_info.scope_dates,
+        page_hash)
+
+def stream_course_assignments(course_code: str, curr_date: date) -> list:
+    """Scrapes assignment information in scope on curr_date from course website while it is
+    being downloaded.
+
+    Scraping stops at the first schedule row past curr_date. The rest of the course website is
+    then read from the same response on the fetch thread pool, and the scrape of the whole
+    semester is stored in the scrape cache once it has been read. Until then, concurrent requests
+    for the same course share the streamed scrape instead of fetching the course website again.
+
+    Args:
+        course_code (str): course code of course
+        curr_date (date): date for assignments in scope
+
+    Returns:
+        list: zipped list of all in scope assignment information
+    """
+    key = (course_code, curr_date)
+    with _cold_scrapes_lock:
+        cold_scrape = _cold_scrapes.get(key)
+        if cold_scrape is not None:
+            streaming = False
+        else:
+            cold_scrape = _cold_scrapes[key] = Future()
+            streaming = True
+    if not streaming:
+        return cold_scrape.result()
+    chunks = stream_course_page(get_course_link(course_code))
+    try:
+        assignments = zip_assignments_info(
+            scrape_course_stream(SCRAPERS[course_code], chunks, curr_date))
+    except BaseException as error:
+        chunks.close()
+        cold_scrape.set_exception(error)
+        forget_cold_scrape(key)
+        raise
+    cold_scrape.set_result(assignments)
+    submit_fetch(finish_course_stream, course_code, chunks).add_done_callback(
+        lambda _: forget_cold_scrape(key))
+    return assignments
+
+def finish_course_stream(course_code: str, chunks) -> None:
+    """Reads the rest of a streamed course website and stores the scrape of its whole semester in
+    the scrape cache.
+
+    Args:
+        course_code (str): course code of course
+        chunks (Generator): chunks of html text of course website not read yet
+    """
+    try:
+        for _ in chunks:
+            pass
+    finally:
+        chunks.close()
+    course_page = get_course_page(get_course_link(course_code))
+    if course_page:
+        cache_course_page_scrape(course_code, course_page['page_text'], course_page['content_hash'])
+
+def forget_cold_scrape(key: tuple) -> None:
+    """Stops sharing the streamed scrape of a course, so that later requests read the scrape
+    cache or stream the course website again.
+
+    Args:
+        key (tuple): course code and scope date of streamed scrape
+    """
+    with _cold_scrapes_lock:
+        _cold_scrapes.pop(key, None)
+
 def course_assignment_data(course_code: str, curr_date: date, test: bool=False) -> list:
     """Returns a zipped list of all in scope assignment information from selected course.
 
+    Scrapes of course websites are shared between users through the scrape cache, so the course
+    website is only scraped when no fresh scrape of the course exists. Assignments in scope on
+    curr_date are then selected from the scrape of the whole semester. Course websites which
+    have never been fetched are streamed and only read up to curr_date if SCRAPE_STREAMING is
+    set.
+
     Args:
         course_code (str): course code of selectec course
         curr_date (date): date for assignments in scope
@@ -37,25 +179,57 @@ def course_assignment_data(course_code: str, curr_date: date, test: bool=False)
     try:
         if test:
             with open(TEST_FILES[course_code], 'r', encoding='utf-8') as file:
-                assignments_info = SCRAPE_FUNCS[course_code](file.read(), curr_date)
-        else:
-            course_url = get_course_link(course_code)
-            response = requests.get(course_url, timeout=SCRAPE_TIMEOUT)
-            if response.status_code == 200:
-                assignments_info = SCRAPE_FUNCS[course_code](response.text, curr_date)
-        return list(zip(
-            assignments_info.assignment_courses,
-            assignments_info.assignment_types,
-            assignments_info.assignment_names,
-            assignments_info.due_dates,
-            assignments_info.links_info
-        ))
+                return zip_assignments_info(SCRAPE_FUNCS[course_code](file.read(), curr_date))
+        cached_assignments = get_cached_course_assignments(course_code, curr_date)
+        if cached_assignments is not None:
+            return cached_assignments
+        if SCRAPE_STREAMING and not get_course_page(get_course_link(course_code)):
+            return stream_course_assignments(course_code, curr_date)
+        scraped_assignments = scrape_course_assignments(course_code, curr_date)
+        if not scraped_assignments:
+            return []
+        return scraped_assignments[0]
     except TimeoutError:
-        return list(zip([], [], [], [], []))
+        return []
+
+def refreshed_course_assignments(course_code: str, curr_date: date) -> list:
+    """Returns the latest scraped assignment information of course in scope on curr_date
+    without scraping the course website.
+
+    Returns None if the course has not been scraped. The scrape cache is only read, so that
+    viewing assignments does not write to the database.
+
+    Args:
+        course_code (str): course code of course
+        curr_date (date): date for assignments in scope
+
+    Returns:
+        list: zipped list of all assignment information
+    """
+    return get_cached_course_assignments(course_code, curr_date, ttl=float('inf'), touch=False)
+
+def courses_assignment_data(course_codes: list, curr_date: date, test: bool=False) -> dict:
+    """Returns zipped lists of all in scope assignment information from all selected courses.
+
+    Course websites are fetched concurrently, so the time taken is bounded by the slowest course
+    website instead of the sum over all courses.
+
+    Args:
+        course_codes (list): course codes of selected courses
+        curr_date (date): date for assignments in scope
+        test (bool): indicates whether this function is being used for testing purposes
+
+    Returns:
+        dict: map from course code to zipped list of all assignment information of course
+    """
+    assignments = map_concurrently(
+        lambda course_code: course_assignment_data(course_code, curr_date, test),
+        course_codes)
+    return dict(zip(course_codes, assignments))
 
 def all_pending_assignments(username: str) -> list:
     """Returns a list of assignment information for all of user's pending assignments.
-    
+
     Assignments are sorted by closest approaching due date.
 
     Args:
@@ -64,15 +238,11 @@ def all_pending_assignments(username: str) -> list:
     Returns:
         list: sorted list containing assignment information for all pending assignments
     """
-    pending_assignments = get_pending_assignments(username)
-    pending_assignments_list = []
-    for course in pending_assignments:
-        pending_assignments_list.extend(pending_assignments[course])
-    return sorted(pending_assignments_list, key=lambda assignment: assignment[3])
+    return list_user_assignments(username, ASSIGNMENT_PENDING)
 
 def all_completed_assignments(username: str) -> list:
     """Returns a list of assignment information for all of user's completed assignments.
-    
+
     Assignments are sorted by furthest approaching due date.
 
     Args:
@@ -81,8 +251,101 @@ def all_completed_assignments(username: str) -> list:
     Returns:
         list: sorted list containing assignment information for all completed assignments.
     """
-    completed_assignments = get_completed_assignments(username)
-    completed_assignments_list = []
-    for course in completed_assignments:
-        completed_assignments_list.extend(completed_assignments[course])
-    return sorted(completed_assignments_list, key=lambda assignment: assignment[3], reverse=True)
+    return list_user_assignments(username, ASSIGNMENT_COMPLETED)
+
+def user_view_version(username: str, curr_date: date) -> tuple:
+    """Returns the version of everything shown in the user's views of assignments on curr_date.
+
+    The version changes whenever the user's state or the stored assignments of any of the user's
+    courses change, so anything rendered from the user's assignments can be reused while it stays
+    the same. It also changes with the date and the cached scrapes of the user's courses, which
+    refreshed assignments are added from, so they only need to be added once it changed. Reading
+    the version does not decode any cached assignments.
+
+    Args:
+        username (str): username of user
+        curr_date (date): date for assignments in scope
+
+    Returns:
+        tuple: state version of user, pairs of course code and scrape version of the user's
+        courses, date and pairs of course code and identifier of cached scrape of the user's
+        courses
+    """
+    course_codes = list_user_assignment_courses(username)
+    scrape_ids = get_cached_course_scrape_ids(course_codes)
+    return (get_user_state_version(username),
+            tuple(sorted(get_user_course_scrape_versions(username).items())),
+            curr_date,
+            tuple(sorted(
+                (course_code, scrape_ids.get(course_code)) for course_code in course_codes)))
+
+def encode_cursor(key: tuple) -> str:
+    """Returns the cursor of the page starting after the assignment with the input key.
+
+    Args:
+        key (tuple): (due date, position) key of last assignment of a page
+
+    Returns:
+        str: cursor of next page
+    """
+    return f'{key[0]}_{key[1]}'
+
+def decode_cursor(cursor: str) -> tuple:
+    """Returns the key of the last assignment of the previous page of a cursor.
+
+    If the cursor was not returned by encode_cursor, an InvalidCursor exception is raised.
+
+    Args:
+        cursor (str): cursor of page
+
+    Returns:
+        tuple: (due date, position) key of last assignment of previous page
+    """
+    due_date, _, position = cursor.rpartition('_')
+    if not position.isdigit():
+        raise InvalidCursor
+    return due_date, int(position)
+
+def assignments_page(
+    username: str,
+    status: str,
+    cursor: str = None,
+    limit: int = ASSIGNMENTS_PAGE_SIZE,
+    start: date = None,
+    end: date = None,
+    course_code: str = None,
+    assignment_type: str = None) -> tuple:
+    """Returns one page of the user's assignments with the input status and the cursor of the
+    next page.
+
+    Assignments are in the order of all_pending_assignments and all_completed_assignments. Only
+    the assignments of the page are read, so pages far into a long history cost the same as the
+    first page. If start or end is given, only assignments due in that window are returned. If
+    course_code or assignment_type is given, only assignments of that course or type are
+    returned.
+
+    Args:
+        username (str): username of user
+        status (str): status of assignments
+        cursor (str, optional): cursor returned with the previous page. Defaults to None.
+        limit (int, optional): maximum number of assignments on the page. Defaults to
+        ASSIGNMENTS_PAGE_SIZE.
+        start (date, optional): earliest due date of assignments. Defaults to None.
+        end (date, optional): assignments due on or after this date are left out. Defaults to
+        None.
+        course_code (str, optional): course of assignments. Defaults to None.
+        assignment_type (str, optional): type of assignments. Defaults to None.
+
+    Returns:
+        tuple: list of Assignment named tuples of page and cursor of next page, which is None if
+        this is the last page
+    """
+    after = decode_cursor(cursor) if cursor else None
+    rows = list_user_assignments_page(
+        username, status, limit + 1, after,
+        start.isoformat() if start else None,
+        end.isoformat() if end else None,
+        course_code, assignment_type
+    )
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return [assignment for _, assignment in rows[:limit]], next_cursor
@@ -1,11 +1,115 @@
-'''This module contains definition for AssignmentInfo named tuple.'''
+'''This module contains definitions for Assignment named tuple and AssignmentsInfo container.'''
 
 import collections
+import hashlib
 
-AssignmentsInfo = collections.namedtuple('AssignmentsInfo', [
-    'assignment_courses',
-    'assignment_types',
-    'assignment_names',
-    'due_dates',
-    'links_info',
-])
+# Information of a single assignment. Assignments are stored and displayed in this order, so an
+# Assignment can be used wherever a row of zipped assignment information is expected.
+class Assignment(collections.namedtuple('Assignment', [
+        'course',
+        'assignment_type',
+        'name',
+        'due_date',
+        'links_info',
+])):
+    '''Scraped assignment identified by its stable id.'''
+
+    __slots__ = ()
+
+    @property
+    def id(self) -> str:  # pylint: disable=invalid-name
+        """str: stable id of assignment"""
+        return assignment_id(self)
+
+def assignment_id(assignment: Assignment) -> str:
+    """Returns the stable id of an assignment.
+
+    The id only depends on the course and name of the assignment, so every scrape of the same
+    assignment gets the same id even if its type, due date or links change.
+
+    Args:
+        assignment (Assignment): assignment information
+
+    Returns:
+        str: id of assignment
+    """
+    key = '\x1f'.join([assignment[0], assignment[2]])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+class AssignmentsInfo:
+    '''Container of scraped assignments and the date each assignment comes into scope.
+
+    Assignments and scope dates are only ever added together, so they can not get out of step.
+    Columns of assignment information are available as views of the same names as the fields of
+    the former parallel lists.'''
+
+    __slots__ = ('assignments', 'scope_dates')
+
+    def __init__(self, assignments: list = None, scope_dates: list = None):
+        self.assignments = assignments if assignments is not None else []
+        self.scope_dates = scope_dates if scope_dates is not None else [None] * len(
+            self.assignments)
+        if len(self.assignments) != len(self.scope_dates):
+            raise ValueError('Every assignment needs exactly one scope date')
+
+    def append(self, assignment: Assignment, scope_date: str = None) -> None:
+        """Adds an assignment.
+
+        Args:
+            assignment (Assignment): assignment information
+            scope_date (str, optional): date assignment comes into scope. Defaults to None.
+        """
+        self.assignments.append(assignment)
+        self.scope_dates.append(scope_date)
+
+    def extend(self, assignments: list, scope_date: str = None) -> None:
+        """Adds several assignments coming into scope on the same date.
+
+        Args:
+            assignments (list): assignment information of every assignment
+            scope_date (str, optional): date assignments come into scope. Defaults to None.
+        """
+        self.assignments.extend(assignments)
+        self.scope_dates.extend([scope_date] * len(assignments))
+
+    def __len__(self) -> int:
+        return len(self.assignments)
+
+    def __iter__(self):
+        return iter(self.assignments)
+
+    def __getitem__(self, index: int) -> Assignment:
+        return self.assignments[index]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AssignmentsInfo):
+            return NotImplemented
+        return self.assignments == other.assignments and self.scope_dates == other.scope_dates
+
+    def __repr__(self) -> str:
+        return f'AssignmentsInfo({self.assignments!r}, {self.scope_dates!r})'
+
+    @property
+    def assignment_courses(self) -> list:
+        """list: course of every assignment"""
+        return [assignment.course for assignment in self.assignments]
+
+    @property
+    def assignment_types(self) -> list:
+        """list: type of every assignment"""
+        return [assignment.assignment_type for assignment in self.assignments]
+
+    @property
+    def assignment_names(self) -> list:
+        """list: name of every assignment"""
+        return [assignment.name for assignment in self.assignments]
+
+    @property
+    def due_dates(self) -> list:
+        """list: due date of every assignment"""
+        return [assignment.due_date for assignment in self.assignments]
+
+    @property
+    def links_info(self) -> list:
+        """list: links info of every assignment"""
+        return [assignment.links_info for assignment in self.assignments]
@@ -1,5 +1,6 @@
 '''Module containing all constants.'''
 
+import os
 import string
 from datetime import datetime
 
@@ -18,6 +19,59 @@ USER_COURSES_DB = 'databases/user-courses.db'
 # Database file containing users' assignment informatin
 USER_ASSIGNMENTS_DB = 'databases/user-assignments.db'
 
+# Statuses of a user's assignment
+ASSIGNMENT_PENDING = 'pending'
+ASSIGNMENT_COMPLETED = 'completed'
+
+# Number of assignments shown on one page of the assignments page
+ASSIGNMENTS_PAGE_SIZE = 50
+
+# Maximum number of assignments returned on one page of the assignments API
+API_MAX_PAGE_SIZE = 200
+
+# Maximum number of days after today of the due date window of the assignments API
+API_MAX_DUE_WITHIN = 366
+
+# Maximum number of rendered assignments pages kept before the least recently used ones are evicted
+RENDERED_PAGE_CACHE_SIZE = 1024
+
+# Maximum number of scrape versions of courses whose rendered assignment rows are kept before the
+# least recently used ones are evicted
+ROW_FRAGMENT_CACHE_SIZE = 256
+
+# Number of prepared statements cached by each database connection
+DB_STATEMENT_CACHE_SIZE = 256
+
+# Maximum number of idle connections to each database kept open by the connection pool
+DB_POOL_SIZE = 16
+
+# Number of times a read-modify-write of a user's assignments is attempted before giving up when
+# other writers keep changing the assignments in between, and the delay before the first retry in
+# seconds. The delay doubles with every retry.
+DB_CAS_ATTEMPTS = 5
+DB_CAS_RETRY_DELAY = 0.005
+
+# Whether all tables are stored in CONSOLIDATED_DB instead of one database file per table, set by
+# setting the COURSE_WEBSITE_MERGE_DB_CONSOLIDATED environment variable to 1
+DB_CONSOLIDATED = os.environ.get('COURSE_WEBSITE_MERGE_DB_CONSOLIDATED') == '1'
+
+# Database file containing all tables if DB_CONSOLIDATED is set
+CONSOLIDATED_DB = 'databases/course-website-merge.db'
+
+# Pragmas applied to every connection to CONSOLIDATED_DB. Readers never wait for writers in WAL
+# mode. The background refresher checkpoints and truncates the WAL after every tick, and SQLite's
+# automatic checkpoint once the WAL grows past wal_autocheckpoint pages bounds it in between.
+CONSOLIDATED_DB_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -16 * 1024,
+    'mmap_size': 64 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'wal_autocheckpoint': 1000,
+    'journal_size_limit': 16 * 1024 * 1024
+}
+
 # String containing alphabet
 ALPHABET = string.ascii_letters + string.digits + string.punctuation
 
@@ -40,5 +94,64 @@ MONTH_CODES = {
     'dec' : '12'
 }
 
+# Maximum number of unusual date inputs kept converted in memory
+DATE_CACHE_SIZE = 1024
+
 # Number of seconds to scrape before timeout has been reached
 SCRAPE_TIMEOUT = 10
+
+# Database file containing scraped course assignments shared between all users
+SCRAPE_CACHE_DB = 'databases/scrape-cache.db'
+
+# Database file containing the last fetched version of every course website
+COURSE_PAGES_DB = 'databases/course-pages.db'
+
+# Number of seconds a cached course scrape is served before the course website is fetched again
+SCRAPE_CACHE_TTL = 60 * 60
+
+# Maximum number of cached course scrapes kept before the least recently used ones are evicted
+SCRAPE_CACHE_MAX_ENTRIES = 256
+
+# Number of course websites fetched concurrently
+FETCH_WORKERS = 8
+
+# Maximum number of concurrent requests sent to a single course website host
+FETCH_MAX_PER_HOST = 2
+
+# Number of requests per second sent to course websites once the burst allowance is used up
+FETCH_RATE = 5
+
+# Number of requests that can be sent to course websites at once before FETCH_RATE applies
+FETCH_BURST = 10
+
+# Database file containing the refresh schedule of every course website
+COURSE_REFRESH_DB = 'databases/course-refresh.db'
+
+# Whether course websites are periodically scraped in the background while the app runs
+COURSE_REFRESHER_ENABLED = True
+
+# Number of seconds the background refresher waits between checks for courses due a refresh
+REFRESH_TICK = 60
+
+# Maximum number of course websites the background refresher fetches per tick
+REFRESH_BUDGET = 16
+
+# Shortest number of seconds between two refreshes of the same course website
+REFRESH_MIN_INTERVAL = 15 * 60
+
+# Longest number of seconds between two refreshes of the same course website
+REFRESH_MAX_INTERVAL = 24 * 60 * 60
+
+# Number of seconds a course refresh claimed by a worker is reserved before others may retry it
+REFRESH_LEASE = 5 * SCRAPE_TIMEOUT
+
+# HTML parsers used to parse course websites in order of preference. The first installed parser
+# is used, and 'html.parser' is always available as a fallback.
+HTML_PARSERS = ['lxml', 'html.parser']
+
+# Whether course websites without a stored scrape are streamed and only read up to the scope
+# date, leaving the scrape of the whole semester to the fetch thread pool
+SCRAPE_STREAMING = True
+
+# Number of bytes read at a time from streamed course websites
+STREAM_CHUNK_SIZE = 8 * 1024
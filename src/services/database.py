@@ -2,19 +2,13 @@
 
 import sqlite3
 import json
+import threading
 from services.constants import USERS_DB, COURSES_DB, COURSES_SQL, USER_COURSES_DB
 from services.constants import USER_ASSIGNMENTS_DB
-
-def get_db_connection(db_file: str):
-    '''
-    Function to get a database connection
-    
-    Keyword arguments:
-    db_file -- .db file representing the database
-    '''
-    con = sqlite3.connect(db_file)
-    con.row_factory = sqlite3.Row
-    return con
+from services.constants import ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED
+from services.exceptions import ConcurrentUpdate
+from services.db_connections import get_db_connection
+from services.assignments_info import Assignment, assignment_id
 
 def initialize_users_db(reset: bool = False) -> None:
     '''
@@ -83,9 +77,92 @@ def get_hashed_password(username: str) -> str:
     else:
         return None
 
+class CourseCatalog:
+    '''Process-wide copy of the courses database kept in memory, so that looking up courses never
+    touches the disk.
+
+    The catalog is loaded on first use and reloaded whenever the courses database is
+    initialized.'''
+
+    def __init__(self):
+        self.courses = None
+        self.lock = threading.Lock()
+
+    def reload(self) -> None:
+        """Loads all courses from the courses database.
+
+        If the courses database can not be read, no courses are kept, so loading is tried again
+        on next use.
+        """
+        courses = {}
+        try:
+            with get_db_connection(COURSES_DB) as con:
+                rows = con.execute('SELECT course_code, course_name, course_link FROM courses')
+                for row in rows.fetchall():
+                    courses[row['course_code']] = (row['course_name'], row['course_link'])
+        except sqlite3.Error:
+            self.courses = None
+            return
+        self.courses = courses
+
+    def invalidate(self) -> None:
+        """Discards the loaded courses so that they are loaded again on next use."""
+        self.courses = None
+
+    def course_map(self) -> dict:
+        """Returns all courses, loading them if they have not been loaded yet.
+
+        Returns:
+            dict: map from course code to course name and course link pair
+        """
+        courses = self.courses
+        if courses is None:
+            with self.lock:
+                if self.courses is None:
+                    self.reload()
+                courses = self.courses
+        return courses if courses is not None else {}
+
+    def list_courses(self) -> list:
+        """Returns a list of all courses users can choose.
+
+        Returns:
+            list: A list of all courses users can choose
+        """
+        return list(self.course_map())
+
+    def get_course_name(self, course_code: str) -> str:
+        """Returns name of course, or None if there is no such course.
+
+        Args:
+            course_code (str): course_code of course
+
+        Returns:
+            str: name of course
+        """
+        course = self.course_map().get(course_code)
+        return course[0] if course else None
+
+    def get_course_link(self, course_code: str) -> str:
+        """Returns url of course page of course, or None if there is no such course.
+
+        Args:
+            course_code (str): course_code of course
+
+        Returns:
+            str: url of webpage of course
+        """
+        course = self.course_map().get(course_code)
+        return course[1] if course else None
+
+# catalog of all courses shared by every thread of the process
+COURSE_CATALOG = CourseCatalog()
+
 def initialize_courses_db(update: bool = False) -> None:
     """Loads in course records from COURSES_SQL if update is set to true or if table does not exist.
 
+    The course catalog is reloaded afterwards.
+
     Args:
         update (bool, optional): If true, courses database is reloaded. Defaults to False.
     """
@@ -101,7 +178,10 @@ def initialize_courses_db(update: bool = False) -> None:
         with open(COURSES_SQL, 'r', encoding='utf-8') as file:
             sql_script = file.read()
         with get_db_connection(COURSES_DB) as con:
+            con.execute('DROP TABLE IF EXISTS courses')
             con.executescript(sql_script)
+    COURSE_CATALOG.invalidate()
+    COURSE_CATALOG.course_map()
 
 def list_courses() -> list:
     """Returns a list of all courses users can choose.
@@ -109,16 +189,15 @@ def list_courses() -> list:
     Returns:
         list: A list of all courses users can choose
     """
-    courses = []
-    with get_db_connection(COURSES_DB) as con:
-        rows = con.execute('SELECT course_code FROM courses').fetchall()
-        for row in rows:
-            courses.append(row['course_code'])
-    return courses
+    return COURSE_CATALOG.list_courses()
 
 def initialize_user_courses_db(reset: bool = False) -> None:
     """Creates a database containing information about each user's selected courses.
     
+    Each selected course is stored in its own row of user_courses together with its position in
+    the user's course list. Rows are indexed both by user and by course, so the courses of a user
+    and the users of a course can both be read without scanning the table.
+
     If reset is set to True, the existing database is deleted and a new one is created.
 
     Args:
@@ -128,206 +207,595 @@ def initialize_user_courses_db(reset: bool = False) -> None:
         if reset:
             con.execute('DROP TABLE IF EXISTS user_courses')
         con.execute('''CREATE TABLE IF NOT EXISTS user_courses
-                        (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            username TEXT UNIQUE,
-                            course_list_data TEXT)''')
+                        (username TEXT,
+                            course_code TEXT,
+                            position INTEGER,
+                            PRIMARY KEY (username, course_code))''')
+        con.execute('''CREATE INDEX IF NOT EXISTS user_courses_subscribers
+                        ON user_courses (course_code, username)''')
         con.commit()
 
-def user_courses_db_contains_user(username: str) -> bool:
-    """Returns true if user's data exists in user courses database.
+def list_user_courses(username: str) -> list:
+    """Returns the user's selected course list.
+
+    Courses are listed in the order the user selected them.
 
     Args:
-        username (str): user to check
+        username (str): user whos course list should be returned
 
     Returns:
-        bool: true if user's data exists in user courses database otherwise false
+        list: list containing all courses in user's course list
     """
     with get_db_connection(USER_COURSES_DB) as con:
-        user = (
-            con
-            .execute('SELECT username FROM user_courses WHERE username = ?', (username,))
-            .fetchone()
-        )
-        if not user:
-            return False
-        else:
-            return True
+        user_courses = con.execute('''SELECT course_code FROM user_courses WHERE username = ?
+                                   ORDER BY position''', (username,)).fetchall()
+        return [course_code for (course_code,) in user_courses]
 
-def list_user_courses(username: str) -> list:
-    """Returns the user's selected course list.
+def add_user_course(username: str, course_code: str) -> bool:
+    """Adds a course to the end of the user's course list.
 
     Args:
-        username (str): user whos course list should be returned
+        username (str): user to whom course should be added
+        course_code (str): code of course to be added
 
     Returns:
-        list: list containing all courses in user's course list
+        bool: true if course was added, false if it already is in user's course list
     """
     with get_db_connection(USER_COURSES_DB) as con:
-        user_courses_json = (
-            con
-            .execute('SELECT course_list_data FROM user_courses WHERE username = ?', (username,))
-            .fetchone()
-        )
-        if not user_courses_json:
-            return []
-        else:
-            user_course_list = json.loads(user_courses_json[0])
-            return user_course_list
+        added = con.execute('''INSERT OR IGNORE INTO user_courses (username, course_code, position)
+                            SELECT ?, ?, COALESCE(MAX(position) + 1, 0) FROM user_courses
+                            WHERE username = ?''', (username, course_code, username)).rowcount
+        con.commit()
+    return added == 1
 
-def add_new_user_course_list(username: str, course_list_data: str) -> None:
-    """Adds a new user's course list to the user course list database.
+def remove_user_course(username: str, course_code: str) -> bool:
+    """Removes a course from the user's course list.
 
     Args:
-        username (str): user whose data should be added
-        course_list_data (str): data of user's course list
+        username (str): user from whom course should be removed
+        course_code (str): code of course to be removed
+
+    Returns:
+        bool: true if course was removed, false if it was not in user's course list
     """
     with get_db_connection(USER_COURSES_DB) as con:
-        con.execute('INSERT INTO user_courses (username, course_list_data) VALUES (?, ?)',
-                    (username, course_list_data))
+        removed = con.execute('DELETE FROM user_courses WHERE username = ? AND course_code = ?',
+                              (username, course_code)).rowcount
         con.commit()
+    return removed == 1
 
-def update_user_course_list(username: str, course_list_data: str) -> None:
-    """Updates user's course list.
+def list_course_subscribers(course_code: str) -> list:
+    """Returns all users who have selected the course.
 
     Args:
-        username (str): user whose course list should be updated
-        course_list_data (str): updated course list data
+        course_code (str): code of course
+
+    Returns:
+        list: usernames of users whose course list contains the course
     """
     with get_db_connection(USER_COURSES_DB) as con:
-        con.execute('UPDATE user_courses SET course_list_data = ? WHERE username = ?',
-                    (course_list_data, username))
-        con.commit()
+        subscribers = con.execute('SELECT username FROM user_courses WHERE course_code = ?',
+                                  (course_code,)).fetchall()
+        return [username for (username,) in subscribers]
 
 def initialize_user_assignments_db(reset: bool = False) -> None:
     """Creates a database containing user assignment information for both pending and
     completed assignments.
 
+    Assignments are stored once in assignments under their stable id and shared by all users.
+    Users only hold a reference to each of their assignments together with its status in
+    user_assignment_status. Courses whose assignments have been added for a user are stored in
+    user_assignment_courses, even if the course has no assignments.
+
     Args:
         reset (bool, optional): Erases and resets database if ture. Defaults to False.
     """
     with get_db_connection(USER_ASSIGNMENTS_DB) as con:
         if reset:
             con.execute('DROP TABLE IF EXISTS user_assignments')
-        con.execute('''CREATE TABLE IF NOT EXISTS user_assignments
+            con.execute('DROP TABLE IF EXISTS user_assignment_status')
+            con.execute('DROP TABLE IF EXISTS user_assignment_courses')
+            con.execute('DROP TABLE IF EXISTS user_state_versions')
+            con.execute('DROP TABLE IF EXISTS course_scrape_versions')
+            con.execute('DROP TABLE IF EXISTS assignments')
+        con.execute('''CREATE TABLE IF NOT EXISTS assignments
+                        (id TEXT PRIMARY KEY,
+                            course_code TEXT,
+                            assignment_type TEXT,
+                            assignment_name TEXT,
+                            due_date TEXT,
+                            links_info TEXT)''')
+        con.execute('''CREATE TABLE IF NOT EXISTS user_assignment_status
                         (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            username TEXT UNIQUE,
-                            pending_assignments_data TEXT,
-                            completed_assignments_data TEXT)''')
+                            username TEXT,
+                            assignment_id TEXT REFERENCES assignments (id),
+                            course_code TEXT,
+                            status TEXT,
+                            due_date TEXT)''')
+        con.execute('''CREATE UNIQUE INDEX IF NOT EXISTS user_assignment_status_assignment
+                        ON user_assignment_status (username, assignment_id)''')
+        con.execute('''CREATE INDEX IF NOT EXISTS user_assignment_status_view
+                        ON user_assignment_status (username, status, due_date)''')
+        con.execute('''CREATE INDEX IF NOT EXISTS user_assignment_status_completed_view
+                        ON user_assignment_status (username, status, due_date DESC, id)''')
+        con.execute('''CREATE INDEX IF NOT EXISTS user_assignment_status_course
+                        ON user_assignment_status (username, course_code, status)''')
+        con.execute('''CREATE INDEX IF NOT EXISTS user_assignment_status_shared
+                        ON user_assignment_status (assignment_id)''')
+        con.execute('''CREATE TABLE IF NOT EXISTS user_assignment_courses
+                        (username TEXT,
+                            course_code TEXT,
+                            PRIMARY KEY (username, course_code))''')
+        con.execute('''CREATE TABLE IF NOT EXISTS user_state_versions
+                        (username TEXT PRIMARY KEY,
+                            version INTEGER NOT NULL)''')
+        con.execute('''CREATE TABLE IF NOT EXISTS course_scrape_versions
+                        (course_code TEXT PRIMARY KEY,
+                            version INTEGER NOT NULL)''')
+        con.commit()
+
+def get_user_state_version(username: str) -> int:
+    """Returns the version of the user's state, which changes whenever any of the user's
+    pending or completed assignments or selected courses change.
+
+    Args:
+        username (str): username of user
+
+    Returns:
+        int: version of user's state, 0 if the user's state has never changed
+    """
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        version = con.execute('SELECT version FROM user_state_versions WHERE username = ?',
+                              (username,)).fetchone()
+        return version[0] if version else 0
+
+def increment_user_state_version(con: sqlite3.Connection, username: str) -> None:
+    """Increments the version of the user's state on con without committing.
+
+    Args:
+        con (sqlite3.Connection): connection to user assignments database
+        username (str): username of user
+    """
+    con.execute('''INSERT INTO user_state_versions (username, version) VALUES (?, 1)
+                ON CONFLICT (username) DO UPDATE SET version = version + 1''', (username,))
+
+def bump_user_state_versions(usernames: list) -> None:
+    """Increments the version of the state of every user after a change stored outside of the
+    users' assignment statuses, such as a change of a user's selected courses or of the shared
+    assignments of a course.
+
+    Args:
+        usernames (list): usernames of users
+    """
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        con.executemany('''INSERT INTO user_state_versions (username, version) VALUES (?, 1)
+                        ON CONFLICT (username) DO UPDATE SET version = version + 1''',
+                        [(username,) for username in usernames])
         con.commit()
 
-def add_new_user_to_user_assignments(username: str) -> None:
-    """Adds a new record to user_assignments database corresponding to new user.
+def claim_user_state_version(username: str, expected_version: int) -> None:
+    """Increments the version of the user's state if it still is expected_version.
+
+    Read-modify-write operations read the version before reading the user's assignments and
+    claim it before writing, so that the write only happens if no other writer changed the
+    assignments in between. If the version has changed, a ConcurrentUpdate exception is raised and
+    the operation can be retried with retry_on_conflict.
 
     Args:
-        username (str): user to be added to user_assignments database
+        username (str): username of user
+        expected_version (int): version read before reading the user's assignments
     """
     with get_db_connection(USER_ASSIGNMENTS_DB) as con:
-        con.execute('''INSERT INTO user_assignments
-                    (username, pending_assignments_data, completed_assignments_data)
-                    VALUES (?, ?, ?)''',
-                    (username,
-                     json.dumps({}),
-                     json.dumps({})))
+        if expected_version == 0:
+            claimed = con.execute('''INSERT OR IGNORE INTO user_state_versions
+                                  (username, version) VALUES (?, 1)''', (username,)).rowcount
+        else:
+            claimed = con.execute('''UPDATE user_state_versions SET version = version + 1
+                                  WHERE username = ? AND version = ?''',
+                                  (username, expected_version)).rowcount
         con.commit()
+    if claimed != 1:
+        raise ConcurrentUpdate
+
+def get_user_course_scrape_versions(username: str) -> dict:
+    """Returns the version of the stored assignments of every course whose assignments have been
+    added for the user.
 
-def get_pending_assignments(username: str) -> dict:
-    """Returns a dictionary containing all of the user's pending assignments.
+    Courses whose stored assignments have never changed are left out.
 
     Args:
         username (str): username of user
 
     Returns:
-        dict: dictionary containing all of the user's pending assignments
+        dict: map from course code to version of stored assignments of course
     """
     with get_db_connection(USER_ASSIGNMENTS_DB) as con:
-        pending_assignments_json = (
-            con
-            .execute('SELECT pending_assignments_data FROM user_assignments WHERE username = ?',
-                     (username,))
-            .fetchone()
-        )
-        if not pending_assignments_json:
-            return {}
-        else:
-            return json.loads(pending_assignments_json[0])
+        versions = con.execute('''SELECT versions.course_code, versions.version
+                               FROM user_assignment_courses AS courses
+                               JOIN course_scrape_versions AS versions
+                                   ON versions.course_code = courses.course_code
+                               WHERE courses.username = ?''', (username,))
+        return dict(versions.fetchall())
+
+def increment_course_scrape_versions(con: sqlite3.Connection, course_codes: set) -> None:
+    """Increments the version of the stored assignments of every course on con without
+    committing.
+
+    Args:
+        con (sqlite3.Connection): connection to user assignments database
+        course_codes (set): course codes of courses
+    """
+    con.executemany('''INSERT INTO course_scrape_versions (course_code, version) VALUES (?, 1)
+                    ON CONFLICT (course_code) DO UPDATE SET version = version + 1''',
+                    [(course_code,) for course_code in course_codes])
+
+def user_assignment_ids_by_course(username: str) -> dict:
+    """Returns the ids of all of the user's pending and completed assignments by course.
+
+    Only the user's assignment statuses are read, so no stored assignment is decoded.
+
+    Args:
+        username (str): username of user
+
+    Returns:
+        dict: map from course code to set of ids of user's assignments of course
+    """
+    assignment_ids_by_course = {}
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        rows = con.execute('''SELECT course_code, assignment_id FROM user_assignment_status
+                           WHERE username = ?''', (username,)).fetchall()
+    for course_code, user_assignment_id in rows:
+        assignment_ids_by_course.setdefault(course_code, set()).add(user_assignment_id)
+    return assignment_ids_by_course
+
+def list_user_assignment_courses(username: str) -> list:
+    """Returns a list of all courses whose assignments have been added for the user.
+
+    Args:
+        username (str): username of user
+
+    Returns:
+        list: course codes of courses in the order their assignments were added
+    """
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        rows = con.execute('''SELECT course_code FROM user_assignment_courses
+                              WHERE username = ? ORDER BY rowid''', (username,)).fetchall()
+    return [row[0] for row in rows]
+
+def list_user_assignments(username: str, status: str) -> list:
+    """Returns all of the user's assignments with the input status sorted by due date.
 
-def get_completed_assignments(username: str) -> dict:
-    """Returns a dictionary containing all of the user's completed assignments.
+    Pending assignments are sorted by closest approaching due date and completed assignments by
+    furthest approaching due date. Assignments with the same due date are kept in the order they
+    were added. Both orders are kept by an index which is updated whenever an assignment is added
+    or moved, so assignments are read in order without sorting.
 
     Args:
         username (str): username of user
+        status (str): status of assignments
 
     Returns:
-        dict: dictionary containing all of the user's completed assignments
+        list: sorted list of Assignment named tuples
     """
+    order = 'DESC' if status == ASSIGNMENT_COMPLETED else 'ASC'
     with get_db_connection(USER_ASSIGNMENTS_DB) as con:
-        completed_assignments_json = (
-            con
-            .execute('SELECT completed_assignments_data FROM user_assignments WHERE username = ?',
-                     (username,))
-            .fetchone()
-        )
-        if not completed_assignments_json:
-            return {}
+        rows = con.execute(f'''SELECT assignments.course_code, assignment_type, assignment_name,
+                                   assignments.due_date, links_info
+                               FROM user_assignment_status AS status
+                               JOIN assignments ON assignments.id = status.assignment_id
+                               WHERE status.username = ? AND status.status = ?
+                               ORDER BY status.due_date {order}, status.id''',
+                           (username, status)).fetchall()
+    return [Assignment(row[0], row[1], row[2], row[3], json.loads(row[4])) for row in rows]
+
+def list_user_assignments_page(
+    username: str,
+    status: str,
+    limit: int,
+    after: tuple = None,
+    due_from: str = None,
+    due_until: str = None,
+    course_code: str = None,
+    assignment_type: str = None) -> list:
+    """Returns up to limit of the user's assignments with the input status in the order of
+    list_user_assignments, together with the key of each assignment in that order.
+
+    Assignments are read as a range of the view index starting right after the key of the last
+    assignment of the previous page, so reading a page costs the same no matter how many
+    assignments come before it.
+
+    Args:
+        username (str): username of user
+        status (str): status of assignments
+        limit (int): maximum number of assignments returned
+        after (tuple, optional): key of the last assignment of the previous page. Defaults to None.
+        due_from (str, optional): earliest due date of assignments returned. Defaults to None.
+        due_until (str, optional): assignments due on or after this date are not returned.
+        Defaults to None.
+        course_code (str, optional): only assignments of this course are returned. Defaults to
+        None.
+        assignment_type (str, optional): only assignments of this type are returned. Defaults to
+        None.
+
+    Returns:
+        list: list of (key, Assignment named tuple) pairs, where key is a (due date, position)
+        tuple
+    """
+    descending = status == ASSIGNMENT_COMPLETED
+    conditions = ['status.username = ?', 'status.status = ?']
+    parameters = [username, status]
+    if due_from is not None:
+        conditions.append('status.due_date >= ?')
+        parameters.append(due_from)
+    if due_until is not None:
+        conditions.append('status.due_date < ?')
+        parameters.append(due_until)
+    if course_code is not None:
+        conditions.append('status.course_code = ?')
+        parameters.append(course_code)
+    if assignment_type is not None:
+        conditions.append('assignments.assignment_type = ?')
+        parameters.append(assignment_type)
+    if after is not None:
+        if descending:
+            conditions.append('status.due_date <= ? AND (status.due_date < ? OR status.id > ?)')
         else:
-            return json.loads(completed_assignments_json[0])
+            conditions.append('status.due_date >= ? AND (status.due_date > ? OR status.id > ?)')
+        parameters.extend([after[0], after[0], after[1]])
+    order = 'DESC' if descending else 'ASC'
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        rows = con.execute(f'''SELECT status.due_date, status.id, assignments.course_code,
+                                   assignment_type, assignment_name, assignments.due_date,
+                                   links_info
+                               FROM user_assignment_status AS status
+                               JOIN assignments ON assignments.id = status.assignment_id
+                               WHERE {' AND '.join(conditions)}
+                               ORDER BY status.due_date {order}, status.id
+                               LIMIT ?''', (*parameters, limit)).fetchall()
+    return [((row[0], row[1]), Assignment(row[2], row[3], row[4], row[5], json.loads(row[6])))
+            for row in rows]
+
+def move_redated_assignments(con: sqlite3.Connection, assignments: list) -> None:
+    """Moves every user's copy of stored assignments whose due date changed to the new due date
+    on con without committing.
+
+    Only assignments which are already stored with a different due date are moved, so that users'
+    views stay ordered by the due dates shown.
+
+    Args:
+        con (sqlite3.Connection): connection to user assignments database
+        assignments (list): list of tuples corresponding to scraped assignments
+    """
+    due_dates = {assignment_id(assignment): assignment[3] for assignment in assignments}
+    placeholders = ', '.join('?' * len(due_dates))
+    stored_due_dates = con.execute(f'''SELECT id, due_date FROM assignments
+                                   WHERE id IN ({placeholders})''', list(due_dates))
+    con.executemany('''UPDATE user_assignment_status SET due_date = ? WHERE assignment_id = ?''',
+                    [(due_dates[id_], id_) for id_, due_date in stored_due_dates.fetchall()
+                     if due_date != due_dates[id_]])
+
+def upsert_assignments(con: sqlite3.Connection, assignments: list) -> list:
+    """Stores the assignments in the shared assignments table and returns their ids.
+
+    Assignments which are already stored are updated in place if they changed, including their due
+    date in every user's views. The scrape version of every course with added or changed
+    assignments is incremented.
+
+    Args:
+        con (sqlite3.Connection): connection to user assignments database
+        assignments (list): list of tuples corresponding to assignments
+
+    Returns:
+        list: ids of assignments
+    """
+    assignment_ids = [assignment_id(assignment) for assignment in assignments]
+    move_redated_assignments(con, assignments)
+    changed = con.executemany('''INSERT INTO assignments
+                              (id, course_code, assignment_type, assignment_name, due_date,
+                                  links_info)
+                              VALUES (?, ?, ?, ?, ?, ?)
+                              ON CONFLICT (id) DO UPDATE SET
+                                  assignment_type = excluded.assignment_type,
+                                  due_date = excluded.due_date,
+                                  links_info = excluded.links_info
+                              WHERE assignment_type IS NOT excluded.assignment_type
+                                  OR due_date IS NOT excluded.due_date
+                                  OR links_info IS NOT excluded.links_info''',
+                              [(id_, assignment[0], assignment[1], assignment[2], assignment[3],
+                                json.dumps(assignment[4]))
+                               for id_, assignment in zip(assignment_ids, assignments)]).rowcount
+    if changed:
+        increment_course_scrape_versions(con, {assignment[0] for assignment in assignments})
+    return assignment_ids
 
 def add_pending_assignments(username: str, course_code: str, assignments: list) -> None:
     """Adds the assignments to the list of user's pending assignments.
 
+    Assignments the user already holds keep their status.
+
     Args:
         username (str): user with new pending assignments
         course_code (str): course to which new pending assignments belong
         assignments (list): list of tuples corresponding to new pending assignments
     """
-    pending_assignments = get_pending_assignments(username)
-    if course_code not in pending_assignments:
-        pending_assignments[course_code] = []
-    pending_assignments[course_code].extend(assignments)
-    pending_assignments_json = json.dumps(pending_assignments)
     with get_db_connection(USER_ASSIGNMENTS_DB) as con:
-        con.execute('''UPDATE user_assignments SET pending_assignments_data = ?
-                    WHERE username = ?''', (pending_assignments_json, username))
+        con.execute('''INSERT OR IGNORE INTO user_assignment_courses (username, course_code)
+                    VALUES (?, ?)''', (username, course_code))
+        assignment_ids = upsert_assignments(con, assignments)
+        con.executemany('''INSERT OR IGNORE INTO user_assignment_status
+                        (username, assignment_id, course_code, status, due_date)
+                        VALUES (?, ?, ?, ?, ?)''',
+                        [(username, id_, course_code, ASSIGNMENT_PENDING, assignment[3])
+                         for id_, assignment in zip(assignment_ids, assignments)])
+        increment_user_state_version(con, username)
+        con.commit()
+
+def update_shared_assignments(assignments: list) -> None:
+    """Updates the stored information of assignments already held by users, so that every user
+    sees the latest scrape of the assignments.
+
+    Re-dated assignments are moved to their new due date in every user's views. The scrape
+    version of every course with changed assignments is incremented.
+
+    Args:
+        assignments (list): list of tuples corresponding to scraped assignments
+    """
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        move_redated_assignments(con, assignments)
+        changed = con.executemany('''UPDATE assignments
+                                  SET assignment_type = ?1, due_date = ?2, links_info = ?3
+                                  WHERE id = ?4
+                                      AND (assignment_type IS NOT ?1 OR due_date IS NOT ?2
+                                          OR links_info IS NOT ?3)''',
+                                  [(assignment[1], assignment[3], json.dumps(assignment[4]),
+                                    assignment_id(assignment))
+                                   for assignment in assignments]).rowcount
+        if changed:
+            increment_course_scrape_versions(con, {assignment[0] for assignment in assignments})
+        con.commit()
+
+def update_assignment_status(
+    username: str,
+    marked_assignment_id: str,
+    old_status: str,
+    new_status: str) -> bool:
+    """Changes the status of one of the user's assignments from old_status to new_status.
+
+    The assignment is looked up by its stable id in the user's unique assignment index, so exactly
+    the marked assignment is changed or nothing is changed at all.
+
+    Args:
+        username (str): username of user
+        marked_assignment_id (str): stable id of assignment
+        old_status (str): current status of assignment
+        new_status (str): new status of assignment
+
+    Returns:
+        bool: true if the status of the assignment was changed otherwise false
+    """
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        updated = con.execute('''UPDATE user_assignment_status SET status = ?
+                              WHERE username = ? AND assignment_id = ? AND status = ?''',
+                              (new_status, username, marked_assignment_id, old_status)).rowcount
+        if updated:
+            increment_user_state_version(con, username)
+        con.commit()
+    return updated == 1
+
+def update_assignments_status(
+    username: str,
+    assignment_ids: list,
+    old_status: str,
+    new_status: str) -> int:
+    """Changes the status of several of the user's assignments from old_status to new_status.
+
+    Args:
+        username (str): username of user
+        assignment_ids (list): stable ids of assignments
+        old_status (str): current status of assignments
+        new_status (str): new status of assignments
+
+    Returns:
+        int: number of assignments whose status was changed
+    """
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        updated = con.executemany('''UPDATE user_assignment_status SET status = ?
+                                  WHERE username = ? AND assignment_id = ? AND status = ?''',
+                                  [(new_status, username, marked_assignment_id, old_status)
+                                   for marked_assignment_id in set(assignment_ids)]).rowcount
+        if updated:
+            increment_user_state_version(con, username)
         con.commit()
+    return updated
 
-def update_pending_assignments(username: str, pending_assignments_data: str) -> None:
-    """Replaces existing pending assignment data with new input data.
+def update_past_due_assignments_status(
+    username: str,
+    due_before: str,
+    old_status: str,
+    new_status: str) -> int:
+    """Changes the status of all of the user's assignments due before due_before from old_status
+    to new_status.
+
+    Assignments without a due date are never due before due_before.
 
     Args:
-        username (str): user whose pending assignments are to be updated
-        pending_assignments_data (str): new pending assignment data
+        username (str): username of user
+        due_before (str): assignments due before this date are changed
+        old_status (str): current status of assignments
+        new_status (str): new status of assignments
+
+    Returns:
+        int: number of assignments whose status was changed
+    """
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        updated = con.execute('''UPDATE user_assignment_status SET status = ?
+                              WHERE username = ? AND status = ?
+                                  AND due_date > '' AND due_date < ?''',
+                              (new_status, username, old_status, due_before)).rowcount
+        if updated:
+            increment_user_state_version(con, username)
+        con.commit()
+    return updated
+
+def update_course_assignments_status(
+    username: str,
+    course_code: str,
+    old_status: str,
+    new_status: str) -> int:
+    """Changes the status of all of the user's assignments of a course from old_status to
+    new_status.
+
+    Args:
+        username (str): username of user
+        course_code (str): course to which assignments belong
+        old_status (str): current status of assignments
+        new_status (str): new status of assignments
+
+    Returns:
+        int: number of assignments whose status was changed
     """
     with get_db_connection(USER_ASSIGNMENTS_DB) as con:
-        con.execute('''UPDATE user_assignments SET pending_assignments_data = ?
-                    WHERE username = ?''', (pending_assignments_data, username))
+        updated = con.execute('''UPDATE user_assignment_status SET status = ?
+                              WHERE username = ? AND course_code = ? AND status = ?''',
+                              (new_status, username, course_code, old_status)).rowcount
+        if updated:
+            increment_user_state_version(con, username)
         con.commit()
+    return updated
+
+def remove_user_course_assignments(username: str, course_codes: list) -> None:
+    """Removes all of the user's pending and completed assignments of the courses.
 
-def update_completed_assignments(username: str, completed_assignments_data: str) -> None:
-    """Replaces existing completed assignment data with new input data.
+    The shared assignments stay stored for other users of the courses.
 
     Args:
-        username (str): user whos completed assignments are to be updated
-        completed_assignments_data (str): new completed assignment data
+        username (str): username of user
+        course_codes (list): course codes of removed courses
     """
     with get_db_connection(USER_ASSIGNMENTS_DB) as con:
-        con.execute('''UPDATE user_assignments SET completed_assignments_data = ?
-                    WHERE username = ?''', (completed_assignments_data, username))
+        for course_code in course_codes:
+            con.execute('''DELETE FROM user_assignment_status
+                        WHERE username = ? AND course_code = ?''', (username, course_code))
+            con.execute('''DELETE FROM user_assignment_courses
+                        WHERE username = ? AND course_code = ?''', (username, course_code))
+        increment_user_state_version(con, username)
         con.commit()
 
-def add_completed_assignment(username: str, completed_assignment: tuple) -> None:
-    """Add an assignment to user's completed assignments.
+def remove_user_assignments(username: str, assignment_ids: list) -> None:
+    """Removes the assignments from the user's pending and completed assignments.
+
+    The shared assignments stay stored for other users of their courses.
 
     Args:
         username (str): username of user
-        completed_assignment (tuple): information of completed assignment
+        assignment_ids (list): stable ids of removed assignments
     """
-    completed_assignments = get_completed_assignments(username)
-    course_code = completed_assignment[0]
-    if course_code not in completed_assignments:
-        completed_assignments[course_code] = []
-    completed_assignments[course_code].append(completed_assignment)
-    completed_assignments_data = json.dumps(completed_assignments)
-    update_completed_assignments(username, completed_assignments_data)
+    with get_db_connection(USER_ASSIGNMENTS_DB) as con:
+        con.executemany('''DELETE FROM user_assignment_status
+                        WHERE username = ? AND assignment_id = ?''',
+                        [(username, id_) for id_ in assignment_ids])
+        increment_user_state_version(con, username)
+        con.commit()
 
 def initialize_user_info(reset: bool = False) -> None:
     """Creates all user databases if they do not exist already.
@@ -352,14 +820,17 @@ def get_course_link(course_code: str) -> str:
     Returns:
         str: url of webpage of course
     """
-    try:
-        with get_db_connection(COURSES_DB) as con:
-            course_url = (
-                con
-                .execute('SELECT course_link FROM courses WHERE course_code = ?',
-                         (course_code,))
-                .fetchone())
-            return course_url[0]
-    except Exception:
-        return None
-    
\ No newline at end of file
+    return COURSE_CATALOG.get_course_link(course_code)
+
+def get_course_name(course_code: str) -> str:
+    """Returns name of course.
+    
+    Returns None if there is no entry in courses database corresponding to course_code.
+
+    Args:
+        course_code (str): course_code of course
+
+    Returns:
+        str: name of course
+    """
+    return COURSE_CATALOG.get_course_name(course_code)
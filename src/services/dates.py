@@ -2,27 +2,31 @@
 
 from datetime import date
 import calendar
+import functools
+import re
 from services.constants import YEAR
-from services.constants import MONTH_CODES
+from services.constants import MONTH_CODES, DATE_CACHE_SIZE
 
-def convert_date_to_code(month: str, day: str) -> date:
-    """Converts input month and day strings a date object.
+# Pattern of dates in the form 'Mon DD'
+MONTH_DAY_PATTERN = re.compile(r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s\d{2}')
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def resolve_month_day(month: str, day: str) -> date:
+    """Converts lowercase month and day prefixes to a date object.
     
     If month is invalid, None is returned.
 
     Args:
-        month (str): month of date
-        day (str): day of date
+        month (str): first three characters of lowercase month of date
+        day (str): first two characters of lowercase day of date
 
     Returns:
         date: date object representing input
     """
     try:
-        month = month.lower()
-        day = day.lower()[:2]
         if not day[-1].isdigit():
             day = day[0]
-        month_code = MONTH_CODES[month[:3]]
+        month_code = MONTH_CODES[month]
         if len(day) < 2:
             day = f'0{day}'
         elif int(day) > calendar.monthrange(YEAR, int(month_code))[1]:
@@ -31,6 +35,84 @@ def convert_date_to_code(month: str, day: str) -> date:
     except Exception:
         return None
 
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def resolve_date_code(date_code: str) -> date:
+    """Returns a date object corresponding to an incomplete date_code input.
+    
+    Args:
+        date_code (str): incomplete date code
+
+    Returns:
+        date: date object corresponding to date in date_code
+    """
+    if '/' not in date_code:
+        return None
+    date_parts = date_code.split('/')
+    month = date_parts[0]
+    day = date_parts[1]
+    if len(month) == 1:
+        month = f'0{month}'
+    if len(day) == 1:
+        day =f'0{day}'
+    return date.fromisoformat(f'{YEAR}-{month}-{day}')
+
+def build_month_day_table() -> dict:
+    """Returns dates of YEAR for every common month and day prefix pair, for example
+    ('jan', '26'), ('jan', '05') and ('jan', '5t') for 'Jan 5th'.
+
+    Returns:
+        dict: map from month and day prefix pair to date object
+    """
+    day_keys = set()
+    for day in range(1, 32):
+        day_keys.update([str(day), f'{day:02}'])
+        day_keys.update((f'{day}{suffix}')[:2] for suffix in ['st', 'nd', 'rd', 'th'])
+    return {
+        (month, day): resolve_month_day.__wrapped__(month, day)
+        for month in MONTH_CODES
+        for day in day_keys
+    }
+
+def build_date_code_table() -> dict:
+    """Returns dates of YEAR for every date code in the forms 'M/D', 'MM/D', 'M/DD' and 'MM/DD'.
+
+    Returns:
+        dict: map from date code to date object
+    """
+    date_code_table = {}
+    for month in range(1, 13):
+        for day in range(1, calendar.monthrange(YEAR, month)[1] + 1):
+            for month_key in {str(month), f'{month:02}'}:
+                for day_key in {str(day), f'{day:02}'}:
+                    date_code = f'{month_key}/{day_key}'
+                    date_code_table[date_code] = resolve_date_code.__wrapped__(date_code)
+    return date_code_table
+
+# Dates of YEAR precomputed for the month and day and date code forms found on course websites.
+# Other inputs are converted once and kept in bounded caches.
+MONTH_DAY_TABLE = build_month_day_table()
+DATE_CODE_TABLE = build_date_code_table()
+
+def convert_date_to_code(month: str, day: str) -> date:
+    """Converts input month and day strings a date object.
+    
+    If month is invalid, None is returned.
+
+    Args:
+        month (str): month of date
+        day (str): day of date
+
+    Returns:
+        date: date object representing input
+    """
+    try:
+        month_day = (month.lower()[:3], day.lower()[:2])
+    except Exception:
+        return None
+    if month_day in MONTH_DAY_TABLE:
+        return MONTH_DAY_TABLE[month_day]
+    return resolve_month_day(*month_day)
+
 def convert_date_string(date_str: str) -> date:
     """Converts an input date string in the form 'Mon' to a date object.
 
@@ -57,13 +139,43 @@ def format_date_code(date_code: str) -> date:
     Returns:
         date: date object corresponding to date in date_code
     """
-    if '/' not in date_code:
-        return None
-    date_parts = date_code.split('/')
-    month = date_parts[0]
-    day = date_parts[1]
-    if len(month) == 1:
-        month = f'0{month}'
-    if len(day) == 1:
-        day =f'0{day}'
-    return date.fromisoformat(f'{YEAR}-{month}-{day}')
+    if date_code in DATE_CODE_TABLE:
+        return DATE_CODE_TABLE[date_code]
+    return resolve_date_code(date_code)
+
+def convert_date_strings(date_strs: list) -> list:
+    """Converts a column of date strings in the form 'Mon DD' to date objects.
+
+    Args:
+        date_strs (list): date strings to be converted
+
+    Returns:
+        list: date objects representing input date strings
+    """
+    return [convert_date_string(date_str) for date_str in date_strs]
+
+def format_date_codes(date_codes: list) -> list:
+    """Returns date objects corresponding to a column of incomplete date codes.
+
+    Args:
+        date_codes (list): incomplete date codes
+
+    Returns:
+        list: date objects corresponding to dates in date_codes
+    """
+    return [format_date_code(date_code) for date_code in date_codes]
+
+def in_scope(scope_date: date, curr_date: date) -> bool:
+    """Returns true if an assignment which comes into scope on scope_date is in scope on
+    curr_date.
+    
+    All assignments are in scope if curr_date is None.
+
+    Args:
+        scope_date (date): date assignment comes into scope
+        curr_date (date): date for assignments in scope
+
+    Returns:
+        bool: true if assignment is in scope otherwise false
+    """
+    return curr_date is None or scope_date <= curr_date
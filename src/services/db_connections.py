@@ -0,0 +1,221 @@
+'''Module containing the pool of database connections and the transactions shared by all database
+handling functions.'''
+
+import contextlib
+import functools
+import os
+import queue
+import sqlite3
+import threading
+import time
+from services.constants import DB_STATEMENT_CACHE_SIZE, DB_POOL_SIZE
+from services.constants import DB_CONSOLIDATED, CONSOLIDATED_DB, CONSOLIDATED_DB_PRAGMAS
+from services.constants import DB_CAS_ATTEMPTS, DB_CAS_RETRY_DELAY
+from services.exceptions import ConcurrentUpdate
+
+class ConnectionPool:
+    '''Pool of open database connections shared by all threads.
+
+    Connections are checked out by a thread and returned once the thread is done with them, for
+    example at the end of a request, so that the next request reuses them no matter which thread
+    handles it. At most max_idle idle connections are kept open per database, connections
+    returned beyond that are closed.'''
+
+    def __init__(self, max_idle: int = DB_POOL_SIZE):
+        self.max_idle = max_idle
+        self.idle_connections = {}
+        self.lock = threading.Lock()
+
+    def idle_queue(self, db_path: str) -> queue.LifoQueue:
+        """Returns the queue of idle connections to a database.
+
+        Args:
+            db_path (str): absolute path of database file
+
+        Returns:
+            queue.LifoQueue: idle connections to database, most recently returned last
+        """
+        with self.lock:
+            idle_queue = self.idle_connections.get(db_path)
+            if idle_queue is None:
+                idle_queue = self.idle_connections[db_path] = queue.LifoQueue(self.max_idle)
+            return idle_queue
+
+    def check_out(self, db_path: str) -> sqlite3.Connection:
+        """Returns an idle connection to a database, opening a new one if none is idle.
+
+        Args:
+            db_path (str): absolute path of database file
+
+        Returns:
+            sqlite3.Connection: connection to database
+        """
+        try:
+            return self.idle_queue(db_path).get_nowait()
+        except queue.Empty:
+            pass
+        con = sqlite3.connect(db_path, cached_statements=DB_STATEMENT_CACHE_SIZE,
+                              check_same_thread=False)
+        con.row_factory = sqlite3.Row
+        if DB_CONSOLIDATED:
+            for pragma, value in CONSOLIDATED_DB_PRAGMAS.items():
+                con.execute(f'PRAGMA {pragma} = {value}')
+        return con
+
+    def check_in(self, db_path: str, con: sqlite3.Connection) -> None:
+        """Returns a connection to the pool, rolling back any transaction left open on it.
+
+        Args:
+            db_path (str): absolute path of database file
+            con (sqlite3.Connection): connection to database
+        """
+        if con.in_transaction:
+            con.rollback()
+        try:
+            self.idle_queue(db_path).put_nowait(con)
+        except queue.Full:
+            con.close()
+
+    def close(self) -> None:
+        """Closes all idle connections."""
+        with self.lock:
+            idle_queues = list(self.idle_connections.values())
+            self.idle_connections.clear()
+        for idle_queue in idle_queues:
+            while not idle_queue.empty():
+                idle_queue.get_nowait().close()
+
+# open database connections of the process
+DB_POOL = ConnectionPool()
+
+# database connections checked out and open transaction of each thread, reused by every database
+# function called by the thread until the connections are returned to the pool
+THREAD_CONNECTIONS = threading.local()
+
+class TransactionConnection:
+    '''Connection handed out inside of transaction(). Commits are deferred until the transaction
+    ends, so that every database function called inside of it takes part in the same
+    transaction.'''
+
+    def __init__(self, con: sqlite3.Connection):
+        self.con = con
+
+    def __getattr__(self, name: str):
+        return getattr(self.con, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        return None
+
+    def commit(self) -> None:
+        """Does nothing, the transaction is committed once it ends."""
+
+def get_db_connection(db_file: str):
+    '''
+    Function to get a database connection
+
+    The first call of a thread checks out a connection to the database from DB_POOL, which is
+    reused by every later call of the thread until release_db_connections returns it to the
+    pool, so no connection is opened per query or per request. Using the connection as a context
+    manager commits or rolls back the current transaction without closing the connection.
+
+    If DB_CONSOLIDATED is set, every db_file is stored in CONSOLIDATED_DB instead.
+    
+    Keyword arguments:
+    db_file -- .db file representing the database
+    '''
+    connections = getattr(THREAD_CONNECTIONS, 'connections', None)
+    if connections is None:
+        connections = THREAD_CONNECTIONS.connections = {}
+    db_path = os.path.abspath(CONSOLIDATED_DB if DB_CONSOLIDATED else db_file)
+    con = connections.get(db_path)
+    if con is None:
+        con = connections[db_path] = DB_POOL.check_out(db_path)
+    transaction_connections = getattr(THREAD_CONNECTIONS, 'transaction', None)
+    if transaction_connections is None:
+        return con
+    if db_path not in transaction_connections:
+        if DB_CONSOLIDATED and not con.in_transaction:
+            con.execute('BEGIN IMMEDIATE')
+        transaction_connections[db_path] = con
+    return TransactionConnection(con)
+
+@contextlib.contextmanager
+def transaction():
+    '''
+    Runs every database function called inside of the block in one transaction, which is
+    committed once the block ends or rolled back if the block raises.
+
+    If DB_CONSOLIDATED is set, all tables share one database, so the block is atomic and pays for
+    a single commit. Otherwise every database file touched commits once at the end of the block.
+    Transactions opened inside of a transaction join the outer transaction.
+    '''
+    if getattr(THREAD_CONNECTIONS, 'transaction', None) is not None:
+        yield
+        return
+    THREAD_CONNECTIONS.transaction = {}
+    try:
+        yield
+    except BaseException:
+        for con in THREAD_CONNECTIONS.transaction.values():
+            con.rollback()
+        raise
+    else:
+        for con in THREAD_CONNECTIONS.transaction.values():
+            con.commit()
+    finally:
+        THREAD_CONNECTIONS.transaction = None
+
+def retry_on_conflict(function):
+    '''
+    Decorator retrying a read-modify-write function whenever its compare-and-swap write fails
+    with ConcurrentUpdate because another writer changed the data it read.
+
+    The function is attempted up to DB_CAS_ATTEMPTS times, waiting a little longer before every
+    retry. Inside of a transaction the function is not retried, since the enclosing transaction
+    would still hold the changes made before the conflict.
+    '''
+    @functools.wraps(function)
+    def retried_function(*args, **kwargs):
+        if getattr(THREAD_CONNECTIONS, 'transaction', None) is not None:
+            return function(*args, **kwargs)
+        for attempt in range(DB_CAS_ATTEMPTS):
+            try:
+                return function(*args, **kwargs)
+            except ConcurrentUpdate:
+                if attempt == DB_CAS_ATTEMPTS - 1:
+                    raise
+                time.sleep(DB_CAS_RETRY_DELAY * 2 ** attempt)
+    return retried_function
+
+def checkpoint_wal() -> None:
+    '''
+    Copies every change in the write-ahead log of CONSOLIDATED_DB into the database and truncates
+    the log, so that it does not keep growing while readers are active during automatic
+    checkpoints. Does nothing unless DB_CONSOLIDATED is set.
+    '''
+    if DB_CONSOLIDATED:
+        get_db_connection(CONSOLIDATED_DB).execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+def release_db_connections() -> None:
+    '''
+    Returns the connections checked out by the current thread to the connection pool, rolling
+    back any transaction left open on them, so that they can be reused by any thread.
+    '''
+    connections = getattr(THREAD_CONNECTIONS, 'connections', {})
+    for db_path, con in connections.items():
+        DB_POOL.check_in(db_path, con)
+    connections.clear()
+
+def close_db_connections() -> None:
+    '''
+    Closes all connections checked out by the current thread and all idle connections of the
+    connection pool.
+    '''
+    connections = getattr(THREAD_CONNECTIONS, 'connections', {})
+    for con in connections.values():
+        con.close()
+    connections.clear()
+    DB_POOL.close()
@@ -11,3 +11,12 @@ class CourseAlreadySelected(Exception):
 
 class NoCourseSelected(Exception):
     '''Error indicating no course has been selected.'''
+
+class AssignmentNotFound(Exception):
+    '''Error indicating assignment is not in user's list.'''
+
+class ConcurrentUpdate(Exception):
+    '''Error indicating data changed between reading it and writing it.'''
+
+class InvalidCursor(Exception):
+    '''Error indicating a page cursor was not returned by a previous page.'''
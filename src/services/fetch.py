@@ -0,0 +1,200 @@
+'''Module containing all course website fetching functions.'''
+
+import codecs
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from services.db_connections import release_db_connections
+from services.scrape_database import get_course_page, store_course_page, touch_course_page
+from services.constants import SCRAPE_TIMEOUT, FETCH_WORKERS, FETCH_MAX_PER_HOST
+from services.constants import FETCH_RATE, FETCH_BURST, STREAM_CHUNK_SIZE
+
+class TokenBucket:
+    '''Rate limiter allowing bursts of up to capacity requests followed by rate requests per
+    second.'''
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and consumes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+# Session reusing keep-alive connections to course websites between fetches
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_maxsize=FETCH_WORKERS))
+SESSION.mount('https://', HTTPAdapter(pool_maxsize=FETCH_WORKERS))
+
+# Thread pool shared by all concurrent course website fetches
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='course-fetch')
+
+# Rate limiter shared by all course website fetches
+FETCH_RATE_LIMIT = TokenBucket(FETCH_RATE, FETCH_BURST)
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def host_semaphore(course_link: str) -> threading.BoundedSemaphore:
+    """Returns semaphore limiting the number of concurrent requests to the host of course_link.
+
+    Args:
+        course_link (str): url of course page
+
+    Returns:
+        threading.BoundedSemaphore: semaphore of host
+    """
+    host = urlsplit(course_link).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(FETCH_MAX_PER_HOST)
+        return _host_semaphores[host]
+
+def run_and_release_connections(function, *args):
+    """Calls function and returns the database connections it used to the connection pool.
+
+    Used for every call made on the shared fetch thread pool, whose threads outlive the calls.
+
+    Args:
+        function (Callable): function to call
+        *args: inputs of function
+
+    Returns:
+        object: output of function
+    """
+    try:
+        return function(*args)
+    finally:
+        release_db_connections()
+
+def submit_fetch(function, *args) -> Future:
+    """Calls function on the shared fetch thread pool without waiting for it.
+
+    Args:
+        function (Callable): function to call
+        *args: inputs of function
+
+    Returns:
+        Future: future of output of function
+    """
+    return FETCH_EXECUTOR.submit(run_and_release_connections, function, *args)
+
+def map_concurrently(function, items: list) -> list:
+    """Applies function to every item on the shared fetch thread pool.
+
+    Args:
+        function (Callable): function to apply
+        items (list): inputs of function
+
+    Returns:
+        list: outputs of function in the same order as items
+    """
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    return list(FETCH_EXECUTOR.map(
+        lambda item: run_and_release_connections(function, item), items))
+
+def content_hash(page_content: bytes) -> str:
+    """Returns hash identifying the content of a course page.
+
+    Args:
+        page_content (bytes): raw content of course page
+
+    Returns:
+        str: hex digest of page content
+    """
+    return hashlib.sha256(page_content).hexdigest()
+
+def fetch_course_page(course_link: str) -> tuple:
+    """Fetches the course page at course_link and stores it in the course page store.
+
+    If the course page has been fetched before, the request is made conditional on the stored
+    ETag and Last-Modified headers so that an unchanged page is not downloaded again. Returns
+    None if the course page could not be fetched.
+
+    Args:
+        course_link (str): url of course page
+
+    Returns:
+        tuple: html text and content hash of course page
+    """
+    stored_page = get_course_page(course_link)
+    headers = {}
+    if stored_page:
+        if stored_page['etag']:
+            headers['If-None-Match'] = stored_page['etag']
+        if stored_page['last_modified']:
+            headers['If-Modified-Since'] = stored_page['last_modified']
+    try:
+        with host_semaphore(course_link):
+            FETCH_RATE_LIMIT.acquire()
+            response = SESSION.get(course_link, headers=headers, timeout=SCRAPE_TIMEOUT)
+    except requests.RequestException:
+        return None
+    if response.status_code == 304 and stored_page:
+        touch_course_page(course_link)
+        return stored_page['page_text'], stored_page['content_hash']
+    if response.status_code != 200:
+        return None
+    page_hash = content_hash(response.content)
+    store_course_page(
+        course_link,
+        response.text,
+        response.headers.get('ETag'),
+        response.headers.get('Last-Modified'),
+        page_hash)
+    return response.text, page_hash
+
+def stream_course_page(course_link: str):
+    """Yields the html text of the course page at course_link in chunks as it is downloaded.
+
+    The course page is stored in the course page store once all of it has been read, so a caller
+    can stop reading early and leave the rest of the response to be read later, for example on
+    the fetch thread pool, without requesting the course page again. The connection is closed
+    once the generator is closed. Nothing is yielded if the course page could not be fetched.
+
+    Args:
+        course_link (str): url of course page
+
+    Yields:
+        str: chunk of html text of course page
+    """
+    try:
+        with host_semaphore(course_link):
+            FETCH_RATE_LIMIT.acquire()
+            with SESSION.get(course_link, timeout=SCRAPE_TIMEOUT, stream=True) as response:
+                if response.status_code != 200:
+                    return
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')('replace')
+                page_hash = hashlib.sha256()
+                text_chunks = []
+                for page_content in response.iter_content(STREAM_CHUNK_SIZE):
+                    page_hash.update(page_content)
+                    text_chunks.append(decoder.decode(page_content))
+                    yield text_chunks[-1]
+                text_chunks.append(decoder.decode(b'', final=True))
+                yield text_chunks[-1]
+    except requests.RequestException:
+        return
+    store_course_page(
+        course_link,
+        ''.join(text_chunks),
+        response.headers.get('ETag'),
+        response.headers.get('Last-Modified'),
+        page_hash.hexdigest())
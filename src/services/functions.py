@@ -1,17 +1,22 @@
 '''This module contains helper functions used in the app.'''
 
 from datetime import date
-import json
 from werkzeug.security import generate_password_hash, check_password_hash
 from services.database import user_exists, add_new_user, get_hashed_password
-from services.database import list_user_courses, user_courses_db_contains_user
-from services.database import add_new_user_course_list, update_user_course_list
-from services.database import add_new_user_to_user_assignments, add_pending_assignments
-from services.database import get_pending_assignments, update_pending_assignments
-from services.database import add_completed_assignment, update_completed_assignments
-from services.database import get_completed_assignments
+from services.database import list_user_courses, add_user_course, remove_user_course
+from services.database import add_pending_assignments, list_user_assignment_courses
+from services.database import user_assignment_ids_by_course, remove_user_assignments
+from services.database import update_shared_assignments
+from services.database import update_assignment_status, remove_user_course_assignments
+from services.database import update_assignments_status, update_past_due_assignments_status
+from services.database import update_course_assignments_status
+from services.database import get_user_state_version, claim_user_state_version
+from services.database import bump_user_state_versions
+from services.db_connections import transaction, retry_on_conflict
 from services.exceptions import InvalidCredentials, InvalidUsername, CourseAlreadySelected
-from services.assignment_data import course_assignment_data
+from services.exceptions import AssignmentNotFound
+from services.assignment_data import courses_assignment_data, refreshed_course_assignments
+from services.constants import ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED
 
 def register_user(username: str, password: str) -> None:
     '''
@@ -25,11 +30,11 @@ def register_user(username: str, password: str) -> None:
     password -- entered password
     '''
     hashed_password = generate_password_hash(password)
-    if user_exists(username):
-        raise InvalidUsername
-    else:
-        add_new_user(username, hashed_password)
-        add_new_user_to_user_assignments(username)
+    with transaction():
+        if user_exists(username):
+            raise InvalidUsername
+        else:
+            add_new_user(username, hashed_password)
 
 def login_user(username: str, password: str) -> None:
     '''
@@ -58,18 +63,10 @@ def add_course_to_user(username: str, course_code: str) -> None:
         username (str): user to whom course should be added
         course_code (str): code of course to be added to user
     """
-    if not user_courses_db_contains_user(username):
-        user_course_list = [course_code]
-        new_user_courses_json = json.dumps(user_course_list)
-        add_new_user_course_list(username, new_user_courses_json)
-    else:
-        user_course_list = list_user_courses(username)
-        if course_code in user_course_list:
+    with transaction():
+        if not add_user_course(username, course_code):
             raise CourseAlreadySelected
-        else:
-            user_course_list.append(course_code)
-            new_user_courses_json = json.dumps(user_course_list)
-            update_user_course_list(username, new_user_courses_json)
+        bump_user_state_versions([username])
 
 def remove_course_from_user(username: str, course_code: str) -> None:
     """Removes a course from user's course list.
@@ -78,101 +75,210 @@ def remove_course_from_user(username: str, course_code: str) -> None:
         username (str): user from whom course should be deleted
         course_code (str): code of course to be deleted from user
     """
-    user_course_list = list_user_courses(username)
-    user_course_list.remove(course_code)
-    new_user_courses_json = json.dumps(user_course_list)
-    update_user_course_list(username, new_user_courses_json)
+    with transaction():
+        if remove_user_course(username, course_code):
+            bump_user_state_versions([username])
 
+@retry_on_conflict
 def add_new_course_assignments(username: str, curr_date: date, test: bool=False) -> None:
     """Add assignments of newly added courses to user's pending assignment list.
 
+    Assignments are only added if no other writer changed the user's assignments since they were
+    read, otherwise the function is retried.
+
     Args:
         username (str): user adding a new course
         curr_date (date): date for assignments in scope
         test (bool): indicator whether function is being used in a test
     """
+    version = get_user_state_version(username)
     user_course_list = list_user_courses(username)
-    user_pending_assignments = get_pending_assignments(username)
+    user_assignment_courses = set(list_user_assignment_courses(username))
     new_user_courses = []
     for course in user_course_list:
-        if course not in user_pending_assignments:
+        if course not in user_assignment_courses:
             new_user_courses.append(course)
-    for course_code in new_user_courses:
-        assignments = course_assignment_data(course_code, curr_date, test)
-        add_pending_assignments(username, course_code, assignments)
+    if not new_user_courses:
+        return
+    new_course_assignments = courses_assignment_data(new_user_courses, curr_date, test)
+    with transaction():
+        claim_user_state_version(username, version)
+        for course_code in new_user_courses:
+            add_pending_assignments(username, course_code, new_course_assignments[course_code])
+
+@retry_on_conflict
+def add_refreshed_assignments(username: str, curr_date: date) -> None:
+    """Reconcile user's assignments with the latest scrapes of the user's courses.
+
+    Assignments released since the courses were last scraped are added to the user's pending
+    assignment list, changed assignments are updated and assignments no longer on their course
+    website are removed. Only the latest scrapes in the scrape cache are used, so no course
+    website is fetched. Courses whose latest scrape holds no assignments are left unchanged, since
+    the course website most likely failed to scrape. The user's assignments are only changed if no
+    other writer changed them since they were read, otherwise the function is retried.
 
+    Args:
+        username (str): username of user
+        curr_date (date): date for assignments in scope
+    """
+    version = get_user_state_version(username)
+    user_assignment_ids = user_assignment_ids_by_course(username)
+    new_course_assignments = {}
+    known_assignments = []
+    removed_assignment_ids = []
+    for course_code in list_user_assignment_courses(username):
+        refreshed_assignments = refreshed_course_assignments(course_code, curr_date)
+        if not refreshed_assignments:
+            continue
+        course_assignment_ids = user_assignment_ids.get(course_code, set())
+        new_assignments = []
+        for assignment_info in refreshed_assignments:
+            if assignment_info.id in course_assignment_ids:
+                known_assignments.append(assignment_info)
+            else:
+                new_assignments.append(assignment_info)
+        if new_assignments:
+            new_course_assignments[course_code] = new_assignments
+        refreshed_ids = {assignment_info.id for assignment_info in refreshed_assignments}
+        removed_assignment_ids.extend(course_assignment_ids - refreshed_ids)
+    with transaction():
+        if new_course_assignments or removed_assignment_ids:
+            claim_user_state_version(username, version)
+        if known_assignments:
+            # Known assignments are shared with other users, so they are updated in place
+            update_shared_assignments(known_assignments)
+        for course_code, new_assignments in new_course_assignments.items():
+            add_pending_assignments(username, course_code, new_assignments)
+        if removed_assignment_ids:
+            remove_user_assignments(username, removed_assignment_ids)
+
+@retry_on_conflict
 def remove_course_assignments(username: str) -> None:
     """Remove course assignments of removed courses from both pending and completed lists.
 
+    Assignments are only removed if no other writer changed the user's assignments since they
+    were read, otherwise the function is retried.
+
     Args:
         username (str): username of user
     """
+    version = get_user_state_version(username)
     user_course_list = list_user_courses(username)
-    user_pending_assignments = get_pending_assignments(username)
-    user_completed_assignments = get_completed_assignments(username)
-    removed_courses_pending = []
-    removed_courses_completed = []
-    for course in user_pending_assignments:
-        if course not in user_course_list:
-            removed_courses_pending.append(course)
-    for course in user_completed_assignments:
-        if course not in user_course_list:
-            removed_courses_completed.append(course)
-    for course in removed_courses_pending:
-        del user_pending_assignments[course]
-    for course in removed_courses_completed:
-        del user_completed_assignments[course]
-    pending_assignments_data = json.dumps(user_pending_assignments)
-    completed_assignments_data = json.dumps(user_completed_assignments)
-    update_pending_assignments(username, pending_assignments_data)
-    update_completed_assignments(username, completed_assignments_data)
-
-def mark_assignment_complete(username: str, minimum_assignment_info_str: str) -> None:
+    removed_courses = [
+        course for course in list_user_assignment_courses(username)
+        if course not in user_course_list
+    ]
+    if not removed_courses:
+        return
+    with transaction():
+        claim_user_state_version(username, version)
+        remove_user_course_assignments(username, removed_courses)
+
+def mark_assignment_complete(username: str, marked_assignment_id: str) -> None:
     """Move selected assignment from user's pending assignments list to user's completed assignments
     list.
 
+    If the assignment is not in user's pending assignments list, an AssignmentNotFound exception is
+    raised.
+
     Args:
         username (str): username of user
-        minimum_assignment_info (str): double bar separated string list containing course, name,
-        and due_date of assignment to move
+        marked_assignment_id (str): stable id of assignment to move
     """
-    minimum_assignment_info = minimum_assignment_info_str.split('||')
-    pending_assignments = get_pending_assignments(username)
-    course_code = minimum_assignment_info[0]
-    assignment_name = minimum_assignment_info[1]
-    due_date = minimum_assignment_info[2]
-    assignment_index = 0
-    for i, assignment_info in enumerate(pending_assignments[course_code]):
-        if assignment_info[2] == assignment_name and assignment_info[3] == due_date:
-            assignment_index = i
-            break
-    add_completed_assignment(username, pending_assignments[course_code][assignment_index])
-    del pending_assignments[course_code][assignment_index]
-    pending_assignments_data = json.dumps(pending_assignments)
-    update_pending_assignments(username, pending_assignments_data)
-
-def mark_assignment_incomplete(username: str, minimum_assignment_info_str: str) -> None:
+    if not update_assignment_status(username, marked_assignment_id,
+                                    ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED):
+        raise AssignmentNotFound
+
+def mark_assignment_incomplete(username: str, marked_assignment_id: str) -> None:
     """Move selected assignment from user's completed assignments list to user's pending
     assignments list.
 
+    If the assignment is not in user's completed assignments list, an AssignmentNotFound exception
+    is raised.
+
     Args:
         username (str): username of user
-        minimum_assignment_info_str (str): double bar separated string list containing course, name,
-        and due_date of assignment to move
+        marked_assignment_id (str): stable id of assignment to move
+    """
+    if not update_assignment_status(username, marked_assignment_id,
+                                    ASSIGNMENT_COMPLETED, ASSIGNMENT_PENDING):
+        raise AssignmentNotFound
+
+def mark_assignments_complete(username: str, assignment_ids: list) -> int:
+    """Move selected assignments from user's pending assignments list to user's completed
+    assignments list in one transaction.
+
+    Assignments which are not in user's pending assignments list are skipped.
+
+    Args:
+        username (str): username of user
+        assignment_ids (list): stable ids of assignments to move
+
+    Returns:
+        int: number of assignments moved
+    """
+    with transaction():
+        return update_assignments_status(username, assignment_ids,
+                                         ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+
+def mark_assignments_incomplete(username: str, assignment_ids: list) -> int:
+    """Move selected assignments from user's completed assignments list to user's pending
+    assignments list in one transaction.
+
+    Assignments which are not in user's completed assignments list are skipped.
+
+    Args:
+        username (str): username of user
+        assignment_ids (list): stable ids of assignments to move
+
+    Returns:
+        int: number of assignments moved
+    """
+    with transaction():
+        return update_assignments_status(username, assignment_ids,
+                                         ASSIGNMENT_COMPLETED, ASSIGNMENT_PENDING)
+
+def mark_past_due_assignments_complete(username: str, curr_date: date) -> int:
+    """Move all pending assignments due before curr_date to user's completed assignments list in
+    one transaction. Assignments without a due date are left pending.
+
+    Args:
+        username (str): username of user
+        curr_date (date): assignments due before this date are moved
+
+    Returns:
+        int: number of assignments moved
+    """
+    with transaction():
+        return update_past_due_assignments_status(username, curr_date.isoformat(),
+                                                  ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+
+def mark_course_assignments_complete(username: str, course_code: str) -> int:
+    """Move all pending assignments of a course to user's completed assignments list in one
+    transaction.
+
+    Args:
+        username (str): username of user
+        course_code (str): course whose assignments are moved
+
+    Returns:
+        int: number of assignments moved
+    """
+    with transaction():
+        return update_course_assignments_status(username, course_code,
+                                                ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+
+def mark_course_assignments_incomplete(username: str, course_code: str) -> int:
+    """Move all completed assignments of a course to user's pending assignments list in one
+    transaction.
+
+    Args:
+        username (str): username of user
+        course_code (str): course whose assignments are moved
+
+    Returns:
+        int: number of assignments moved
     """
-    minimum_assignment_info = minimum_assignment_info_str.split('||')
-    completed_assignments = get_completed_assignments(username)
-    course_code = minimum_assignment_info[0]
-    assignment_name = minimum_assignment_info[1]
-    due_date = minimum_assignment_info[2]
-    assignment_index = 0
-    for i, assignment_info in enumerate(completed_assignments[course_code]):
-        if assignment_info[2] == assignment_name and assignment_info[3] == due_date:
-            assignment_index = i
-            break
-    add_pending_assignments(username,
-                            course_code,
-                            [completed_assignments[course_code][assignment_index]])
-    del completed_assignments[course_code][assignment_index]
-    completed_assignments_data = json.dumps(completed_assignments)
-    update_completed_assignments(username, completed_assignments_data)
+    with transaction():
+        return update_course_assignments_status(username, course_code,
+                                                ASSIGNMENT_COMPLETED, ASSIGNMENT_PENDING)
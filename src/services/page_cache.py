@@ -0,0 +1,115 @@
+'''Module containing the caches of rendered assignments pages and assignment rows.'''
+
+import collections
+import hashlib
+import threading
+from markupsafe import Markup
+from services.assignments_info import Assignment
+from services.constants import RENDERED_PAGE_CACHE_SIZE, ROW_FRAGMENT_CACHE_SIZE
+
+class RenderedPageCache:
+    '''Least recently used cache of rendered pages.
+
+    Every page is stored together with the version of the user's view it was rendered from and a
+    strong ETag of its body. A page is only returned for the version it was rendered from, so
+    pages never have to be invalidated when a user's state or the stored assignments change.'''
+
+    def __init__(self, max_entries: int = RENDERED_PAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.pages = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple, version: tuple) -> tuple:
+        """Returns the ETag and body of the cached page.
+
+        Returns None if the page is not cached or was rendered from a different version.
+
+        Args:
+            key (tuple): key of page
+            version (tuple): current version of user's view
+
+        Returns:
+            tuple: ETag and body of page
+        """
+        with self.lock:
+            page = self.pages.get(key)
+            if page is None or page[0] != version:
+                return None
+            self.pages.move_to_end(key)
+            return page[1], page[2]
+
+    def put(self, key: tuple, version: tuple, body: str) -> str:
+        """Stores a rendered page and returns its ETag.
+
+        Args:
+            key (tuple): key of page
+            version (tuple): version of user's view page was rendered from
+            body (str): rendered page
+
+        Returns:
+            str: ETag of page
+        """
+        etag = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+        with self.lock:
+            self.pages[key] = (version, etag, body)
+            self.pages.move_to_end(key)
+            while len(self.pages) > self.max_entries:
+                self.pages.popitem(last=False)
+        return etag
+
+    def clear(self) -> None:
+        """Removes all cached pages."""
+        with self.lock:
+            self.pages.clear()
+
+class RowFragmentCache:
+    '''Least recently used cache of rendered table rows of assignments, shared by all users.
+
+    Rows are stored by course and scrape version of the course, so each row is rendered once per
+    version of the stored assignments of its course. Once the assignments of a course change,
+    rows of the previous version are no longer used and are evicted with the least recently used
+    course versions.'''
+
+    def __init__(self, max_entries: int = ROW_FRAGMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.courses = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def fragment(self, version: int, assignment: Assignment, render) -> Markup:
+        """Returns the rendered row of an assignment, rendering it with render if it is not
+        cached for the scrape version of its course yet.
+
+        Args:
+            version (int): scrape version of course of assignment
+            assignment (Assignment): assignment information
+            render (function): function rendering the row of an assignment
+
+        Returns:
+            Markup: rendered row of assignment
+        """
+        key = (assignment.course, version)
+        with self.lock:
+            fragments = self.courses.get(key)
+            if fragments is not None:
+                self.courses.move_to_end(key)
+                fragment = fragments.get(assignment.id)
+                if fragment is not None:
+                    return fragment
+        fragment = Markup(render(assignment))
+        with self.lock:
+            self.courses.setdefault(key, {})[assignment.id] = fragment
+            self.courses.move_to_end(key)
+            while len(self.courses) > self.max_entries:
+                self.courses.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        """Removes all cached rows."""
+        with self.lock:
+            self.courses.clear()
+
+# rendered pages of the process
+RENDERED_PAGES = RenderedPageCache()
+
+# rendered rows of assignments of the process
+ROW_FRAGMENTS = RowFragmentCache()
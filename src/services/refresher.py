@@ -0,0 +1,157 @@
+'''Module containing the background refresher which keeps scraped course assignments up to date.'''
+
+from datetime import date
+import logging
+import threading
+import time
+from services.database import list_courses, update_shared_assignments, list_course_subscribers
+from services.database import bump_user_state_versions
+from services.db_connections import release_db_connections, checkpoint_wal
+from services.scrape_database import add_course_refreshes, get_due_course_refreshes
+from services.scrape_database import claim_course_refresh, update_course_refresh
+from services.assignment_data import scrape_course_assignments
+from services.fetch import map_concurrently
+from services.constants import REFRESH_TICK, REFRESH_BUDGET, REFRESH_LEASE
+from services.constants import REFRESH_MIN_INTERVAL, REFRESH_MAX_INTERVAL
+
+LOGGER = logging.getLogger(__name__)
+
+def refresh_interval(
+    assignments: list,
+    curr_date: date,
+    changed: bool,
+    unchanged_count: int) -> float:
+    """Returns the number of seconds until a course website should be refreshed again.
+
+    Course websites are refreshed as often as possible right after they changed. Otherwise the
+    interval grows with the number of days until the next due date and doubles with every
+    refresh in which the course website did not change. Course websites without upcoming due
+    dates, for example after the term ended, are refreshed as rarely as possible.
+
+    Args:
+        assignments (list): zipped list of all assignment information of course
+        curr_date (date): current date
+        changed (bool): whether the course website changed since the last refresh
+        unchanged_count (int): number of consecutive refreshes without course website changes
+
+    Returns:
+        float: number of seconds until next refresh
+    """
+    if changed:
+        return REFRESH_MIN_INTERVAL
+    upcoming_due_dates = [
+        assignment[3] for assignment in assignments
+        if assignment[3] and assignment[3] >= curr_date.isoformat()
+    ]
+    if not upcoming_due_dates:
+        return REFRESH_MAX_INTERVAL
+    days_until_due = (date.fromisoformat(min(upcoming_due_dates)) - curr_date).days
+    interval = REFRESH_MIN_INTERVAL * (1 + days_until_due) * 2 ** min(unchanged_count, 16)
+    return min(interval, REFRESH_MAX_INTERVAL)
+
+def retry_interval(failure_count: int) -> float:
+    """Returns the number of seconds until a course website whose refreshes failed failure_count
+    times in a row should be refreshed again.
+
+    The interval doubles with every failed refresh, so course websites which are down or which
+    can no longer be scraped are not fetched again on every tick.
+
+    Args:
+        failure_count (int): number of consecutive failed refreshes
+
+    Returns:
+        float: number of seconds until next refresh
+    """
+    return min(REFRESH_MIN_INTERVAL * 2 ** min(failure_count - 1, 16), REFRESH_MAX_INTERVAL)
+
+def refresh_course(course_refresh, curr_date: date) -> None:
+    """Scrapes a course website which is due a refresh and schedules its next refresh.
+
+    If the course website changed, assignments held by users are updated to the new scrape and
+    the state version of every user of the course is bumped. If the course website could not be
+    fetched or scraped, the refresh is retried with growing backoff.
+
+    The refresh is skipped if another worker has already claimed it.
+
+    Args:
+        course_refresh (sqlite3.Row): refresh schedule of course
+        curr_date (date): date for assignments in scope
+    """
+    course_code = course_refresh['course_code']
+    now = time.time()
+    if not claim_course_refresh(course_code, course_refresh['next_refresh'], now + REFRESH_LEASE):
+        return
+    try:
+        scraped_assignments = scrape_course_assignments(course_code, curr_date)
+    except Exception:  # pylint: disable=broad-except
+        LOGGER.exception('Refreshing %s failed', course_code)
+        scraped_assignments = None
+    if not scraped_assignments:
+        failure_count = course_refresh['failure_count'] + 1
+        update_course_refresh(
+            course_code,
+            now + retry_interval(failure_count),
+            course_refresh['content_hash'],
+            course_refresh['unchanged_count'],
+            failure_count)
+        return
+    assignments, page_hash = scraped_assignments
+    changed = page_hash != course_refresh['content_hash']
+    if changed:
+        update_shared_assignments(assignments)
+        bump_user_state_versions(list_course_subscribers(course_code))
+    unchanged_count = 0 if changed else course_refresh['unchanged_count'] + 1
+    interval = refresh_interval(assignments, curr_date, changed, unchanged_count)
+    update_course_refresh(course_code, time.time() + interval, page_hash, unchanged_count)
+
+def refresh_due_courses(curr_date: date, budget: int = REFRESH_BUDGET) -> int:
+    """Refreshes at most budget course websites which are due a refresh.
+
+    Args:
+        curr_date (date): date for assignments in scope
+        budget (int, optional): maximum number of course websites to fetch. Defaults to
+        REFRESH_BUDGET.
+
+    Returns:
+        int: number of courses due a refresh
+    """
+    add_course_refreshes(list_courses())
+    course_refreshes = get_due_course_refreshes(time.time(), budget)
+    map_concurrently(
+        lambda course_refresh: refresh_course(course_refresh, curr_date),
+        course_refreshes)
+    return len(course_refreshes)
+
+def run_course_refresher(stop_event: threading.Event) -> None:
+    """Refreshes course websites which are due a refresh every REFRESH_TICK seconds until
+    stop_event is set.
+
+    The write-ahead log of the consolidated database is checkpointed after every tick.
+
+    Args:
+        stop_event (threading.Event): event signalling the refresher to stop
+    """
+    while not stop_event.is_set():
+        try:
+            refresh_due_courses(date.today())
+            checkpoint_wal()
+        except Exception:  # pylint: disable=broad-except
+            # Course websites are retried on the next tick
+            LOGGER.exception('Refreshing course websites failed')
+        finally:
+            release_db_connections()
+        stop_event.wait(REFRESH_TICK)
+
+def start_course_refresher() -> threading.Event:
+    """Starts the background refresher in a daemon thread.
+
+    Returns:
+        threading.Event: event which stops the refresher when set
+    """
+    stop_event = threading.Event()
+    threading.Thread(
+        target=run_course_refresher,
+        args=(stop_event,),
+        name='course-refresher',
+        daemon=True).start()
+    return stop_event
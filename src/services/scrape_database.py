@@ -0,0 +1,321 @@
+'''Module containing the database handling functions of data rebuilt from course websites: the
+scrape cache, the course page store and the refresh schedule of every course.'''
+
+import json
+import sqlite3
+import time
+from datetime import date
+from services.db_connections import get_db_connection
+from services.constants import SCRAPE_CACHE_DB, COURSE_PAGES_DB, COURSE_REFRESH_DB
+from services.constants import SCRAPE_CACHE_TTL, SCRAPE_CACHE_MAX_ENTRIES
+from services.assignments_info import Assignment
+
+def initialize_scrape_cache_db(reset: bool = False) -> None:
+    """Creates a database containing scraped course assignments shared between all users.
+    
+    Every course website is scraped for the whole semester and each assignment is stored along
+    with the date it comes into scope, so that assignments in scope at any date can be queried
+    without scraping the course website again.
+
+    Args:
+        reset (bool, optional): Erases and resets database if true. Defaults to False.
+    """
+    with get_db_connection(SCRAPE_CACHE_DB) as con:
+        if reset:
+            con.execute('DROP TABLE IF EXISTS scrape_cache')
+            con.execute('DROP TABLE IF EXISTS scraped_assignments')
+        con.execute('''CREATE TABLE IF NOT EXISTS scrape_cache
+                        (course_code TEXT PRIMARY KEY,
+                            content_hash TEXT,
+                            created_at REAL,
+                            last_used REAL)''')
+        con.execute('''CREATE INDEX IF NOT EXISTS scrape_cache_last_used
+                        ON scrape_cache (last_used)''')
+        con.execute('''CREATE TABLE IF NOT EXISTS scraped_assignments
+                        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            course_code TEXT,
+                            scope_date TEXT,
+                            assignment_data TEXT)''')
+        con.execute('''CREATE INDEX IF NOT EXISTS scraped_assignments_scope
+                        ON scraped_assignments (course_code, scope_date)''')
+        con.commit()
+
+def get_cached_course_assignments(
+    course_code: str,
+    curr_date: date,
+    ttl: float = SCRAPE_CACHE_TTL,
+    content_hash: str = None,
+    touch: bool = True) -> list:
+    """Returns cached assignment information of course which is in scope on curr_date.
+    
+    Returns None if course has not been scraped or if the cached scrape is older than ttl
+    seconds. If content_hash is given, the cached scrape is only returned if it was scraped from
+    the course page with that content hash, regardless of its age. If touch is false, the cache is
+    only read and the scrape is not marked as used, so frequent lookups do not write to the
+    database.
+
+    Args:
+        course_code (str): course code of course
+        curr_date (date): date for assignments in scope, or None for all assignments
+        ttl (float, optional): maximum age of cached scrape in seconds. Defaults to
+        SCRAPE_CACHE_TTL.
+        content_hash (str, optional): content hash of course page. Defaults to None.
+        touch (bool, optional): marks the scrape as used if true. Defaults to True.
+
+    Returns:
+        list: list of Assignment named tuples containing assignment information
+    """
+    now = time.time()
+    with get_db_connection(SCRAPE_CACHE_DB) as con:
+        cached_scrape = (
+            con
+            .execute('''SELECT content_hash, created_at FROM scrape_cache
+                     WHERE course_code = ?''', (course_code,))
+            .fetchone()
+        )
+        if not cached_scrape:
+            return None
+        if content_hash is not None:
+            if cached_scrape['content_hash'] != content_hash:
+                return None
+        elif cached_scrape['created_at'] < now - ttl:
+            return None
+        if touch:
+            # A scrape of an unchanged course page is as fresh as the revalidated page
+            created_at = now if content_hash is not None else cached_scrape['created_at']
+            con.execute('''UPDATE scrape_cache SET created_at = ?, last_used = ?
+                        WHERE course_code = ?''', (created_at, now, course_code))
+            con.commit()
+        scope_date = (curr_date or date.max).isoformat()
+        cached_assignments = con.execute('''SELECT assignment_data FROM scraped_assignments
+                                         WHERE course_code = ? AND scope_date <= ?
+                                         ORDER BY id''', (course_code, scope_date))
+        return [Assignment(*json.loads(assignment[0])) for assignment in cached_assignments]
+
+def get_cached_course_scrape_ids(course_codes: list) -> dict:
+    """Returns what identifies the cached scrape of every cached course among course_codes.
+
+    A scrape is identified by the content hash of the course page it was scraped from, or by the
+    time it was cached if the content hash is unknown. The cache is only read.
+
+    Args:
+        course_codes (list): course codes of courses
+
+    Returns:
+        dict: map from course code to content hash or creation time of cached scrape of course
+    """
+    placeholders = ', '.join('?' * len(course_codes))
+    with get_db_connection(SCRAPE_CACHE_DB) as con:
+        scrape_ids = con.execute(f'''SELECT course_code, COALESCE(content_hash, created_at)
+                                 FROM scrape_cache
+                                 WHERE course_code IN ({placeholders})''', list(course_codes))
+        return dict(scrape_ids.fetchall())
+
+def cache_course_assignments(
+    course_code: str,
+    assignments: list,
+    scope_dates: list,
+    content_hash: str = None,
+    max_entries: int = SCRAPE_CACHE_MAX_ENTRIES) -> None:
+    """Replaces the cached assignment information of course with a new scrape of the whole
+    semester.
+    
+    If the cache holds more than max_entries courses, the least recently used ones are evicted.
+
+    Args:
+        course_code (str): course code of course
+        assignments (list): list of tuples containing assignment information
+        scope_dates (list): date each assignment comes into scope
+        content_hash (str, optional): content hash of scraped course page. Defaults to None.
+        max_entries (int, optional): maximum number of cached courses. Defaults to
+        SCRAPE_CACHE_MAX_ENTRIES.
+    """
+    now = time.time()
+    with get_db_connection(SCRAPE_CACHE_DB) as con:
+        con.execute('''INSERT OR REPLACE INTO scrape_cache
+                    (course_code, content_hash, created_at, last_used)
+                    VALUES (?, ?, ?, ?)''', (course_code, content_hash, now, now))
+        con.execute('DELETE FROM scraped_assignments WHERE course_code = ?', (course_code,))
+        con.executemany('''INSERT INTO scraped_assignments
+                        (course_code, scope_date, assignment_data) VALUES (?, ?, ?)''',
+                        [(course_code, scope_date, json.dumps(assignment))
+                         for assignment, scope_date in zip(assignments, scope_dates)])
+        con.execute('''DELETE FROM scrape_cache WHERE rowid IN
+                    (SELECT rowid FROM scrape_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)''',
+                    (max_entries,))
+        con.execute('''DELETE FROM scraped_assignments
+                    WHERE course_code NOT IN (SELECT course_code FROM scrape_cache)''')
+        con.commit()
+
+def initialize_course_pages_db(reset: bool = False) -> None:
+    """Creates a database containing the last fetched version of every course website.
+
+    Args:
+        reset (bool, optional): Erases and resets database if true. Defaults to False.
+    """
+    with get_db_connection(COURSE_PAGES_DB) as con:
+        if reset:
+            con.execute('DROP TABLE IF EXISTS course_pages')
+        con.execute('''CREATE TABLE IF NOT EXISTS course_pages
+                        (course_link TEXT PRIMARY KEY,
+                            page_text TEXT,
+                            etag TEXT,
+                            last_modified TEXT,
+                            content_hash TEXT,
+                            fetched_at REAL)''')
+        con.commit()
+
+def get_course_page(course_link: str) -> sqlite3.Row:
+    """Returns the last fetched version of the course page at course_link.
+    
+    Returns None if the course page has never been fetched.
+
+    Args:
+        course_link (str): url of course page
+
+    Returns:
+        sqlite3.Row: row containing page_text, etag, last_modified, content_hash and fetched_at
+    """
+    with get_db_connection(COURSE_PAGES_DB) as con:
+        return (
+            con
+            .execute('''SELECT page_text, etag, last_modified, content_hash, fetched_at
+                     FROM course_pages WHERE course_link = ?''', (course_link,))
+            .fetchone()
+        )
+
+def store_course_page(
+    course_link: str,
+    page_text: str,
+    etag: str,
+    last_modified: str,
+    content_hash: str) -> None:
+    """Stores a newly fetched version of the course page at course_link.
+
+    Args:
+        course_link (str): url of course page
+        page_text (str): html text of course page
+        etag (str): ETag header of response
+        last_modified (str): Last-Modified header of response
+        content_hash (str): hash of course page content
+    """
+    with get_db_connection(COURSE_PAGES_DB) as con:
+        con.execute('''INSERT OR REPLACE INTO course_pages
+                    (course_link, page_text, etag, last_modified, content_hash, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?)''',
+                    (course_link, page_text, etag, last_modified, content_hash, time.time()))
+        con.commit()
+
+def touch_course_page(course_link: str) -> None:
+    """Records that the stored version of the course page at course_link was revalidated.
+
+    Args:
+        course_link (str): url of course page
+    """
+    with get_db_connection(COURSE_PAGES_DB) as con:
+        con.execute('UPDATE course_pages SET fetched_at = ? WHERE course_link = ?',
+                    (time.time(), course_link))
+        con.commit()
+
+def initialize_course_refresh_db(reset: bool = False) -> None:
+    """Creates a database containing the refresh schedule of every course website.
+
+    Args:
+        reset (bool, optional): Erases and resets database if true. Defaults to False.
+    """
+    with get_db_connection(COURSE_REFRESH_DB) as con:
+        if reset:
+            con.execute('DROP TABLE IF EXISTS course_refreshes')
+        con.execute('''CREATE TABLE IF NOT EXISTS course_refreshes
+                        (course_code TEXT PRIMARY KEY,
+                            next_refresh REAL,
+                            content_hash TEXT,
+                            unchanged_count INTEGER,
+                            failure_count INTEGER NOT NULL DEFAULT 0)''')
+        columns = [column[1] for column in con.execute('PRAGMA table_info(course_refreshes)')]
+        if 'failure_count' not in columns:
+            # Schedules stored before failed refreshes were counted
+            con.execute('''ALTER TABLE course_refreshes
+                        ADD COLUMN failure_count INTEGER NOT NULL DEFAULT 0''')
+        con.execute('''CREATE INDEX IF NOT EXISTS course_refreshes_next_refresh
+                        ON course_refreshes (next_refresh)''')
+        con.commit()
+
+def add_course_refreshes(course_codes: list) -> None:
+    """Schedules an immediate refresh of every course in course_codes without a refresh schedule.
+
+    Args:
+        course_codes (list): course codes of courses to be refreshed
+    """
+    with get_db_connection(COURSE_REFRESH_DB) as con:
+        con.executemany('''INSERT OR IGNORE INTO course_refreshes
+                        (course_code, next_refresh, content_hash, unchanged_count)
+                        VALUES (?, 0, NULL, 0)''',
+                        [(course_code,) for course_code in course_codes])
+        con.commit()
+
+def get_due_course_refreshes(now: float, limit: int) -> list:
+    """Returns refresh schedules of at most limit courses which are due a refresh at time now.
+    
+    Courses which have been due the longest are returned first.
+
+    Args:
+        now (float): current time in seconds since the epoch
+        limit (int): maximum number of courses to return
+
+    Returns:
+        list: rows containing course_code, next_refresh, content_hash, unchanged_count and
+        failure_count
+    """
+    with get_db_connection(COURSE_REFRESH_DB) as con:
+        return (
+            con
+            .execute('''SELECT course_code, next_refresh, content_hash, unchanged_count,
+                         failure_count
+                     FROM course_refreshes WHERE next_refresh <= ?
+                     ORDER BY next_refresh LIMIT ?''', (now, limit))
+            .fetchall()
+        )
+
+def claim_course_refresh(course_code: str, next_refresh: float, lease_until: float) -> bool:
+    """Reserves the due refresh of a course so that no other worker refreshes it concurrently.
+    
+    The refresh is only claimed if it is still scheduled at next_refresh.
+
+    Args:
+        course_code (str): course code of course
+        next_refresh (float): time the refresh was scheduled at when it was read
+        lease_until (float): time until which the refresh is reserved
+
+    Returns:
+        bool: true if the refresh was claimed otherwise false
+    """
+    with get_db_connection(COURSE_REFRESH_DB) as con:
+        claimed = con.execute('''UPDATE course_refreshes SET next_refresh = ?
+                              WHERE course_code = ? AND next_refresh = ?''',
+                              (lease_until, course_code, next_refresh)).rowcount
+        con.commit()
+        return claimed == 1
+
+def update_course_refresh(
+    course_code: str,
+    next_refresh: float,
+    content_hash: str,
+    unchanged_count: int,
+    failure_count: int = 0) -> None:
+    """Schedules the next refresh of a course.
+
+    Args:
+        course_code (str): course code of course
+        next_refresh (float): time of next refresh in seconds since the epoch
+        content_hash (str): content hash of course page at last refresh
+        unchanged_count (int): number of consecutive refreshes without course page changes
+        failure_count (int, optional): number of consecutive failed refreshes. Defaults to 0.
+    """
+    with get_db_connection(COURSE_REFRESH_DB) as con:
+        con.execute('''UPDATE course_refreshes
+                    SET next_refresh = ?, content_hash = ?, unchanged_count = ?,
+                        failure_count = ?
+                    WHERE course_code = ?''',
+                    (next_refresh, content_hash, unchanged_count, failure_count, course_code))
+        con.commit()
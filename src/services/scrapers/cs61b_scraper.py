@@ -1,175 +1,145 @@
-'''This module contains scraper function for cs61b course website.'''
+'''This module contains scraper declaration for cs61b course website.'''
 
 import re
 from datetime import date, timedelta
-from bs4 import BeautifulSoup
-from services.database import get_course_link
 from services.dates import convert_date_to_code, format_date_code
 from services.assignments_info import AssignmentsInfo
+from services.scrapers.engine import CourseScraper, Field, Rule, register_scraper, scrape_course
 
-def scrape_homework_info(
-    row,
-    curr_date: date,
-    assigned_date: date,
-    assignments_info: AssignmentsInfo,
-    course_code: str,
-    course_url: str) -> None:
-    """Scrapes homework information from the input row and updates assignments_info to contain
-    the new assignment.
+def scrape_homework_info(homework_td, row_context: dict) -> list:
+    """Scrapes homework information from the homework cell of a row.
 
     Args:
-        row (Tag): tag containing information about to be extracted
-        curr_date (date): current date
-        assigned_date (date): date the homework would have been assigned
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
-        course_url (str): course url
-    """
-    homework_td = row.find('td', class_='homework')
-    if homework_td and assigned_date <= curr_date:
-        homework_a_tag = homework_td.find('a')
-        if homework_a_tag:
-            assignments_info.assignment_courses.append(course_code)
-            assignments_info.assignment_types.append('Homework')
-            assignments_info.assignment_names.append(homework_a_tag.text)
-            assignments_info.due_dates.append(
-                format_date_code(homework_td.text.split()[3][:-1]).isoformat())
-            link = homework_a_tag['href']
-            link_prefix = '' if 'gradescope' in link else course_url
-            assignments_info.links_info.append([(link_prefix + link, homework_a_tag.text)])
-
-def scrape_project_info(
-    row,
-    curr_date: date,
-    assigned_date: date,
-    assignments_info: AssignmentsInfo,
-    course_code: str,
-    course_url: str) -> None:
-    """Scrapes project information from the input row and updates assignments_info to contain
-    the new assignment.
+        homework_td (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of row
 
-    Args:
-        row (Tag): tag containing information about to be extracted
-        curr_date (date): current date
-        assigned_date (date): date the project would have been assigned
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
-        course_url (str): course url
+    Returns:
+        list: scraped homework assignment
     """
-    project_td = row.find('td', class_='project')
-    if project_td and assigned_date <= curr_date:
-        project_a_tags = project_td.find_all('a')
-        for project_a_tag in project_a_tags:
-            assignments_info.assignment_courses.append(course_code)
-            assignments_info.assignment_types.append('Project')
-            if '/' in project_td.text:
-                assignments_info.assignment_names.append(
-                    project_a_tag.text + project_a_tags[-1].next_sibling.text)
-            else:
-                assignments_info.assignment_names.append(project_a_tag.text)
-            if 'Project' not in assignments_info.assignment_names[-1]:
-                labeled_project_name = f'Project {assignments_info.assignment_names[-1]}'
-                assignments_info.assignment_names[-1] = labeled_project_name
-            assignments_info.due_dates.append(
-                format_date_code(project_td.text.split()[-1][:-1])
-                .isoformat())
-            link = project_a_tag['href']
-            assignments_info.links_info.append([(
-                course_url + link,
-                assignments_info.assignment_names[-1])])
-
-def scrape_lab_info(
-    row,
-    curr_date: date,
-    assigned_date: date,
-    assignments_info: AssignmentsInfo,
-    course_code: str,
-    course_url: str) -> None:
-    """Scrapes lab information from the input row and updates assignments_info to contain
-    the new assignment.
+    homework_a_tag = homework_td.find('a')
+    if not homework_a_tag:
+        return []
+    link = homework_a_tag['href']
+    link_prefix = '' if 'gradescope' in link else row_context['course_url']
+    return [(
+        'Homework',
+        homework_a_tag.text,
+        format_date_code(homework_td.text.split()[3][:-1]).isoformat(),
+        [(link_prefix + link, homework_a_tag.text)])]
+
+def scrape_project_info(project_td, row_context: dict) -> list:
+    """Scrapes project information from the project cell of a row.
 
     Args:
-        row (Tag): tag containing information about to be extracted
-        curr_date (date): current date
-        assigned_date (date): date the lab would have been assigned
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
-        course_url (str): course url
+        project_td (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of row
+
+    Returns:
+        list: scraped project assignments
     """
-    lab_td = row.find(lambda tag: tag.name == 'td' and 'Lab' in tag.text)
-    if lab_td and assigned_date <= curr_date:
-        first_a_tag = lab_td.find('a')
-        if first_a_tag:
-            assignments_info.assignment_courses.append(course_code)
-            assignments_info.assignment_types.append('Lab')
-            assignments_info.assignment_names.append(first_a_tag.text)
-            due_date = re.search(r'\(due (\d+/\d+)\)', lab_td.text)
-            if due_date:
-                assignments_info.due_dates.append(
-                    format_date_code(due_date.group(1)).isoformat())
-            else:
-                assignments_info.due_dates.append('')
-            lab_links_info = []
-            for lab_a_tag in lab_td.find_all('a'):
-                link_prefix = '' if 'http' in lab_a_tag['href'] else course_url
-                lab_links_info.append((link_prefix + lab_a_tag['href'], lab_a_tag.text))
-            assignments_info.links_info.append(lab_links_info)
-
-def scrape_exam_info(row, assignments_info: AssignmentsInfo, course_code: str) -> None:
-    """Scrapes exam information from the input row and updates assignments_info to contain
-    the new assignment.
+    projects_info = []
+    project_a_tags = project_td.find_all('a')
+    for project_a_tag in project_a_tags:
+        if '/' in project_td.text:
+            project_name = project_a_tag.text + project_a_tags[-1].next_sibling.text
+        else:
+            project_name = project_a_tag.text
+        if 'Project' not in project_name:
+            project_name = f'Project {project_name}'
+        projects_info.append((
+            'Project',
+            project_name,
+            format_date_code(project_td.text.split()[-1][:-1]).isoformat(),
+            [(row_context['course_url'] + project_a_tag['href'], project_name)]))
+    return projects_info
+
+def scrape_lab_info(lab_td, row_context: dict) -> list:
+    """Scrapes lab information from the lab cell of a row.
 
     Args:
-        row (Tag): tag containing information about to be extracted
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
-    """
-    exam_strong = row.find('strong')
-    if exam_strong and 'Midterm' in exam_strong.text:
-        assignments_info.assignment_courses.append(course_code)
-        assignments_info.assignment_types.append('Exam')
-        assignments_info.assignment_names.append(exam_strong.text)
-        date_text = row.find('td', class_='border-hack').text.split()[-2:]
-        assignments_info.due_dates.append(
-            convert_date_to_code(date_text[0][-3:], date_text[1]).isoformat())
-        assignments_info.links_info.append([(None, None)])
+        lab_td (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of row
 
-def scrape_cs61b(website_text: str, curr_date: date) -> AssignmentsInfo:
-    """Returns scraped assignment information from cs61b website.
+    Returns:
+        list: scraped lab assignment
+    """
+    first_a_tag = lab_td.find('a')
+    if not first_a_tag:
+        return []
+    due_date = re.search(r'\(due (\d+/\d+)\)', lab_td.text)
+    lab_links_info = []
+    for lab_a_tag in lab_td.find_all('a'):
+        link_prefix = '' if 'http' in lab_a_tag['href'] else row_context['course_url']
+        lab_links_info.append((link_prefix + lab_a_tag['href'], lab_a_tag.text))
+    return [(
+        'Lab',
+        first_a_tag.text,
+        format_date_code(due_date.group(1)).isoformat() if due_date else '',
+        lab_links_info)]
+
+def scrape_exam_info(exam_strong, row_context: dict) -> list:
+    """Scrapes exam information from the first bold text of a row.
 
     Args:
-        website_text (str): html text for cs61b course website
-        curr_date (date): upper bound assign date for assignments to be scraped
+        exam_strong (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of row
 
     Returns:
-        AssignmentsInfo: named tuple containing scraped assignment information
+        list: scraped exam
     """
-    course_code = 'COMPSCI61B'
-    course_url = get_course_link(course_code) or ''
+    if 'Midterm' not in exam_strong.text:
+        return []
+    return [('Exam', exam_strong.text, row_context['assigned_date'].isoformat(), [(None, None)])]
 
-    soup = BeautifulSoup(website_text, 'html.parser')
-    rows = soup.find_all('tr')
+def row_dates(matched_tags: dict) -> dict:
+    """Returns dates of a row, or None if the row has no date.
 
-    assignments_info = AssignmentsInfo([], [], [], [], [])
+    Args:
+        matched_tags (dict): tags of row matched by fields
 
-    for row in rows:
+    Returns:
+        dict: date assignments of the row are assigned and date exams of the row come into scope
+    """
+    date_td = matched_tags['date']
+    if date_td is None:
+        return None
+    date_text = date_td.text.split()
+    assigned_date = convert_date_to_code(date_text[0][-3:], date_text[1])
+    return {
+        'assigned_date': assigned_date,
+        'row_scope_date': assigned_date - timedelta(weeks=1)
+    }
+
+CS61B_SCRAPER = register_scraper(CourseScraper(
+    course_code='COMPSCI61B',
+    row_name='tr',
+    row_attrs={},
+    fields=[
+        Field('date', 'td', lambda tag: any('border-hack' in class_ for class_ in
+                                            tag.get('class', []))),
+        Field('homework', 'td', lambda tag: 'homework' in tag.get('class', [])),
+        Field('project', 'td', lambda tag: 'project' in tag.get('class', [])),
+        Field('lab', 'td', lambda tag: 'Lab' in tag.text),
+        Field('exam', 'strong')
+    ],
+    row_context=row_dates,
+    rules=[
+        Rule('homework', 'assigned_date', scrape_homework_info),
+        Rule('project', 'assigned_date', scrape_project_info),
+        Rule('lab', 'assigned_date', scrape_lab_info),
+        Rule('exam', 'row_scope_date', scrape_exam_info)
+    ]
+))
 
-        # Exit loop if assignments have not been assigned yet
-        date_td = row.find('td', class_=re.compile('border-hack'))
-        if date_td:
-            date_text = date_td.text.split()
-            assigned_date = convert_date_to_code(date_text[0][-3:], date_text[1])
-            if assigned_date - timedelta(weeks=1) > curr_date:
-                break
-        else:
-            continue
+def scrape_cs61b(website_text: str, curr_date: date) -> AssignmentsInfo:
+    """Returns scraped assignment information from cs61b website.
 
-        scrape_homework_info(
-            row, curr_date, assigned_date, assignments_info, course_code, course_url)
-        scrape_project_info(
-            row, curr_date, assigned_date, assignments_info, course_code, course_url)
-        scrape_lab_info(
-            row, curr_date, assigned_date, assignments_info, course_code, course_url)
-        scrape_exam_info(row, assignments_info, course_code)
+    Args:
+        website_text (str): html text for cs61b course website
+        curr_date (date): upper bound assign date for assignments to be scraped, or None if
+        assignments of the whole semester should be scraped
 
-    return assignments_info
+    Returns:
+        AssignmentsInfo: scraped assignment information
+    """
+    return scrape_course(CS61B_SCRAPER, website_text, curr_date)
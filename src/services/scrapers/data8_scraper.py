@@ -1,188 +1,182 @@
-'''This module contains scraper function for data8 course website.'''
+'''This module contains scraper declaration for data8 course website.'''
 
-import re
 from datetime import date, timedelta
-from bs4 import BeautifulSoup
 from services.assignments_info import AssignmentsInfo
-from services.dates import format_date_code, convert_date_string
+from services.dates import format_date_code, convert_date_strings, MONTH_DAY_PATTERN
+from services.scrapers.engine import CourseScraper, Field, Rule, register_scraper, scrape_course
 
-def scrape_homework_info(
-    week,
-    curr_date: date,
-    hw_assign_date: date,
-    assignments_info: AssignmentsInfo,
-    course_code: str) -> None:
-    """Scrapes homework information from the input row and updates assignments_info to contain
-    the new assignment.
+def scrape_homework_info(homework_strong, row_context: dict) -> list:
+    """Scrapes homework information from the homework label of a week.
 
     Args:
-        week (Tag): tag containing information about to be extracted
-        curr_date (date): current date
-        hw_assign_date (date): date the homework would have been assigned
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
+        homework_strong (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of week
+
+    Returns:
+        list: scraped homework assignment
     """
-    homework_strong = week.find('strong', class_='label label-homework')
-    if homework_strong and hw_assign_date <= curr_date:
-        homework_link_tag = homework_strong.parent.find('a')
-        if homework_link_tag:
-            assignments_info.assignment_courses.append(course_code)
-            assignments_info.assignment_types.append('Homework')
-            assignments_info.assignment_names.append(homework_link_tag.text)
-            homework_text = homework_strong.parent.text
-            if 'Due' in homework_text:
-                date_text = homework_text.split()[-1][:-1]
-            else:
-                date_text = homework_text.split()[-1][1:-1]
-            assignments_info.due_dates.append(
-                format_date_code(date_text).isoformat())
-            assignments_info.links_info.append([(
-                homework_link_tag['href'],
-                homework_link_tag.text)])
-
-def scrape_lab_info(
-    week,
-    curr_date: date,
-    lab_assign_date: date,
-    assignments_info: AssignmentsInfo,
-    course_code: str) -> None:
-    """Scrapes lab information from the input row and updates assignments_info to contain
-    the new assignment.
+    homework_link_tag = homework_strong.parent.find('a')
+    if not homework_link_tag:
+        return []
+    homework_text = homework_strong.parent.text
+    if 'Due' in homework_text:
+        date_text = homework_text.split()[-1][:-1]
+    else:
+        date_text = homework_text.split()[-1][1:-1]
+    return [(
+        'Homework',
+        homework_link_tag.text,
+        format_date_code(date_text).isoformat(),
+        [(homework_link_tag['href'], homework_link_tag.text)])]
+
+def scrape_lab_info(lab_strong, row_context: dict) -> list:
+    """Scrapes lab information from the lab label of a week.
 
     Args:
-        week (Tag): tag containing information about to be extracted
-        curr_date (date): current date
-        lab_assign_date (date): date the lab would have been assigned
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
+        lab_strong (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of week
+
+    Returns:
+        list: scraped lab assignment
     """
-    lab_strong = week.find('strong', class_='label label-lab')
-    if lab_strong and lab_assign_date <= curr_date:
-        lab_link_tag = lab_strong.parent.find('a')
-        if lab_link_tag:
-            assignments_info.assignment_courses.append(course_code)
-            assignments_info.assignment_types.append('Lab')
-            assignments_info.assignment_names.append(lab_link_tag.text)
-            lab_text = lab_strong.parent.text
-            if 'Due' in lab_text:
-                date_text = lab_text.split()[-3][:-4]
-            else:
-                date_text = lab_text.split()[-3][1:-4]
-            date_code = format_date_code(date_text)
-            due_date_string = (date_code and date_code.isoformat()) or ''
-            assignments_info.due_dates.append(due_date_string)
-            assignments_info.links_info.append([(lab_link_tag['href'], lab_link_tag.text)])
-
-def scrape_project_info(
-    week,
-    curr_date: date,
-    project_assign_date: date,
-    assignments_info: AssignmentsInfo,
-    course_code: str) -> None:
-    """Scrapes project information from the input row and updates assignments_info to contain
-    the new assignment.
+    lab_link_tag = lab_strong.parent.find('a')
+    if not lab_link_tag:
+        return []
+    lab_text = lab_strong.parent.text
+    if 'Due' in lab_text:
+        date_text = lab_text.split()[-3][:-4]
+    else:
+        date_text = lab_text.split()[-3][1:-4]
+    date_code = format_date_code(date_text)
+    due_date_string = (date_code and date_code.isoformat()) or ''
+    return [(
+        'Lab',
+        lab_link_tag.text,
+        due_date_string,
+        [(lab_link_tag['href'], lab_link_tag.text)])]
+
+def scrape_project_info(project_strong, row_context: dict) -> list:
+    """Scrapes project and project checkpoint information from the project label of a week.
 
     Args:
-        week (Tag): tag containing information about to be extracted
-        curr_date (date): current date
-        project_assign_date (date): date the project would have been assigned
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
+        project_strong (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of week
+
+    Returns:
+        list: scraped project and project checkpoint assignments
     """
-    project_strong = week.find('strong', class_='label label-project')
-    if project_strong and project_assign_date <= curr_date:
-        project_link_tag = project_strong.parent.find('a')
-        if project_link_tag:
-            assignments_info.assignment_courses.append(course_code)
-            assignments_info.assignment_courses.append(course_code)
-            assignments_info.assignment_types.append('Project')
-            assignments_info.assignment_types.append('Project')
-            assignments_info.assignment_names.append(project_link_tag.text)
-            assignments_info.assignment_names.append(project_link_tag.text + ' Checkpoint')
-            project_text = project_strong.parent.text
-            if 'Due' in project_text:
-                date_text = project_text.split()[-3][:-1]
-            else:
-                date_text = project_text.split()[-3][1:-1]
-            date_text_checkpoint = project_text.split()[-1][:-1]
-            assignments_info.due_dates.append(format_date_code(date_text).isoformat())
-            assignments_info.due_dates.append(
-                format_date_code(date_text_checkpoint).isoformat())
-            assignments_info.links_info.append([(
-                project_link_tag['href'],
-                project_link_tag.text)])
-            assignments_info.links_info.append([(
-                project_link_tag['href'],
-                project_link_tag.text)])
-
-def scrape_exam_info(
-    week,
-    exam_assign_date: date,
-    assignments_info: AssignmentsInfo,
-    course_code: str) -> None:
-    """Scrapes exam information from the input row and updates assignments_info to contain
-    the new assignment.
+    project_link_tag = project_strong.parent.find('a')
+    if not project_link_tag:
+        return []
+    project_text = project_strong.parent.text
+    if 'Due' in project_text:
+        date_text = project_text.split()[-3][:-1]
+    else:
+        date_text = project_text.split()[-3][1:-1]
+    date_text_checkpoint = project_text.split()[-1][:-1]
+    project_links_info = [(project_link_tag['href'], project_link_tag.text)]
+    return [
+        ('Project',
+         project_link_tag.text,
+         format_date_code(date_text).isoformat(),
+         project_links_info),
+        ('Project',
+         project_link_tag.text + ' Checkpoint',
+         format_date_code(date_text_checkpoint).isoformat(),
+         list(project_links_info))
+    ]
+
+def scrape_exam_info(exam_strong, row_context: dict) -> list:
+    """Scrapes exam information from the exam label of a week.
 
     Args:
-        week (Tag): tag containing information about to be extracted
-        exam_assign_date (date): date the exam would have been assigned
-        assignments_info (AssignmentsInfo): AssignmentsInfo tuple to be updated with new assignment
-        course_code (str): course code
+        exam_strong (Tag): tag containing information to be extracted
+        row_context (dict): dates and course url of week
+
+    Returns:
+        list: scraped exam
+    """
+    if 'Midterm' not in exam_strong.parent.text:
+        return []
+    return [(
+        'Exam',
+        ' '.join(exam_strong.parent.text.split()[1:]),
+        row_context['hw_assign_date'].isoformat(),
+        [(None, None)])]
+
+def week_dates(matched_tags: dict) -> dict:
+    """Returns dates of a week, or None if the week has no lab and homework dates.
+
+    Args:
+        matched_tags (dict): tags of week matched by fields
+
+    Returns:
+        dict: dates labs and homeworks of the week are assigned and dates assignments of the week
+        come into scope
+    """
+    dl_tag = matched_tags['dates']
+    if dl_tag is None:
+        return None
+    dates = MONTH_DAY_PATTERN.findall(dl_tag.text)
+    if len(dates) > 0 and dates[0] == 'Apr 12':
+        dates[0] = 'Apr 1'
+    if len(dates) > 0 and dates[-1] == 'Mar 11':
+        dates[-1] = 'Mar 1'
+    if len(dates) > 0 and dates[-1] == 'Feb 28':
+        dates[-1] = 'Feb 2'
+    converted_dates = convert_date_strings(dates)
+    if len(converted_dates) < 2:
+        return None
+    lab_assign_date = converted_dates[0]
+    hw_assign_date = converted_dates[-1]
+    week_scope_date = lab_assign_date - timedelta(weeks=1)
+    return {
+        'lab_assign_date': lab_assign_date,
+        'hw_assign_date': hw_assign_date,
+        'hw_scope_date': max(hw_assign_date, week_scope_date),
+        'row_scope_date': week_scope_date
+    }
+
+def label_matcher(label_class: str):
+    """Returns predicate matching labels with the input class.
+
+    Args:
+        label_class (str): class of label
+
+    Returns:
+        Callable: predicate matching labels with the input class
     """
-    exam_strong = week.find('strong', class_='label label-exam')
-    if exam_strong and 'Midterm' in exam_strong.parent.text:
-        assignments_info.assignment_courses.append(course_code)
-        assignments_info.assignment_types.append('Exam')
-        assignments_info.assignment_names.append(' '.join(exam_strong.parent.text.split()[1:]))
-        assignments_info.due_dates.append(exam_assign_date.isoformat())
-        assignments_info.links_info.append([(None, None)])
+    return lambda tag: tag.get('class') == ['label', label_class]
+
+DATA8_SCRAPER = register_scraper(CourseScraper(
+    course_code='DATAC8',
+    row_name='div',
+    row_attrs={'class': 'module'},
+    fields=[
+        Field('dates', 'dl'),
+        Field('homework', 'strong', label_matcher('label-homework')),
+        Field('lab', 'strong', label_matcher('label-lab')),
+        Field('project', 'strong', label_matcher('label-project')),
+        Field('exam', 'strong', label_matcher('label-exam'))
+    ],
+    row_context=week_dates,
+    rules=[
+        Rule('homework', 'hw_scope_date', scrape_homework_info),
+        Rule('lab', 'lab_assign_date', scrape_lab_info),
+        Rule('project', 'hw_scope_date', scrape_project_info),
+        Rule('exam', 'row_scope_date', scrape_exam_info)
+    ]
+))
 
 def scrape_data8(website_text: str, curr_date: date) -> AssignmentsInfo:
     """Returns scraped assignment information from data8 website.
 
     Args:
         website_text (str): html text for data8 course website
-        curr_date (date): upper bound assign date for assignments to be scraped
+        curr_date (date): upper bound assign date for assignments to be scraped, or None if
+        assignments of the whole semester should be scraped
 
     Returns:
-        AssignmentsInfo: named tuple containing scraped assignment information
+        AssignmentsInfo: scraped assignment information
     """
-    course_code = 'DATAC8'
-
-    soup = BeautifulSoup(website_text, 'html.parser')
-
-    weeks = soup.find_all('div', class_='module')
-
-    assignments_info = AssignmentsInfo([], [], [], [], [])
-
-    for week in weeks:
-
-        # Exit loop if assignments have not been assigned yet
-        dl_tag = week.find('dl')
-        if dl_tag:
-            dates = re.findall(
-                r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s\d{2}',
-                dl_tag.text)
-            if len(dates) > 0 and dates[0] == 'Apr 12':
-                dates[0] = 'Apr 1'
-            if len(dates) > 0 and dates[-1] == 'Mar 11':
-                dates[-1] = 'Mar 1'
-            if len(dates) > 0 and dates[-1] == 'Feb 28':
-                dates[-1] = 'Feb 2'
-            converted_dates = [convert_date_string(day) for day in dates]
-            if len(converted_dates) >= 2:
-                lab_assign_date = converted_dates[0]
-                hw_assign_date = converted_dates[-1]
-                if lab_assign_date - timedelta(weeks=1) > curr_date:
-                    break
-            else:
-                continue
-        else:
-            continue
-
-        scrape_homework_info(week, curr_date, hw_assign_date, assignments_info, course_code)
-        scrape_lab_info(week, curr_date, lab_assign_date, assignments_info, course_code)
-        scrape_project_info(week, curr_date, hw_assign_date, assignments_info, course_code)
-        scrape_exam_info(week, hw_assign_date, assignments_info, course_code)
-
-    return assignments_info
+    return scrape_course(DATA8_SCRAPER, website_text, curr_date)
@@ -0,0 +1,336 @@
+'''This module contains the declarative scraping engine shared by all course scrapers.'''
+
+import collections
+from datetime import date
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.builder import builder_registry
+from services.database import get_course_link
+from services.dates import in_scope
+from services.assignments_info import Assignment, AssignmentsInfo
+from services.constants import HTML_PARSERS
+
+# Tag of a schedule row read by extraction rules.
+#   name: name under which the matched tag is passed to extraction rules
+#   tag_name: html tag name of the field
+#   match: optional predicate the tag must additionally satisfy
+#   first: whether only the first matching tag is kept instead of all matching tags
+Field = collections.namedtuple('Field', ['name', 'tag_name', 'match', 'first'],
+                               defaults=[None, True])
+
+# Rule extracting assignments from the tag of a field.
+#   field: name of field the rule reads, the rule is skipped if no tag matched the field
+#   scope: key of row context holding the date the extracted assignments come into scope
+#   extract: function taking the matched tag and row context and returning a list of
+#   (assignment type, assignment name, due date, links info) tuples
+Rule = collections.namedtuple('Rule', ['field', 'scope', 'extract'])
+
+# Declaration of a course scraper.
+#   course_code: course code of course
+#   row_name: html tag name of schedule rows
+#   row_attrs: html attributes of schedule rows
+#   fields: fields of each schedule row
+#   row_context: function taking the matched tags of a row and returning a dictionary of row
+#   dates, or None if the row contains no assignments. The dictionary must contain
+#   'row_scope_date', the date the earliest assignment of the row comes into scope.
+#   rules: extraction rules, applied in order to every row
+CourseScraper = collections.namedtuple('CourseScraper', [
+    'course_code',
+    'row_name',
+    'row_attrs',
+    'fields',
+    'row_context',
+    'rules',
+])
+
+# map containing course and its declared scraper pairs
+SCRAPERS = {}
+
+def register_scraper(scraper: CourseScraper) -> CourseScraper:
+    """Registers a declared course scraper so that its course can be scraped.
+
+    Args:
+        scraper (CourseScraper): declared course scraper
+
+    Returns:
+        CourseScraper: registered course scraper
+    """
+    SCRAPERS[scraper.course_code] = scraper
+    return scraper
+
+def installed_html_parser() -> str:
+    """Returns the first parser in HTML_PARSERS which is installed.
+
+    Returns:
+        str: name of html parser
+    """
+    for parser in HTML_PARSERS:
+        if builder_registry.lookup(parser):
+            return parser
+    return 'html.parser'
+
+# HTML parser used to parse course websites
+HTML_PARSER = installed_html_parser()
+
+def parse_schedule(scraper: CourseScraper, website_text: str, parser: str = None) -> BeautifulSoup:
+    """Parses only the schedule rows of a course website.
+
+    Everything outside of the schedule rows is skipped while parsing, so that no tree is built
+    for the rest of the course website.
+
+    Args:
+        scraper (CourseScraper): declared course scraper
+        website_text (str): html text for course website
+        parser (str, optional): name of html parser. Defaults to HTML_PARSER.
+
+    Returns:
+        BeautifulSoup: parsed schedule rows
+    """
+    parser = parser or HTML_PARSER
+    # html5lib always builds the whole tree and warns if asked to parse only part of it
+    parse_only = None
+    if parser != 'html5lib':
+        parse_only = SoupStrainer(scraper.row_name, attrs=scraper.row_attrs)
+    return BeautifulSoup(website_text, parser, parse_only=parse_only)
+
+def match_fields(row: Tag, fields: list) -> dict:
+    """Walks the subtree of row once and returns the tags matched by every field.
+
+    Each tag is only checked against the fields with its tag name, and the walk stops early once
+    every field has been matched.
+
+    Args:
+        row (Tag): schedule row
+        fields (list): fields of schedule row
+
+    Returns:
+        dict: map from field name to matched tag, or list of matched tags for fields which keep
+        all matches. Fields without matches are mapped to None.
+    """
+    matched_tags = dict.fromkeys(field.name for field in fields)
+    fields_by_tag_name = collections.defaultdict(list)
+    for field in fields:
+        fields_by_tag_name[field.tag_name].append(field)
+    for tag in row.descendants:
+        if not isinstance(tag, Tag) or tag.name not in fields_by_tag_name:
+            continue
+        tag_fields = fields_by_tag_name[tag.name]
+        for field in list(tag_fields):
+            if field.match and not field.match(tag):
+                continue
+            if field.first:
+                matched_tags[field.name] = tag
+                tag_fields.remove(field)
+            else:
+                if matched_tags[field.name] is None:
+                    matched_tags[field.name] = []
+                matched_tags[field.name].append(tag)
+        if not tag_fields:
+            del fields_by_tag_name[tag.name]
+            if not fields_by_tag_name:
+                break
+    return matched_tags
+
+def extract_assignments(scraper: CourseScraper, rows, curr_date: date) -> AssignmentsInfo:
+    """Returns assignment information extracted from schedule rows using a declared scraper.
+
+    Rows are consumed in order until a row which is not yet in scope on curr_date is reached, so
+    rows after it are never requested from rows.
+
+    Args:
+        scraper (CourseScraper): declared course scraper
+        rows (Iterable): schedule rows
+        curr_date (date): upper bound assign date for assignments to be scraped, or None if
+        assignments of the whole semester should be scraped
+
+    Returns:
+        AssignmentsInfo: scraped assignment information
+    """
+    course_url = get_course_link(scraper.course_code) or ''
+
+    assignments_info = AssignmentsInfo()
+
+    for row in rows:
+        matched_tags = match_fields(row, scraper.fields)
+        row_context = scraper.row_context(matched_tags)
+        if row_context is None:
+            continue
+
+        # Exit loop if assignments have not been assigned yet
+        if not in_scope(row_context['row_scope_date'], curr_date):
+            break
+
+        row_context['course_url'] = course_url
+        for rule in scraper.rules:
+            matched_tag = matched_tags[rule.field]
+            scope_date = row_context[rule.scope]
+            if matched_tag is None or not in_scope(scope_date, curr_date):
+                continue
+            assignments_info.extend([
+                Assignment(scraper.course_code, *assignment)
+                for assignment in rule.extract(matched_tag, row_context)
+            ], scope_date.isoformat())
+
+    return assignments_info
+
+def scrape_course(
+    scraper: CourseScraper,
+    website_text: str,
+    curr_date: date,
+    parser: str = None) -> AssignmentsInfo:
+    """Returns scraped assignment information from course website using a declared scraper.
+
+    Rows are scraped in order until a row which is not yet in scope on curr_date is reached.
+
+    Args:
+        scraper (CourseScraper): declared course scraper
+        website_text (str): html text for course website
+        curr_date (date): upper bound assign date for assignments to be scraped, or None if
+        assignments of the whole semester should be scraped
+        parser (str, optional): name of html parser. Defaults to HTML_PARSER.
+
+    Returns:
+        AssignmentsInfo: scraped assignment information
+    """
+    soup = parse_schedule(scraper, website_text, parser)
+    rows = soup.find_all(scraper.row_name, attrs=scraper.row_attrs)
+    return extract_assignments(scraper, rows, curr_date)
+
+class RowSplitter(HTMLParser):
+    '''Incremental html parser splitting html text fed in chunks into the html text of each
+    complete schedule row.
+
+    Only the html text which can still be part of a row is kept: the text of the open row, or the
+    text not parsed yet if no row is open. Offsets of tags are relative to the kept text.'''
+
+    def __init__(self, scraper: CourseScraper):
+        super().__init__()
+        self.row_name = scraper.row_name
+        self.row_strainer = SoupStrainer(scraper.row_name, attrs=scraper.row_attrs)
+        self.text = ''
+        self.text_start = 0
+        self.first_line = 1
+        self.line_starts = [0]
+        self.row_start = None
+        self.row_depth = 0
+        self.rows = []
+
+    def feed(self, data: str) -> None:
+        """Feeds the next chunk of html text to the parser.
+
+        Args:
+            data (str): chunk of html text
+        """
+        text_end = self.text_start + len(self.text)
+        newline = data.find('\n')
+        while newline != -1:
+            self.line_starts.append(text_end + newline + 1)
+            newline = data.find('\n', newline + 1)
+        self.text += data
+        super().feed(data)
+
+    def position(self) -> int:
+        """Returns the offset in the kept html text of the tag being parsed.
+
+        Returns:
+            int: offset of tag
+        """
+        line, column = self.getpos()
+        return self.line_starts[line - self.first_line] + column - self.text_start
+
+    def discard_read_text(self) -> None:
+        """Drops the html text before the open row, or before the text not parsed yet if no row
+        is open, together with the starts of lines before the line being parsed."""
+        discarded = self.row_start if self.row_start is not None else self.position()
+        self.text = self.text[discarded:]
+        self.text_start += discarded
+        if self.row_start is not None:
+            self.row_start -= discarded
+        line = self.getpos()[0]
+        del self.line_starts[:line - self.first_line]
+        self.first_line = line
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        """Records the start of a schedule row.
+
+        Args:
+            tag (str): name of tag
+            attrs (list): name and value pairs of tag attributes
+        """
+        if tag != self.row_name:
+            return
+        if self.row_start is not None:
+            self.row_depth += 1
+            return
+        row_attrs = {
+            name: (value or '').split() if name == 'class' else value or ''
+            for name, value in attrs
+        }
+        if self.row_strainer.search_tag(tag, row_attrs):
+            self.row_start = self.position()
+            self.row_depth = 1
+
+    def handle_endtag(self, tag: str) -> None:
+        """Records the html text of a schedule row once the row is complete.
+
+        Args:
+            tag (str): name of tag
+        """
+        if tag != self.row_name or self.row_start is None:
+            return
+        self.row_depth -= 1
+        if self.row_depth == 0:
+            row_end = self.text.index('>', self.position()) + 1
+            self.rows.append(self.text[self.row_start:row_end])
+            self.row_start = None
+
+    def pop_rows(self) -> list:
+        """Returns the html text of all rows completed since the last call and drops the html
+        text which can no longer be part of a row.
+
+        Returns:
+            list: html text of completed rows
+        """
+        rows, self.rows = self.rows, []
+        self.discard_read_text()
+        return rows
+
+def split_rows(scraper: CourseScraper, chunks):
+    """Yields the html text of each schedule row as soon as it has been completely read from
+    chunks.
+
+    Args:
+        scraper (CourseScraper): declared course scraper
+        chunks (Iterable): chunks of html text of course website
+
+    Yields:
+        str: html text of schedule row
+    """
+    row_splitter = RowSplitter(scraper)
+    for chunk in chunks:
+        row_splitter.feed(chunk)
+        yield from row_splitter.pop_rows()
+    row_splitter.close()
+    yield from row_splitter.pop_rows()
+
+def scrape_course_stream(scraper: CourseScraper, chunks, curr_date: date) -> AssignmentsInfo:
+    """Returns scraped assignment information from course website read in chunks using a
+    declared scraper.
+
+    Each schedule row is parsed as soon as it has been read, and no further chunks are read once
+    a row which is not yet in scope on curr_date is reached.
+
+    Args:
+        scraper (CourseScraper): declared course scraper
+        chunks (Iterable): chunks of html text of course website
+        curr_date (date): upper bound assign date for assignments to be scraped, or None if
+        assignments of the whole semester should be scraped
+
+    Returns:
+        AssignmentsInfo: scraped assignment information
+    """
+    rows = (
+        BeautifulSoup(row_text, 'html.parser').find(scraper.row_name)
+        for row_text in split_rows(scraper, chunks)
+    )
+    return extract_assignments(scraper, rows, curr_date)
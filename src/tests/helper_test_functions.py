@@ -9,10 +9,33 @@ from services.assignments_info import AssignmentsInfo
 
 def filter_assignments_info(assignments_info: AssignmentsInfo, indices: list):
     '''Filters assignments_info to only contain assignments corresponding to those in indices.'''
-    filtered_assignments_info = AssignmentsInfo(
-        [assignments_info.assignment_courses[i] for i in indices],
-        [assignments_info.assignment_types[i] for i in indices],
-        [assignments_info.assignment_names[i] for i in indices],
-        [assignments_info.due_dates[i] for i in indices],
-        [assignments_info.links_info[i] for i in indices])
+    filtered_assignments_info = AssignmentsInfo()
+    for i in indices:
+        filtered_assignments_info.append(
+            assignments_info.assignments[i], assignments_info.scope_dates[i])
     return filtered_assignments_info
+
+def app_test_client(tmp_path, monkeypatch):
+    '''Returns a test client of the app storing all databases in tmp_path.
+
+    Databases are initialized for every client, so clients do not depend on whether the app was
+    already imported by another test.'''
+    # pylint: disable-next=import-outside-toplevel
+    from services import constants, database, db_connections, scrape_database
+    for db_name in ['USERS_DB', 'COURSES_DB', 'USER_COURSES_DB', 'USER_ASSIGNMENTS_DB']:
+        monkeypatch.setattr(database, db_name, str(tmp_path / f'{db_name.lower()}.db'))
+    monkeypatch.setattr(db_connections, 'CONSOLIDATED_DB', str(tmp_path / 'consolidated_db.db'))
+    for db_name in ['SCRAPE_CACHE_DB', 'COURSE_PAGES_DB', 'COURSE_REFRESH_DB']:
+        monkeypatch.setattr(scrape_database, db_name, str(tmp_path / f'{db_name.lower()}.db'))
+    monkeypatch.setattr(database, 'COURSES_SQL', os.path.abspath(os.path.join(
+        os.path.dirname(__file__), '..', 'databases', 'courses.sql')))
+    monkeypatch.setattr(constants, 'COURSE_REFRESHER_ENABLED', False)
+    import app  # pylint: disable=import-outside-toplevel
+    database.initialize_user_info(reset=True)
+    database.initialize_courses_db(update=True)
+    scrape_database.initialize_scrape_cache_db(reset=True)
+    scrape_database.initialize_course_pages_db(reset=True)
+    scrape_database.initialize_course_refresh_db(reset=True)
+    app.RENDERED_PAGES.clear()
+    app.ROW_FRAGMENTS.clear()
+    return app.app.test_client()
@@ -0,0 +1,144 @@
+'''This module tests reading and changing a user's assignments through the JSON API.'''
+
+from datetime import date
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from helper_test_functions import app_test_client
+from services.constants import API_MAX_DUE_WITHIN
+from services.database import add_pending_assignments, COURSE_CATALOG
+from services.db_connections import close_db_connections
+from services.database import update_shared_assignments
+from services.functions import register_user, add_course_to_user
+from services.assignments_info import Assignment
+
+USER = 'user'
+HW_1 = Assignment('EECS16B', 'Homework', 'Homework 1', '2024-01-26', [['hw1', 'Homework 1']])
+LAB_1 = Assignment('EECS16B', 'Lab', 'Lab 1', '2024-01-26', [['lab1', 'Lab 1']])
+HW_2 = Assignment('EECS16B', 'Homework', 'Homework 2', '2024-02-02', [['hw2', 'Homework 2']])
+EXAM = Assignment('EECS16B', 'Exam', 'Midterm', '2024-01-20', [[None, None]])
+LAB_0 = Assignment('DATAC8', 'Lab', 'Lab 0', '2024-01-22', [])
+
+@pytest.fixture(name='client')
+def fixture_client(tmp_path, monkeypatch):
+    '''Logs a user with pending assignments of two courses into a test client of the app.'''
+    client = app_test_client(tmp_path, monkeypatch)
+    register_user(USER, 'password')
+    add_course_to_user(USER, 'EECS16B')
+    add_course_to_user(USER, 'DATAC8')
+    add_pending_assignments(USER, 'EECS16B', [HW_1, LAB_1, HW_2, EXAM])
+    add_pending_assignments(USER, 'DATAC8', [LAB_0])
+    with client.session_transaction() as session:
+        session['username'] = USER
+    yield client
+    close_db_connections()
+    COURSE_CATALOG.invalidate()
+
+def listed_ids(client, query_string: dict) -> list:
+    '''Returns the ids of the assignments of all pages listed one after another.'''
+    ids = []
+    query_string = dict(query_string)
+    while True:
+        data = client.get('/api/assignments', query_string=query_string).get_json()
+        ids.extend(assignment['id'] for assignment in data['assignments'])
+        if data['next_cursor'] is None:
+            return ids
+        query_string['cursor'] = data['next_cursor']
+
+def test_list_assignments(client):
+    '''Tests listing pending assignments as compact JSON in view order.'''
+    response = client.get('/api/assignments')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert b', ' not in response.data
+    data = response.get_json()
+    assert [assignment['id'] for assignment in data['assignments']] == [
+        EXAM.id, LAB_0.id, HW_1.id, LAB_1.id, HW_2.id]
+    assert data['assignments'][0]['links'] == []
+    assert data['assignments'][2] == {
+        'id' : HW_1.id, 'course' : 'EECS16B', 'type' : 'Homework', 'name' : 'Homework 1',
+        'due_date' : '2024-01-26', 'links' : [{'url' : 'hw1', 'label' : 'Homework 1'}]}
+    assert data['next_cursor'] is None
+
+def test_list_assignments_pages(client):
+    '''Tests that reading pages one after another returns every assignment once in view order.'''
+    assert listed_ids(client, {'limit' : 2}) == [
+        EXAM.id, LAB_0.id, HW_1.id, LAB_1.id, HW_2.id]
+
+def test_list_assignments_filters(client):
+    '''Tests listing only the assignments of one course or of one type.'''
+    assert listed_ids(client, {'course' : 'DATAC8'}) == [LAB_0.id]
+    assert listed_ids(client, {'type' : 'Homework', 'limit' : 1}) == [HW_1.id, HW_2.id]
+    assert listed_ids(client, {'course' : 'EECS16B', 'type' : 'Lab'}) == [LAB_1.id]
+
+class FixedDate(date):
+    '''Date whose today is the day the first homework is due.'''
+
+    @classmethod
+    def today(cls):
+        '''Returns the due date of the first homework.'''
+        return cls(2024, 1, 26)
+
+def test_list_assignments_due_within(client, monkeypatch):
+    '''Tests listing only the assignments due within the next days.'''
+    monkeypatch.setattr('app.date', FixedDate)
+    assert listed_ids(client, {'due_within' : 6}) == [HW_1.id, LAB_1.id]
+    assert listed_ids(client, {'due_within' : 7, 'limit' : 1}) == [HW_1.id, LAB_1.id, HW_2.id]
+    assert listed_ids(client, {'due_within' : 7, 'type' : 'Lab'}) == [LAB_1.id]
+    assert listed_ids(client, {'due_within' : 0}) == [HW_1.id, LAB_1.id]
+    assert listed_ids(client, {'due_within' : API_MAX_DUE_WITHIN}) == [HW_1.id, LAB_1.id, HW_2.id]
+
+def test_invalid_requests(client):
+    '''Tests that invalid statuses and cursors are rejected.'''
+    assert client.get('/api/assignments?status=archived').status_code == 400
+    assert client.get('/api/assignments?cursor=page-2').status_code == 400
+    assert client.get('/api/assignments?due_within=-1').status_code == 400
+    assert client.get('/api/assignments?due_within=10000000').status_code == 400
+    assert client.get(f'/api/assignments?due_within={API_MAX_DUE_WITHIN + 1}').status_code == 400
+    assert client.post(f'/api/assignments/{HW_1.id}/archive').status_code == 400
+    assert listed_ids(client, {'status' : 'completed'}) == []
+    with client.session_transaction() as session:
+        del session['username']
+    assert client.get('/api/assignments').status_code == 401
+    assert client.post(f'/api/assignments/{HW_1.id}/complete').status_code == 401
+
+def test_unchanged_assignments_not_modified(client):
+    '''Tests that listing unchanged assignments again with their ETag is answered with 304.'''
+    response = client.get('/api/assignments')
+    etag = response.headers['ETag']
+    repeated_response = client.get('/api/assignments', headers={'If-None-Match': etag})
+    assert repeated_response.status_code == 304
+    assert repeated_response.headers['ETag'] == etag
+
+def test_changed_assignments_listed_again(client):
+    '''Tests that a new ETag is returned once the stored assignments of a course change.'''
+    etag = client.get('/api/assignments').headers['ETag']
+    update_shared_assignments([HW_1._replace(links_info=[['hw1-v2', 'Homework 1']])])
+    response = client.get('/api/assignments', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['assignments'][2]['links'][0]['url'] == 'hw1-v2'
+
+def test_mark_assignment(client):
+    '''Tests moving one assignment between views and rejecting assignments not in a view.'''
+    etag = client.get('/api/assignments').headers['ETag']
+    response = client.post(f'/api/assignments/{HW_1.id}/complete')
+    assert response.get_json() == {'id' : HW_1.id, 'status' : 'completed'}
+    assert client.post(f'/api/assignments/{HW_1.id}/complete').status_code == 404
+    assert client.get('/api/assignments', headers={'If-None-Match': etag}).status_code == 200
+    assert listed_ids(client, {'status' : 'completed'}) == [HW_1.id]
+    response = client.post(f'/api/assignments/{HW_1.id}/incomplete')
+    assert response.get_json() == {'id' : HW_1.id, 'status' : 'pending'}
+    assert client.post('/api/assignments/missing/incomplete').status_code == 404
+
+def test_list_courses(client):
+    '''Tests listing the catalog of courses and answering repeated requests with 304.'''
+    response = client.get('/api/courses')
+    courses = response.get_json()
+    assert {'course_code', 'name', 'link'} == set(courses[0])
+    assert 'EECS16B' in [course['course_code'] for course in courses]
+    repeated_response = client.get('/api/courses',
+                                   headers={'If-None-Match': response.headers['ETag']})
+    assert repeated_response.status_code == 304
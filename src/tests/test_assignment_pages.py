@@ -0,0 +1,92 @@
+'''This module tests reading a user's assignments one page or due date window at a time.'''
+
+from datetime import date
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import database
+from services.database import initialize_user_assignments_db
+from services.database import add_pending_assignments, list_user_assignments
+from services.db_connections import get_db_connection, close_db_connections
+from services.functions import mark_assignments_complete
+from services.assignment_data import assignments_page
+from services.assignments_info import Assignment
+from services.exceptions import InvalidCursor
+from services.constants import ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED
+
+USER = 'user'
+EECS_ASSIGNMENTS = [
+    Assignment('EECS16B', 'Homework', f'Homework {week}', f'2024-{month:02}-{day:02}', [])
+    for week, (month, day) in enumerate([(1, 26), (2, 2), (2, 9), (2, 16), (2, 23)])
+]
+DATA_ASSIGNMENTS = [
+    Assignment('DATAC8', 'Lab', f'Lab {week}', f'2024-{month:02}-{day:02}', [])
+    for week, (month, day) in enumerate([(1, 26), (2, 2), (2, 5), (3, 1)])
+] + [Assignment('DATAC8', 'Reading', 'Reading', '', [])]
+
+@pytest.fixture(autouse=True)
+def user_assignments_db(tmp_path, monkeypatch):
+    '''Stores user assignments in a temporary database containing one user's assignments.'''
+    monkeypatch.setattr(database, 'USER_ASSIGNMENTS_DB', str(tmp_path / 'user-assignments.db'))
+    initialize_user_assignments_db(reset=True)
+    add_pending_assignments(USER, 'EECS16B', EECS_ASSIGNMENTS)
+    add_pending_assignments(USER, 'DATAC8', DATA_ASSIGNMENTS)
+    yield
+    close_db_connections()
+
+def read_all_pages(status: str, limit: int) -> list:
+    '''Returns the assignments of all pages read one after another.'''
+    assignments = []
+    cursor = None
+    while True:
+        page, cursor = assignments_page(USER, status, cursor, limit)
+        assert len(page) <= limit
+        assignments.extend(page)
+        if cursor is None:
+            return assignments
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 10, 100])
+def test_pages_match_full_view(limit: int):
+    '''Tests that reading pages one after another returns every assignment once in view order.'''
+    mark_assignments_complete(USER, [assignment.id for assignment in EECS_ASSIGNMENTS[1:4]]
+                              + [DATA_ASSIGNMENTS[0].id])
+    for status in [ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED]:
+        assert read_all_pages(status, limit) == list_user_assignments(USER, status)
+
+def test_last_page_has_no_cursor():
+    '''Tests that a page holding the last assignment does not point to an empty page.'''
+    page, cursor = assignments_page(USER, ASSIGNMENT_PENDING, limit=10)
+    assert len(page) == 10
+    assert cursor is None
+
+def test_due_date_window():
+    '''Tests reading only the pending assignments due in the next days.'''
+    start, end = date(2024, 2, 2), date(2024, 2, 9)
+    page, cursor = assignments_page(USER, ASSIGNMENT_PENDING, start=start, end=end)
+    assert page == [EECS_ASSIGNMENTS[1], DATA_ASSIGNMENTS[1], DATA_ASSIGNMENTS[2]]
+    assert cursor is None
+    page, cursor = assignments_page(USER, ASSIGNMENT_PENDING, limit=2, start=start, end=end)
+    assert assignments_page(USER, ASSIGNMENT_PENDING, cursor, 2, start, end) == (
+        [DATA_ASSIGNMENTS[2]], None)
+
+def test_invalid_cursor():
+    '''Tests that a cursor which was not handed out by a page is rejected.'''
+    with pytest.raises(InvalidCursor):
+        assignments_page(USER, ASSIGNMENT_PENDING, 'page-2')
+
+def test_page_reads_index_range():
+    '''Tests that later pages start reading at the cursor instead of skipping earlier rows.'''
+    con = get_db_connection(database.USER_ASSIGNMENTS_DB)
+    query_plan = con.execute('''EXPLAIN QUERY PLAN
+                             SELECT status.id FROM user_assignment_status AS status
+                             WHERE status.username = ? AND status.status = ?
+                                 AND status.due_date >= ?
+                                 AND (status.due_date > ? OR status.id > ?)
+                             ORDER BY status.due_date, status.id LIMIT 10''',
+                             (USER, ASSIGNMENT_PENDING, '2024-02-02', '2024-02-02', 1)).fetchall()
+    details = ' '.join(row[-1] for row in query_plan)
+    assert 'due_date>?' in details
+    assert 'TEMP B-TREE' not in details
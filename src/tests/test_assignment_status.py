@@ -0,0 +1,173 @@
+'''This module tests storing the status of each of a user's assignments in its own row.'''
+
+from datetime import date
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import database
+from services.database import initialize_user_assignments_db
+from services.database import add_pending_assignments
+from services.database import list_user_assignments, list_user_assignment_courses
+from services.database import update_assignment_status
+from services.db_connections import get_db_connection, close_db_connections
+from services.database import update_shared_assignments, remove_user_course_assignments
+from services.database import user_assignment_ids_by_course, get_user_course_scrape_versions
+from services.functions import mark_assignments_complete, mark_assignments_incomplete
+from services.functions import mark_past_due_assignments_complete
+from services.functions import mark_course_assignments_complete, mark_course_assignments_incomplete
+from services.assignments_info import Assignment, assignment_id
+from services.constants import ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED
+
+USER = 'user'
+OTHER_USER = 'other_user'
+HW_1 = Assignment('EECS16B', 'Homework', 'Homework 1', '2024-01-26', [['hw1', 'Homework 1']])
+LAB_1 = Assignment('EECS16B', 'Lab', 'Lab 1', '2024-01-26', [['lab1', 'Lab 1']])
+HW_2 = Assignment('EECS16B', 'Homework', 'Homework 2', '2024-02-02', [['hw2', 'Homework 2']])
+EXAM = Assignment('EECS16B', 'Exam', 'Midterm', '2024-01-20', [[None, None]])
+
+@pytest.fixture(autouse=True)
+def user_assignments_db(tmp_path, monkeypatch):
+    '''Stores user assignments in a temporary database containing one user's assignments.'''
+    monkeypatch.setattr(database, 'USER_ASSIGNMENTS_DB', str(tmp_path / 'user-assignments.db'))
+    initialize_user_assignments_db(reset=True)
+    add_pending_assignments(USER, 'EECS16B', [HW_2, HW_1, LAB_1, EXAM])
+    add_pending_assignments(USER, 'DATAC8', [])
+    yield
+    close_db_connections()
+
+def test_views_sorted_by_due_date():
+    '''Tests that views are sorted by due date and keep assignments due together in order.'''
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [EXAM, HW_1, LAB_1, HW_2]
+    update_assignment_status(USER, HW_1.id, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+    update_assignment_status(USER, HW_2.id, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [EXAM, LAB_1]
+    assert list_user_assignments(USER, ASSIGNMENT_COMPLETED) == [HW_2, HW_1]
+
+def test_courses_without_assignments_kept():
+    '''Tests that courses stay added for the user even if they have no pending assignments.'''
+    assert list_user_assignment_courses(USER) == ['EECS16B', 'DATAC8']
+    assert 'DATAC8' not in user_assignment_ids_by_course(USER)
+
+def test_assignment_ids_by_course():
+    '''Tests reading the ids of all of a user's assignments without reading the assignments.'''
+    update_assignment_status(USER, EXAM.id, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+    assert user_assignment_ids_by_course(USER) == {
+        'EECS16B': {HW_1.id, LAB_1.id, HW_2.id, EXAM.id}}
+    assert user_assignment_ids_by_course(OTHER_USER) == {}
+
+def test_mark_complete_updates_one_row():
+    '''Tests that marking an assignment complete changes the status of exactly one row.'''
+    con = get_db_connection(database.USER_ASSIGNMENTS_DB)
+    changes_before = con.total_changes
+    assert update_assignment_status(USER, LAB_1.id, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+    # The status row and the version of the user's assignments
+    assert con.total_changes - changes_before == 2
+    assert list_user_assignments(USER, ASSIGNMENT_COMPLETED) == [LAB_1]
+    assert not update_assignment_status(USER, LAB_1.id, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+    assert not update_assignment_status(OTHER_USER, HW_1.id, ASSIGNMENT_PENDING,
+                                        ASSIGNMENT_COMPLETED)
+
+def test_mark_complete_uses_id_index():
+    '''Tests that an assignment is looked up by its id in the user's unique assignment index.'''
+    con = get_db_connection(database.USER_ASSIGNMENTS_DB)
+    query_plan = con.execute('''EXPLAIN QUERY PLAN
+                             UPDATE user_assignment_status SET status = ?
+                             WHERE username = ? AND assignment_id = ? AND status = ?''',
+                             (ASSIGNMENT_COMPLETED, USER, HW_1.id, ASSIGNMENT_PENDING)).fetchall()
+    details = ' '.join(row[-1] for row in query_plan)
+    assert 'user_assignment_status_assignment' in details
+
+@pytest.mark.parametrize('status, order', [
+    (ASSIGNMENT_PENDING, 'ASC'),
+    (ASSIGNMENT_COMPLETED, 'DESC')
+])
+def test_views_use_index(status: str, order: str):
+    '''Tests that views are read in order from an index instead of sorting all statuses.'''
+    con = get_db_connection(database.USER_ASSIGNMENTS_DB)
+    query_plan = con.execute(f'''EXPLAIN QUERY PLAN
+                             SELECT assignment_id FROM user_assignment_status
+                             WHERE username = ? AND status = ? ORDER BY due_date {order}, id''',
+                             (USER, status)).fetchall()
+    details = ' '.join(row[-1] for row in query_plan)
+    assert 'INDEX user_assignment_status' in details
+    assert 'TEMP B-TREE' not in details
+
+def test_assignments_shared_between_users():
+    '''Tests that users of the same course reference the same stored assignments.'''
+    add_pending_assignments(OTHER_USER, 'EECS16B', [HW_1, HW_2])
+    con = get_db_connection(database.USER_ASSIGNMENTS_DB)
+    assert con.execute('SELECT COUNT(*) FROM assignments').fetchone()[0] == 4
+    assert list_user_assignments(OTHER_USER, ASSIGNMENT_PENDING) == [HW_1, HW_2]
+    remove_user_course_assignments(USER, ['EECS16B'])
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == []
+    assert list_user_assignments(OTHER_USER, ASSIGNMENT_PENDING) == [HW_1, HW_2]
+
+def test_course_update_changes_one_row():
+    '''Tests that a new scrape of an assignment updates it for every user at once.'''
+    add_pending_assignments(OTHER_USER, 'EECS16B', [HW_1])
+    updated_hw_1 = HW_1._replace(links_info=[['hw1-v2', 'Homework 1']])
+    assert assignment_id(updated_hw_1) == assignment_id(HW_1)
+    con = get_db_connection(database.USER_ASSIGNMENTS_DB)
+    changes_before = con.total_changes
+    update_shared_assignments([updated_hw_1, HW_2])
+    # The changed assignment and the scrape version of its course
+    assert con.total_changes - changes_before == 2
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING)[1] == updated_hw_1
+    assert list_user_assignments(OTHER_USER, ASSIGNMENT_PENDING) == [updated_hw_1]
+
+def test_mark_selected_assignments():
+    '''Tests moving a selected set of assignments and skipping ones the user does not have.'''
+    assert mark_assignments_complete(USER, [HW_1.id, HW_2.id, HW_1.id, 'missing']) == 2
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [EXAM, LAB_1]
+    assert mark_assignments_incomplete(USER, [HW_2.id, LAB_1.id]) == 1
+    assert list_user_assignments(USER, ASSIGNMENT_COMPLETED) == [HW_1]
+
+def test_mark_past_due_assignments():
+    '''Tests completing every pending assignment due before a date.'''
+    assert mark_past_due_assignments_complete(USER, date(2024, 1, 27)) == 3
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [HW_2]
+
+def test_undated_assignments_not_past_due():
+    '''Tests that completing past due assignments leaves undated and upcoming ones pending.'''
+    undated_lab = Assignment('DATAC8', 'Lab', 'Lab 1', '', [])
+    upcoming_lab = Assignment('DATAC8', 'Lab', 'Lab 2', '2024-03-01', [])
+    add_pending_assignments(USER, 'DATAC8', [undated_lab, upcoming_lab])
+    assert mark_past_due_assignments_complete(USER, date(2024, 1, 1)) == 0
+    assert mark_past_due_assignments_complete(USER, date(2024, 2, 10)) == 4
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [undated_lab, upcoming_lab]
+
+def test_mark_course_assignments():
+    '''Tests moving all assignments of one course without touching other users.'''
+    add_pending_assignments(OTHER_USER, 'EECS16B', [HW_1])
+    assert mark_course_assignments_complete(USER, 'EECS16B') == 4
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == []
+    assert list_user_assignments(OTHER_USER, ASSIGNMENT_PENDING) == [HW_1]
+    assert mark_course_assignments_incomplete(USER, 'EECS16B') == 4
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [EXAM, HW_1, LAB_1, HW_2]
+
+def test_scrape_version_changes_with_assignments():
+    '''Tests that the scrape version of a course only changes when its stored assignments do.'''
+    version = get_user_course_scrape_versions(USER)['EECS16B']
+    add_pending_assignments(OTHER_USER, 'EECS16B', [HW_1, EXAM])
+    update_shared_assignments([LAB_1])
+    assert get_user_course_scrape_versions(USER)['EECS16B'] == version
+    update_shared_assignments([LAB_1._replace(assignment_type='Discussion')])
+    assert get_user_course_scrape_versions(USER)['EECS16B'] == version + 1
+    assert 'DATAC8' not in get_user_course_scrape_versions(USER)
+    assert get_user_course_scrape_versions(OTHER_USER) == {'EECS16B': version + 1}
+
+def test_redated_assignment_updated_in_place():
+    '''Tests that an assignment whose due date changed stays one assignment which keeps its
+    status and moves to its new due date in every user's views.'''
+    add_pending_assignments(OTHER_USER, 'EECS16B', [HW_1])
+    update_assignment_status(OTHER_USER, HW_1.id, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+    redated_hw_1 = HW_1._replace(due_date='2024-02-03')
+    assert redated_hw_1.id == HW_1.id
+    update_shared_assignments([redated_hw_1])
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [EXAM, LAB_1, HW_2, redated_hw_1]
+    assert list_user_assignments(OTHER_USER, ASSIGNMENT_COMPLETED) == [redated_hw_1]
+    add_pending_assignments(USER, 'EECS16B', [HW_1])
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == [EXAM, HW_1, LAB_1, HW_2]
@@ -0,0 +1,38 @@
+'''This module tests the Assignment record and AssignmentsInfo container.'''
+
+import json
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.assignments_info import Assignment, AssignmentsInfo
+
+HW_1 = Assignment('EECS16B', 'Homework', 'Homework 1', '2024-01-26', [['hw1.pdf', 'Homework 1']])
+HW_2 = Assignment('EECS16B', 'Homework', 'Homework 2', '2024-02-02', [['hw2.pdf', 'Homework 2']])
+EXAM = Assignment('EECS16B', 'Exam', 'Midterm 1', '2024-02-20', [[None, None]])
+
+def test_columnar_views():
+    '''Tests that columns of assignment information line up with the added assignments.'''
+    assignments_info = AssignmentsInfo()
+    assignments_info.append(HW_1, '2024-01-19')
+    assignments_info.extend([HW_2, EXAM], '2024-01-26')
+    assert len(assignments_info) == 3
+    assert assignments_info.assignment_names == ['Homework 1', 'Homework 2', 'Midterm 1']
+    assert assignments_info.assignment_types == ['Homework', 'Homework', 'Exam']
+    assert assignments_info.due_dates == ['2024-01-26', '2024-02-02', '2024-02-20']
+    assert assignments_info.scope_dates == ['2024-01-19', '2024-01-26', '2024-01-26']
+    assert assignments_info[2] is EXAM
+
+def test_mismatched_scope_dates():
+    '''Tests that a container can not hold a different number of assignments and scope dates.'''
+    with pytest.raises(ValueError):
+        AssignmentsInfo([HW_1, HW_2], ['2024-01-19'])
+
+def test_stored_assignment_round_trip():
+    '''Tests that stored assignments are read back equal to the scraped assignments.'''
+    assignments_info = AssignmentsInfo([HW_1, EXAM])
+    stored_assignments = json.dumps(list(assignments_info))
+    assert [Assignment(*assignment) for assignment in json.loads(stored_assignments)] == \
+        [HW_1, EXAM]
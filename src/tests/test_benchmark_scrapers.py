@@ -0,0 +1,31 @@
+'''This module tests the synthetic course websites and regression checks of the scraper
+benchmarks.'''
+
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.benchmark_scrapers import BENCHMARK_FUNCS, scale_website, find_regressions
+from services.assignment_data import TEST_FILES
+
+@pytest.mark.parametrize('course_code', ['EECS16B', 'COMPSCI61B', 'DATAC8'])
+def test_scale_website(course_code: str):
+    '''Tests that enlarged course websites contain every assignment scale times.'''
+    with open(TEST_FILES[course_code], 'r', encoding='utf-8') as file:
+        website_text = file.read()
+    assignments_info = BENCHMARK_FUNCS[course_code](website_text, None)
+    scaled_assignments_info = BENCHMARK_FUNCS[course_code](
+        scale_website(course_code, website_text, 3), None)
+    assert sorted(scaled_assignments_info.assignment_names) == sorted(
+        assignments_info.assignment_names * 3)
+
+def test_find_regressions():
+    '''Tests that only measurements exceeding the baseline by more than tolerance regress.'''
+    def benchmarks(seconds: float) -> dict:
+        stage = {'seconds': seconds, 'peak_bytes': 1000, 'retained_blocks': 10}
+        return {'results': {'DATAC8/x1': {'total': stage, 'parse': stage, 'extract': stage}}}
+    assert not find_regressions(benchmarks(1.2), benchmarks(1.0), 0.25)
+    assert len(find_regressions(benchmarks(1.3), benchmarks(1.0), 0.25)) == 3
+    assert not find_regressions(benchmarks(0.003), benchmarks(0.001), 0.25)
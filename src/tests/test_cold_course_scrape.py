@@ -0,0 +1,90 @@
+'''This module tests scraping course websites which have never been fetched before.'''
+
+from datetime import date
+import sys
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import db_connections, scrape_database, assignment_data
+from services.db_connections import close_db_connections
+from services.scrape_database import initialize_scrape_cache_db, initialize_course_pages_db
+from services.scrape_database import get_cached_course_assignments, get_course_page
+from services.assignment_data import course_assignment_data
+from services.constants import YEAR
+
+TEST_DATE = date(YEAR, 1, 26)
+
+class SlowCoursePageHandler(BaseHTTPRequestHandler):
+    '''Serves a course page after a delay, counting the requests served.'''
+    page_text = ''
+    requests_served = []
+
+    def do_GET(self):
+        '''Responds with the course page once concurrent requests have been made.'''
+        self.requests_served.append(self.path)
+        time.sleep(0.2)
+        body = self.page_text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        '''Silences request logging.'''
+
+@pytest.fixture(name='course_link')
+def fixture_course_link(tmp_path, monkeypatch):
+    '''Serves the EECS16B course page from a local server instead of the course website.'''
+    for db_name in ['SCRAPE_CACHE_DB', 'COURSE_PAGES_DB']:
+        monkeypatch.setattr(scrape_database, db_name, str(tmp_path / f'{db_name.lower()}.db'))
+    monkeypatch.setattr(db_connections, 'CONSOLIDATED_DB', str(tmp_path / 'consolidated_db.db'))
+    initialize_scrape_cache_db(reset=True)
+    initialize_course_pages_db(reset=True)
+    course_website = Path(__file__).parent / 'course_websites' / 'eecs16b_full.txt'
+    SlowCoursePageHandler.page_text = course_website.read_text(encoding='utf-8')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowCoursePageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    course_link = f'http://127.0.0.1:{server.server_port}/'
+    monkeypatch.setattr(assignment_data, 'get_course_link', lambda course_code: course_link)
+    SlowCoursePageHandler.requests_served.clear()
+    yield course_link
+    server.shutdown()
+    close_db_connections()
+
+def wait_for_cached_scrape() -> list:
+    '''Returns the cached scrape of EECS16B once the scrape of the whole semester is stored.'''
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        cached_assignments = get_cached_course_assignments('EECS16B', TEST_DATE, touch=False)
+        if cached_assignments is not None:
+            return cached_assignments
+        time.sleep(0.05)
+    return None
+
+def test_cold_course_scraped_once(course_link: str):
+    '''Tests that concurrent requests for a cold course share one streamed fetch, and that the
+    rest of the streamed course website is stored and scraped for the whole semester without
+    requesting it again.'''
+    results = [None] * 4
+    def request_course(index: int) -> None:
+        results[index] = course_assignment_data('EECS16B', TEST_DATE)
+    requests = [threading.Thread(target=request_course, args=(index,)) for index in range(4)]
+    for request in requests:
+        request.start()
+    for request in requests:
+        request.join()
+    assert results[0]
+    assert all(result == results[0] for result in results)
+    streamed_assignments = [assignment[:4] for assignment in results[0]]
+    assert [assignment[:4] for assignment in wait_for_cached_scrape()] == streamed_assignments
+    assert [assignment[:4] for assignment in course_assignment_data('EECS16B', TEST_DATE)] == \
+        streamed_assignments
+    assert get_course_page(course_link)['page_text'] == SlowCoursePageHandler.page_text
+    assert len(SlowCoursePageHandler.requests_served) == 1
@@ -0,0 +1,77 @@
+'''This module tests compare-and-swap writes of user assignments by concurrent writers.'''
+
+import sys
+import os
+import threading
+import time
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import database
+from services.database import initialize_user_assignments_db
+from services.database import add_pending_assignments, list_user_assignments
+from services.database import get_user_state_version, claim_user_state_version
+from services.database import update_assignment_status
+from services.db_connections import close_db_connections, transaction, retry_on_conflict
+from services.assignments_info import Assignment
+from services.exceptions import ConcurrentUpdate
+from services.constants import ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED
+
+USER = 'user'
+HW_1 = Assignment('EECS16B', 'Homework', 'Homework 1', '2024-01-26', [['hw1', 'Homework 1']])
+
+@pytest.fixture(autouse=True)
+def user_assignments_db(tmp_path, monkeypatch):
+    '''Stores user assignments in a temporary database.'''
+    monkeypatch.setattr(database, 'USER_ASSIGNMENTS_DB', str(tmp_path / 'user-assignments.db'))
+    initialize_user_assignments_db(reset=True)
+    yield
+    close_db_connections()
+
+def test_version_changes_with_assignments():
+    '''Tests that every change of a user's assignments changes the version and nothing else does.'''
+    assert get_user_state_version(USER) == 0
+    add_pending_assignments(USER, 'EECS16B', [HW_1])
+    version = get_user_state_version(USER)
+    assert version > 0
+    assert not update_assignment_status(USER, HW_1.id, ASSIGNMENT_COMPLETED, ASSIGNMENT_PENDING)
+    assert get_user_state_version(USER) == version
+    assert update_assignment_status(USER, HW_1.id, ASSIGNMENT_PENDING, ASSIGNMENT_COMPLETED)
+    assert get_user_state_version(USER) > version
+
+def test_stale_claim_writes_nothing():
+    '''Tests that a write based on assignments changed by another writer is rolled back.'''
+    version = get_user_state_version(USER)
+    add_pending_assignments(USER, 'EECS16B', [])
+    with pytest.raises(ConcurrentUpdate):
+        with transaction():
+            claim_user_state_version(USER, version)
+            add_pending_assignments(USER, 'EECS16B', [HW_1])
+    assert list_user_assignments(USER, ASSIGNMENT_PENDING) == []
+
+def test_concurrent_writers_retry():
+    '''Tests that concurrent read-modify-write operations are retried instead of losing updates.'''
+    attempts = []
+
+    @retry_on_conflict
+    def add_assignment(assignment: Assignment) -> None:
+        attempts.append(assignment.name)
+        version = get_user_state_version(USER)
+        known_assignments = list_user_assignments(USER, ASSIGNMENT_PENDING)
+        time.sleep(0.01)
+        if assignment not in known_assignments:
+            with transaction():
+                claim_user_state_version(USER, version)
+                add_pending_assignments(USER, assignment.course, [assignment])
+        close_db_connections()
+
+    assignments = [HW_1._replace(name=f'Homework {number}') for number in range(4)]
+    writers = [threading.Thread(target=add_assignment, args=(assignment,))
+               for assignment in assignments]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert sorted(list_user_assignments(USER, ASSIGNMENT_PENDING)) == sorted(assignments)
+    assert len(attempts) > len(assignments)
@@ -0,0 +1,100 @@
+'''This module tests reusing pooled database connections within and across threads.'''
+
+import sys
+import os
+import sqlite3
+import threading
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from helper_test_functions import app_test_client
+from services import database, db_connections
+from services.db_connections import get_db_connection, release_db_connections
+from services.db_connections import close_db_connections, ConnectionPool, DB_POOL
+from services.functions import register_user
+
+@pytest.fixture()
+def db_file(tmp_path):
+    '''Creates a database with an empty table and closes all connections afterwards.'''
+    db_file = str(tmp_path / 'pool.db')
+    with get_db_connection(db_file) as con:
+        con.execute('CREATE TABLE IF NOT EXISTS items (name TEXT)')
+        con.execute('DELETE FROM items')
+    yield db_file
+    close_db_connections()
+
+def test_connection_reused_within_thread(db_file: str):
+    '''Tests that a thread gets the same connection for every call.'''
+    assert get_db_connection(db_file) is get_db_connection(db_file)
+
+def test_connection_per_thread(db_file: str):
+    '''Tests that a connection checked out by a thread is not handed to other threads.'''
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(get_db_connection(db_file)))
+    thread.start()
+    thread.join()
+    assert connections[0] is not get_db_connection(db_file)
+
+def test_release_rolls_back(db_file: str):
+    '''Tests that releasing connections rolls back uncommitted changes but keeps them open.'''
+    con = get_db_connection(db_file)
+    con.execute("INSERT INTO items (name) VALUES ('uncommitted')")
+    release_db_connections()
+    assert get_db_connection(db_file) is con
+    assert con.execute('SELECT COUNT(*) FROM items').fetchone()[0] == 0
+
+def test_close_connections(db_file: str):
+    '''Tests that closed connections are replaced by new connections.'''
+    con = get_db_connection(db_file)
+    close_db_connections()
+    with pytest.raises(sqlite3.ProgrammingError):
+        con.execute('SELECT 1')
+    assert get_db_connection(db_file).execute('SELECT COUNT(*) FROM items').fetchone()[0] == 0
+
+def test_released_connection_reused_by_other_thread(db_file: str):
+    '''Tests that a connection returned to the pool is reused by the next thread.'''
+    connections = []
+    def use_connection() -> None:
+        connections.append(get_db_connection(db_file))
+        release_db_connections()
+    for _ in range(2):
+        thread = threading.Thread(target=use_connection)
+        thread.start()
+        thread.join()
+    assert connections[0] is connections[1]
+
+def test_idle_connections_bounded(db_file: str):
+    '''Tests that connections returned beyond the maximum number of idle connections are
+    closed.'''
+    pool = ConnectionPool(max_idle=1)
+    first_con = pool.check_out(db_file)
+    second_con = pool.check_out(db_file)
+    pool.check_in(db_file, first_con)
+    pool.check_in(db_file, second_con)
+    with pytest.raises(sqlite3.ProgrammingError):
+        second_con.execute('SELECT 1')
+    assert pool.check_out(db_file) is first_con
+    first_con.close()
+
+def test_requests_reuse_connections(tmp_path, monkeypatch):
+    '''Tests that requests handled by different threads reuse the same pooled connections.'''
+    client = app_test_client(tmp_path, monkeypatch)
+    register_user('user', 'password')
+    close_db_connections()
+    def idle_connections() -> dict:
+        return {db_path: list(idle_queue.queue)
+                for db_path, idle_queue in DB_POOL.idle_connections.items()}
+    connections = []
+    def request_login() -> None:
+        client.post('/login', data={'username': 'user', 'password': 'password'})
+        connections.append(idle_connections())
+    for _ in range(2):
+        thread = threading.Thread(target=request_login)
+        thread.start()
+        thread.join()
+    users_db = os.path.abspath(
+        db_connections.CONSOLIDATED_DB if db_connections.DB_CONSOLIDATED else database.USERS_DB)
+    assert len(connections[0][users_db]) == 1
+    assert connections[0] == connections[1]
+    close_db_connections()
@@ -0,0 +1,67 @@
+'''This module tests storing all tables in one database and running operations in transactions.'''
+
+import sys
+import os
+import threading
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import db_connections
+from services.database import initialize_user_info, user_exists, add_new_user, list_user_courses
+from services.database import add_user_course, list_user_assignment_courses
+from services.db_connections import get_db_connection, close_db_connections, transaction
+from services.db_connections import checkpoint_wal
+from services.functions import register_user
+from services.constants import USERS_DB, USER_ASSIGNMENTS_DB
+
+USER = 'user'
+
+@pytest.fixture(autouse=True)
+def consolidated_db(tmp_path, monkeypatch):
+    '''Stores all tables in a temporary consolidated database.'''
+    close_db_connections()
+    monkeypatch.setattr(db_connections, 'DB_CONSOLIDATED', True)
+    monkeypatch.setattr(db_connections, 'CONSOLIDATED_DB', str(tmp_path / 'consolidated.db'))
+    initialize_user_info(reset=True)
+    yield tmp_path
+    close_db_connections()
+
+def test_single_wal_database(consolidated_db):
+    '''Tests that all tables are stored in one database in WAL mode.'''
+    register_user(USER, 'password')
+    assert set(os.listdir(consolidated_db)) <= {
+        'consolidated.db', 'consolidated.db-wal', 'consolidated.db-shm'}
+    assert get_db_connection(USERS_DB) is get_db_connection(USER_ASSIGNMENTS_DB)
+    assert get_db_connection(USERS_DB).execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert list_user_assignment_courses(USER) == []
+
+def test_checkpoint_truncates_wal(consolidated_db):
+    '''Tests that checkpointing copies the write-ahead log into the database and empties it.'''
+    register_user(USER, 'password')
+    wal_file = consolidated_db / 'consolidated.db-wal'
+    assert wal_file.stat().st_size > 0
+    checkpoint_wal()
+    assert wal_file.stat().st_size == 0
+    assert user_exists(USER)
+
+def test_transaction_rolls_back_all_tables():
+    '''Tests that a failing operation leaves no table changed.'''
+    with pytest.raises(RuntimeError):
+        with transaction():
+            add_new_user(USER, 'hashed_password')
+            add_user_course(USER, 'EECS16B')
+            raise RuntimeError
+    assert not user_exists(USER)
+    assert list_user_courses(USER) == []
+
+def test_readers_do_not_wait_for_writers():
+    '''Tests that other threads read committed data while a write transaction is open.'''
+    readers_saw_user = []
+    with transaction():
+        add_new_user(USER, 'hashed_password')
+        reader = threading.Thread(target=lambda: readers_saw_user.append(user_exists(USER)))
+        reader.start()
+        reader.join(timeout=1)
+    assert readers_saw_user == [False]
+    assert user_exists(USER)
@@ -0,0 +1,57 @@
+'''This module tests the in-memory course catalog.'''
+
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import database, db_connections
+from services.database import COURSE_CATALOG, initialize_courses_db, list_courses
+from services.database import get_course_link
+
+COURSES_SQL = '''
+CREATE TABLE courses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_code TEXT NOT NULL,
+    course_name TEXT NOT NULL,
+    course_link TEXT NOT NULL
+);
+INSERT INTO courses (course_code, course_name, course_link) VALUES
+'''
+
+@pytest.fixture(autouse=True)
+def courses_db(tmp_path, monkeypatch):
+    '''Points the courses database at a temporary file and restores the catalog afterwards.'''
+    monkeypatch.setattr(db_connections, 'DB_CONSOLIDATED', False)
+    monkeypatch.setattr(database, 'COURSES_DB', str(tmp_path / 'courses.db'))
+    monkeypatch.setattr(database, 'COURSES_SQL', str(tmp_path / 'courses.sql'))
+    yield tmp_path
+    COURSE_CATALOG.invalidate()
+
+def write_courses_sql(tmp_path, courses: list) -> None:
+    '''Writes a courses script inserting every course code and link pair in courses.'''
+    values = ',\n'.join(f"('{code}', '{code} name', '{link}')" for code, link in courses)
+    (tmp_path / 'courses.sql').write_text(COURSES_SQL + values + ';', encoding='utf-8')
+
+def test_catalog_does_not_touch_disk(courses_db):
+    '''Tests that courses are looked up without the courses database once loaded.'''
+    write_courses_sql(courses_db, [('EECS16B', 'https://eecs16b.org/')])
+    initialize_courses_db()
+    os.remove(courses_db / 'courses.db')
+    assert list_courses() == ['EECS16B']
+    assert get_course_link('EECS16B') == 'https://eecs16b.org/'
+    assert COURSE_CATALOG.get_course_name('EECS16B') == 'EECS16B name'
+    assert get_course_link('DATAC8') is None
+
+def test_catalog_reloaded_on_update(courses_db):
+    '''Tests that updating the courses database reloads the catalog.'''
+    write_courses_sql(courses_db, [('EECS16B', 'https://eecs16b.org/')])
+    initialize_courses_db()
+    write_courses_sql(courses_db, [('EECS16B', 'https://eecs16b.org/sp25/'),
+                                   ('DATAC8', 'https://www.data8.org/')])
+    initialize_courses_db()
+    assert list_courses() == ['EECS16B']
+    initialize_courses_db(update=True)
+    assert list_courses() == ['EECS16B', 'DATAC8']
+    assert get_course_link('EECS16B') == 'https://eecs16b.org/sp25/'
@@ -0,0 +1,83 @@
+'''This module tests conditional fetching of course websites through the course page store.'''
+
+import sys
+import os
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.scrape_database import initialize_course_pages_db, get_course_page
+from services.fetch import fetch_course_page, map_concurrently, content_hash, TokenBucket
+
+PAGE_TEXT = '<html><body><table><tr><td>Week 1</td></tr></table></body></html>'
+PAGE_ETAG = '"week-1"'
+
+class CoursePageHandler(BaseHTTPRequestHandler):
+    '''Serves a single course page supporting ETag revalidation.'''
+    requests_served = []
+
+    def do_GET(self):
+        '''Responds with 304 if the client already holds the current version of the page.'''
+        self.requests_served.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == PAGE_ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE_TEXT.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', PAGE_ETAG)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        '''Silences request logging.'''
+
+@pytest.fixture(scope='module')
+def course_link():
+    '''Serves a course page on a local server for the duration of the module.'''
+    initialize_course_pages_db(reset=True)
+    server = HTTPServer(('127.0.0.1', 0), CoursePageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+
+def test_first_fetch(course_link: str):
+    '''Tests that a course page is stored along with its validators on first fetch.'''
+    page_text, page_hash = fetch_course_page(course_link)
+    assert page_text == PAGE_TEXT
+    assert page_hash == content_hash(PAGE_TEXT.encode('utf-8'))
+    stored_page = get_course_page(course_link)
+    assert stored_page['etag'] == PAGE_ETAG
+    assert stored_page['content_hash'] == page_hash
+    assert CoursePageHandler.requests_served[-1] is None
+
+def test_revalidated_fetch(course_link: str):
+    '''Tests that refetching a course page is conditional and served from the page store.'''
+    page_text, page_hash = fetch_course_page(course_link)
+    assert CoursePageHandler.requests_served[-1] == PAGE_ETAG
+    assert page_text == PAGE_TEXT
+    assert page_hash == content_hash(PAGE_TEXT.encode('utf-8'))
+
+def test_unreachable_course_page():
+    '''Tests that course pages that cannot be fetched return None.'''
+    assert fetch_course_page('http://127.0.0.1:9/') is None
+
+def test_concurrent_fetch(course_link: str):
+    '''Tests that course pages fetched concurrently are returned in the order of their urls.'''
+    course_pages = map_concurrently(fetch_course_page, [course_link, 'http://127.0.0.1:9/'])
+    assert course_pages[0][0] == PAGE_TEXT
+    assert course_pages[1] is None
+
+def test_token_bucket():
+    '''Tests that requests beyond the burst allowance are delayed by the rate limit.'''
+    token_bucket = TokenBucket(rate=20, capacity=2)
+    start_time = time.monotonic()
+    for _ in range(4):
+        token_bucket.acquire()
+    assert time.monotonic() - start_time >= 0.09
@@ -0,0 +1,119 @@
+'''This module tests refreshing course websites in the background.'''
+
+from datetime import date
+import sys
+import os
+import time
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.database import initialize_user_info
+from services.scrape_database import initialize_scrape_cache_db, initialize_course_refresh_db
+from services.scrape_database import add_course_refreshes, get_due_course_refreshes
+from services.scrape_database import claim_course_refresh, cache_course_assignments
+from services.functions import register_user, add_course_to_user, add_new_course_assignments
+from services.functions import add_refreshed_assignments, mark_assignment_complete
+from services.assignment_data import all_pending_assignments, all_completed_assignments
+from services.assignment_data import course_assignment_data
+from services.assignment_data import zip_assignments_info
+from services.scrapers.eecs16b_scraper import scrape_eecs16b
+from services import refresher
+from services.refresher import refresh_interval, refresh_course
+from services.database import add_pending_assignments
+from services.assignments_info import Assignment, assignment_id
+from services.constants import YEAR, REFRESH_MIN_INTERVAL, REFRESH_MAX_INTERVAL
+
+USER = 'test-user'
+TEST_DATE = date(YEAR, 1, 26)
+NEXT_DATE = date(YEAR, 2, 2)
+
+@pytest.fixture(scope='module', autouse=True)
+def clean_db():
+    '''Enables use of a clean database.'''
+    initialize_user_info(reset=True)
+    initialize_scrape_cache_db(reset=True)
+    initialize_course_refresh_db(reset=True)
+
+@pytest.mark.parametrize('assignments, changed, unchanged_count, interval', [
+    ([('EECS16B', 'Homework', 'Homework 01', f'{YEAR}-01-27', [])], True, 0,
+     REFRESH_MIN_INTERVAL),
+    ([('EECS16B', 'Homework', 'Homework 01', f'{YEAR}-01-27', [])], False, 0,
+     2 * REFRESH_MIN_INTERVAL),
+    ([('EECS16B', 'Homework', 'Homework 01', f'{YEAR}-01-27', [])], False, 2,
+     8 * REFRESH_MIN_INTERVAL),
+    ([('EECS16B', 'Homework', 'Homework 01', f'{YEAR}-01-20', [])], False, 0,
+     REFRESH_MAX_INTERVAL),
+    ([('EECS16B', 'Homework', 'Homework 01', f'{YEAR}-01-27', [])], False, 30,
+     REFRESH_MAX_INTERVAL)
+])
+def test_refresh_interval(assignments: list, changed: bool, unchanged_count: int, interval: float):
+    '''Tests that refreshes are frequent near due dates and after changes and rare otherwise.'''
+    assert refresh_interval(assignments, TEST_DATE, changed, unchanged_count) == interval
+
+def test_claim_course_refresh():
+    '''Tests that a due course refresh can only be claimed once.'''
+    add_course_refreshes(['EECS16B', 'DATAC8'])
+    course_refreshes = get_due_course_refreshes(time.time(), 1)
+    assert len(course_refreshes) == 1
+    course_code = course_refreshes[0]['course_code']
+    next_refresh = course_refreshes[0]['next_refresh']
+    assert claim_course_refresh(course_code, next_refresh, time.time() + 60)
+    assert not claim_course_refresh(course_code, next_refresh, time.time() + 60)
+    assert len(get_due_course_refreshes(time.time(), 2)) == 1
+
+def course_refresh_of(course_code: str):
+    '''Returns the refresh schedule of a course.'''
+    for course_refresh in get_due_course_refreshes(float('inf'), 16):
+        if course_refresh['course_code'] == course_code:
+            return course_refresh
+    return None
+
+def test_failed_refresh_backs_off(monkeypatch):
+    '''Tests that a refresh whose scraper raises is rescheduled with growing backoff.'''
+    def failing_scrape(course_code: str, curr_date: date) -> tuple:
+        raise ValueError(f'{course_code} on {curr_date} cannot be scraped')
+    monkeypatch.setattr(refresher, 'scrape_course_assignments', failing_scrape)
+    add_course_refreshes(['COMPSCI61B'])
+    for failure_count in [1, 2, 3]:
+        start_time = time.time()
+        refresh_course(course_refresh_of('COMPSCI61B'), TEST_DATE)
+        course_refresh = course_refresh_of('COMPSCI61B')
+        assert course_refresh['failure_count'] == failure_count
+        assert course_refresh['next_refresh'] - start_time >= \
+            REFRESH_MIN_INTERVAL * 2 ** (failure_count - 1)
+
+def test_add_refreshed_assignments():
+    '''Tests that assignments coming into scope after course selection reach the user's pending
+    list without duplicating pending or completed assignments.'''
+    register_user(USER, 'password')
+    add_course_to_user(USER, 'EECS16B')
+    add_new_course_assignments(USER, TEST_DATE, True)
+    mark_assignment_complete(USER, assignment_id(('EECS16B', None, 'Homework 00', f'{YEAR}-01-20')))
+    add_refreshed_assignments(USER, NEXT_DATE)
+    assert len(all_pending_assignments(USER)) == 2
+    with open('course_websites/eecs16b_full.txt', 'r', encoding='utf-8') as file:
+        assignments_info = scrape_eecs16b(file.read(), None)
+    cache_course_assignments(
+        'EECS16B', zip_assignments_info(assignments_info), assignments_info.scope_dates)
+    add_refreshed_assignments(USER, NEXT_DATE)
+    refreshed_assignments = course_assignment_data('EECS16B', NEXT_DATE, True)
+    assert len(all_pending_assignments(USER)) == len(refreshed_assignments) - 1
+
+def test_refreshed_assignments_reconciled():
+    '''Tests that assignments changed on or removed from a course website are changed or removed
+    in the user's assignments instead of being kept next to their latest version.'''
+    other_user = 'reconciled-user'
+    kept, redated, removed, completed = [
+        Assignment('EECS16B', 'Homework', f'Reconciled Homework {day}', f'{YEAR}-02-0{day}', [])
+        for day in range(1, 5)
+    ]
+    add_pending_assignments(other_user, 'EECS16B', [kept, redated, removed, completed])
+    mark_assignment_complete(other_user, completed.id)
+    redated = redated._replace(due_date=f'{YEAR}-02-07')
+    released = Assignment('EECS16B', 'Homework', 'Reconciled Homework 5', f'{YEAR}-02-05', [])
+    scrape = [kept, redated, released]
+    cache_course_assignments('EECS16B', scrape, [f'{YEAR}-01-19'] * len(scrape))
+    add_refreshed_assignments(other_user, NEXT_DATE)
+    assert all_pending_assignments(other_user) == [kept, released, redated]
+    assert all_completed_assignments(other_user) == []
@@ -8,12 +8,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from services.functions import add_course_to_user, remove_course_from_user, list_user_courses
 from services.exceptions import CourseAlreadySelected
-from services.database import initialize_user_courses_db
+from services.database import initialize_user_courses_db, initialize_user_assignments_db
+from services.database import list_course_subscribers, get_user_state_version
 
 @pytest.fixture(scope='module', autouse=True)
 def clean_db():
     '''Enables use of a clean database.'''
     initialize_user_courses_db(reset=True)
+    initialize_user_assignments_db(reset=True)
 
 def test_add_course_to_user():
     '''Tests adding a course to a user.'''
@@ -39,3 +41,24 @@ def test_remove_course_from_user():
     remove_course_from_user('user1', 'EECS16B')
     assert list_user_courses('user1') == ['COMPSCI61B']
     assert list_user_courses('user2') == ['DATAC8', 'EECS16B']
+
+def test_readd_removed_course():
+    '''Tests that a course added again after being removed goes to the end of the list.'''
+    add_course_to_user('user1', 'EECS16B')
+    assert list_user_courses('user1') == ['COMPSCI61B', 'EECS16B']
+
+def test_list_course_subscribers():
+    '''Tests listing the users who have selected a course.'''
+    assert sorted(list_course_subscribers('EECS16B')) == ['user1', 'user2']
+    assert list_course_subscribers('DATAC8') == ['user2']
+    assert list_course_subscribers('COMPSCI170') == []
+
+def test_course_changes_bump_state_version():
+    '''Tests that changing a user's courses changes the user's state version.'''
+    version = get_user_state_version('user2')
+    remove_course_from_user('user2', 'DATAC8')
+    assert get_user_state_version('user2') > version
+    version = get_user_state_version('user2')
+    with pytest.raises(CourseAlreadySelected):
+        add_course_to_user('user2', 'EECS16B')
+    assert get_user_state_version('user2') == version
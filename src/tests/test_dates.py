@@ -0,0 +1,58 @@
+'''This module tests the precomputed and cached date conversions.'''
+
+from datetime import date
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.dates import convert_date_to_code, convert_date_string, format_date_code
+from services.dates import convert_date_strings, format_date_codes
+from services.dates import MONTH_DAY_TABLE, DATE_CODE_TABLE
+from services.dates import resolve_month_day, resolve_date_code
+from services.constants import YEAR
+
+@pytest.mark.parametrize('month, day, converted_date', [
+    ('Jan', '26', date(YEAR, 1, 26)),
+    ('JANUARY', '5th', date(YEAR, 1, 5)),
+    ('Mar', '21st', date(YEAR, 3, 21)),
+    ('Feb', '31', date(YEAR, 2, 3)),
+    ('Apr', '8,', date(YEAR, 4, 8)),
+    ('Foo', '1', None),
+    ('Jan', '', None),
+    ('Jan', '0', None)
+])
+def test_convert_date_to_code(month: str, day: str, converted_date: date):
+    '''Tests converting common and unusual month and day strings.'''
+    assert convert_date_to_code(month, day) == converted_date
+
+@pytest.mark.parametrize('date_code, converted_date', [
+    ('1/26', date(YEAR, 1, 26)),
+    ('01/05', date(YEAR, 1, 5)),
+    ('12/1', date(YEAR, 12, 1)),
+    ('1/26/2024', date(YEAR, 1, 26)),
+    ('126', None)
+])
+def test_format_date_code(date_code: str, converted_date: date):
+    '''Tests converting common and unusual date codes.'''
+    assert format_date_code(date_code) == converted_date
+
+def test_format_invalid_date_code():
+    '''Tests that invalid date codes still raise instead of being cached as missing dates.'''
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            format_date_code('13/1')
+
+def test_tables_match_conversion():
+    '''Tests that precomputed dates equal the dates converted without the tables.'''
+    for (month, day), converted_date in MONTH_DAY_TABLE.items():
+        assert resolve_month_day.__wrapped__(month, day) == converted_date
+    for date_code, converted_date in DATE_CODE_TABLE.items():
+        assert resolve_date_code.__wrapped__(date_code) == converted_date
+
+def test_batch_conversion():
+    '''Tests converting columns of dates in one call.'''
+    assert convert_date_strings(['Jan 26', 'Feb 02', 'Foo']) == [
+        convert_date_string('Jan 26'), date(YEAR, 2, 2), None]
+    assert format_date_codes(['1/26', '2/2']) == [date(YEAR, 1, 26), date(YEAR, 2, 2)]
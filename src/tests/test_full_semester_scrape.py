@@ -0,0 +1,35 @@
+'''This module tests selecting in scope assignments from scrapes of the whole semester.'''
+
+from datetime import date
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.assignment_data import SCRAPE_FUNCS, TEST_FILES, zip_assignments_info
+from services.constants import YEAR
+
+@pytest.mark.parametrize('course_code', ['EECS16B', 'COMPSCI61B', 'DATAC8'])
+@pytest.mark.parametrize('curr_date', [
+    date(YEAR, 1, 10),
+    date(YEAR, 1, 26),
+    date(YEAR, 2, 14),
+    date(YEAR, 3, 1),
+    date(YEAR, 4, 2),
+    date(YEAR, 5, 8)
+])
+def test_scope_dates(course_code: str, curr_date: date):
+    '''Tests that assignments of the whole semester in scope on a date are exactly the assignments
+    scraped for that date.'''
+    with open(TEST_FILES[course_code], 'r', encoding='utf-8') as file:
+        website_text = file.read()
+    semester_assignments_info = SCRAPE_FUNCS[course_code](website_text, None)
+    dated_assignments_info = SCRAPE_FUNCS[course_code](website_text, curr_date)
+    in_scope_assignments = [
+        assignment for assignment, scope_date in zip(
+            zip_assignments_info(semester_assignments_info),
+            semester_assignments_info.scope_dates)
+        if scope_date <= curr_date.isoformat()
+    ]
+    assert in_scope_assignments == zip_assignments_info(dated_assignments_info)
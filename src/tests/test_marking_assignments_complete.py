@@ -12,15 +12,17 @@ from services.functions import register_user, add_course_to_user, remove_course_
 from services.functions import add_new_course_assignments, remove_course_assignments
 from services.functions import mark_assignment_complete, mark_assignment_incomplete
 from services.assignment_data import all_pending_assignments, all_completed_assignments
+from services.assignments_info import assignment_id
+from services.exceptions import AssignmentNotFound
 from services.constants import YEAR
 
 USER_1 = 'test-user-1'
 USER_2 = 'test-user-2'
 TEST_DATE = date(YEAR, 1, 26)
-EECS_HW_1 = f'EECS16B||Homework 00||{YEAR}-01-20'
-EECS_LAB_1 = f'EECS16B||Lab 1: Introduction to S1XT33N||{YEAR}-01-27'
-CS_HW_1 = f'COMPSCI61B||Homework 0A||{YEAR}-01-19'
-CS_LAB_1 = f'COMPSCI61B||Lab 1: Setup||{YEAR}-01-19'
+EECS_HW_1 = assignment_id(('EECS16B', None, 'Homework 00', f'{YEAR}-01-20'))
+EECS_LAB_1 = assignment_id(('EECS16B', None, 'Lab 1: Introduction to S1XT33N', f'{YEAR}-01-27'))
+CS_HW_1 = assignment_id(('COMPSCI61B', None, 'Homework 0A', f'{YEAR}-01-19'))
+CS_LAB_1 = assignment_id(('COMPSCI61B', None, 'Lab 1: Setup', f'{YEAR}-01-19'))
 
 @pytest.fixture(scope='module', autouse=True)
 def clean_db():
@@ -89,3 +91,12 @@ def test_mark_assignments_incomplete():
     assert len(second_user_pending_assignments) == 7
     assert len(first_user_completed_assignments) == 0
     assert len(second_user_completed_assignments) == 0
+
+def test_mark_missing_assignment():
+    '''This function tests that marking an assignment the user does not have changes nothing.'''
+    with pytest.raises(AssignmentNotFound):
+        mark_assignment_complete(USER_2, CS_LAB_1)
+    with pytest.raises(AssignmentNotFound):
+        mark_assignment_incomplete(USER_2, EECS_LAB_1)
+    assert len(all_pending_assignments(USER_2)) == 7
+    assert len(all_completed_assignments(USER_2)) == 0
@@ -0,0 +1,124 @@
+'''This module tests caching rendered assignments pages and answering repeated views with 304.'''
+
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from helper_test_functions import app_test_client
+from services.database import add_pending_assignments, COURSE_CATALOG
+from services.db_connections import close_db_connections
+from services.database import update_shared_assignments
+from services.scrape_database import cache_course_assignments
+from services.functions import register_user, add_course_to_user
+from services.page_cache import RenderedPageCache, RowFragmentCache, ROW_FRAGMENTS
+from services.assignments_info import Assignment
+
+USER = 'user'
+OTHER_USER = 'other_user'
+HW_1 = Assignment('EECS16B', 'Homework', 'Homework 1', '2024-01-26', [['hw1', 'Homework 1']])
+HW_2 = Assignment('EECS16B', 'Homework', 'Homework 2', '2024-02-02', [['hw2', 'Homework 2']])
+
+@pytest.fixture(name='client')
+def fixture_client(tmp_path, monkeypatch):
+    '''Logs a user with one pending assignment into a test client of the app.'''
+    client = app_test_client(tmp_path, monkeypatch)
+    register_user(USER, 'password')
+    add_course_to_user(USER, 'EECS16B')
+    add_pending_assignments(USER, 'EECS16B', [HW_1])
+    with client.session_transaction() as session:
+        session['username'] = USER
+        session['assignments-view'] = 'pending'
+    yield client
+    close_db_connections()
+    COURSE_CATALOG.invalidate()
+
+def test_cache_keeps_pages_of_current_version():
+    '''Tests that cached pages are only returned for the state version they were rendered from.'''
+    pages = RenderedPageCache(max_entries=2)
+    etag = pages.put(('user', 'pending', None), 1, '<html>1</html>')
+    assert pages.get(('user', 'pending', None), 1) == (etag, '<html>1</html>')
+    assert pages.get(('user', 'pending', None), 2) is None
+    assert pages.put(('user', 'pending', None), 2, '<html>1</html>') == etag
+
+def test_cache_evicts_least_recently_used():
+    '''Tests that the least recently used page is evicted once the cache is full.'''
+    pages = RenderedPageCache(max_entries=2)
+    pages.put(('user1', 'pending', None), 1, 'user1')
+    pages.put(('user2', 'pending', None), 1, 'user2')
+    pages.get(('user1', 'pending', None), 1)
+    pages.put(('user3', 'pending', None), 1, 'user3')
+    assert pages.get(('user2', 'pending', None), 1) is None
+    assert pages.get(('user1', 'pending', None), 1) is not None
+
+def test_repeated_view_not_modified(client):
+    '''Tests that viewing an unchanged page again with its ETag is answered with 304.'''
+    response = client.get('/assignments')
+    assert response.status_code == 200
+    assert b'Homework 1' in response.data
+    etag = response.headers['ETag']
+    repeated_response = client.get('/assignments', headers={'If-None-Match': etag})
+    assert repeated_response.status_code == 304
+    assert repeated_response.headers['ETag'] == etag
+
+def test_repeated_view_skips_refreshed_assignments(client, monkeypatch):
+    '''Tests that refreshed assignments are only added again once the cached scrape of one of the
+    user's courses changes, so repeated views do not decode cached scrapes.'''
+    cache_course_assignments('EECS16B', [HW_1], ['2024-01-19'], 'hash-1')
+    etag = client.get('/assignments').headers['ETag']
+    api_etag = client.get('/api/assignments').headers['ETag']
+    added_users = []
+    monkeypatch.setattr('app.add_refreshed_assignments',
+                        lambda username, curr_date: added_users.append(username))
+    assert client.get('/assignments', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/assignments', headers={'If-None-Match': api_etag}).status_code == 304
+    assert not added_users
+    cache_course_assignments('EECS16B', [HW_1, HW_2], ['2024-01-19', '2024-01-26'], 'hash-2')
+    client.get('/assignments')
+    assert added_users == [USER]
+
+def test_changed_state_renders_page_again(client):
+    '''Tests that a page is rendered again with a new ETag once the user's state changes.'''
+    etag = client.get('/assignments').headers['ETag']
+    response = client.post('/assignments', data={'marked-assignment': HW_1.id})
+    assert response.status_code == 200
+    assert b'Homework 1' not in response.data
+    assert response.headers['ETag'] != etag
+    assert client.get('/assignments', headers={'If-None-Match': etag}).status_code == 200
+
+def test_changed_course_renders_page_again(client):
+    '''Tests that a page is rendered again once the stored assignments of the user's courses
+    change, but not when other courses change.'''
+    etag = client.get('/assignments').headers['ETag']
+    add_pending_assignments(OTHER_USER, 'DATAC8', [Assignment('DATAC8', 'Lab', 'Lab 0', '', [])])
+    assert client.get('/assignments', headers={'If-None-Match': etag}).status_code == 304
+    update_shared_assignments([HW_1._replace(links_info=[['hw1-v2', 'Homework 1']])])
+    response = client.get('/assignments', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert b'hw1-v2' in response.data
+
+def test_rows_rendered_once_per_scrape_version():
+    '''Tests that a row is rendered once per scrape version of its course.'''
+    rendered_assignments = []
+    def render(assignment: Assignment) -> str:
+        rendered_assignments.append(assignment)
+        return f'<th>{assignment.links_info[0][0]}</th>'
+    fragments = RowFragmentCache(max_entries=2)
+    assert fragments.fragment(1, HW_1, render) == '<th>hw1</th>'
+    assert fragments.fragment(1, HW_1, render) == '<th>hw1</th>'
+    updated_hw_1 = HW_1._replace(links_info=[['hw1-v2', 'Homework 1']])
+    assert fragments.fragment(2, updated_hw_1, render) == '<th>hw1-v2</th>'
+    assert rendered_assignments == [HW_1, updated_hw_1]
+
+def test_rows_shared_between_users(client):
+    '''Tests that users of the same course are shown the same rendered row.'''
+    register_user(OTHER_USER, 'password')
+    add_course_to_user(OTHER_USER, 'EECS16B')
+    add_pending_assignments(OTHER_USER, 'EECS16B', [HW_1])
+    client.get('/assignments')
+    with client.session_transaction() as session:
+        session['username'] = OTHER_USER
+    response = client.get('/assignments')
+    assert b'Homework 1' in response.data
+    assert [list(fragments) for fragments in ROW_FRAGMENTS.courses.values()] == [[HW_1.id]]
@@ -0,0 +1,80 @@
+'''This module tests the scrape cache shared between users.'''
+
+from datetime import date
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import scrape_database
+from services.db_connections import get_db_connection
+from services.scrape_database import initialize_scrape_cache_db
+from services.scrape_database import get_cached_course_assignments, cache_course_assignments
+from services.constants import YEAR
+
+TEST_DATE = date(YEAR, 1, 26)
+ASSIGNMENTS = [
+    ('EECS16B', 'Homework', 'Homework 00', f'{YEAR}-01-20', [('https://eecs16b.org/hw0', 'HW')]),
+    ('EECS16B', 'Exam', 'Midterm 1', f'{YEAR}-02-15', [(None, None)])
+]
+SCOPE_DATES = [f'{YEAR}-01-13', f'{YEAR}-02-08']
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    '''Enables use of a clean database.'''
+    initialize_scrape_cache_db(reset=True)
+
+def test_cache_miss():
+    '''Tests that courses which have not been scraped are not served from the cache.'''
+    assert get_cached_course_assignments('EECS16B', TEST_DATE) is None
+
+def test_cache_hit():
+    '''Tests that cached scrapes are served for the same course only.'''
+    cache_course_assignments('EECS16B', ASSIGNMENTS, SCOPE_DATES)
+    cached_assignments = get_cached_course_assignments('EECS16B', None)
+    assert [assignment[:4] for assignment in cached_assignments] == \
+        [assignment[:4] for assignment in ASSIGNMENTS]
+    assert get_cached_course_assignments('DATAC8', TEST_DATE) is None
+
+@pytest.mark.parametrize('curr_date, num_assignments', [
+    (date(YEAR, 1, 12), 0),
+    (date(YEAR, 1, 13), 1),
+    (TEST_DATE, 1),
+    (date(YEAR, 2, 8), 2)
+])
+def test_cache_scope(curr_date: date, num_assignments: int):
+    '''Tests that only assignments in scope on the given date are served.'''
+    cache_course_assignments('EECS16B', ASSIGNMENTS, SCOPE_DATES)
+    assert len(get_cached_course_assignments('EECS16B', curr_date)) == num_assignments
+
+def test_cache_expiry():
+    '''Tests that scrapes older than the ttl are not served.'''
+    cache_course_assignments('EECS16B', ASSIGNMENTS, SCOPE_DATES)
+    assert get_cached_course_assignments('EECS16B', TEST_DATE, ttl=-1) is None
+
+def test_cache_eviction():
+    '''Tests that least recently used scrapes are evicted once the cache is full.'''
+    cache_course_assignments('EECS16B', ASSIGNMENTS, SCOPE_DATES, max_entries=2)
+    cache_course_assignments('DATAC8', [], [], max_entries=2)
+    get_cached_course_assignments('EECS16B', TEST_DATE)
+    cache_course_assignments('COMPSCI61B', [], [], max_entries=2)
+    assert get_cached_course_assignments('EECS16B', TEST_DATE) is not None
+    assert get_cached_course_assignments('DATAC8', TEST_DATE) is None
+    assert get_cached_course_assignments('COMPSCI61B', TEST_DATE) == []
+
+def test_cache_revalidation():
+    '''Tests that expired scrapes are served only for an unchanged course page.'''
+    cache_course_assignments('EECS16B', ASSIGNMENTS, SCOPE_DATES, 'page-hash')
+    assert get_cached_course_assignments('EECS16B', TEST_DATE, content_hash='other-hash') is None
+    assert get_cached_course_assignments('EECS16B', TEST_DATE, content_hash='page-hash') is not None
+
+def test_lookup_without_touch():
+    '''Tests that a lookup which does not mark the scrape as used does not write.'''
+    cache_course_assignments('EECS16B', ASSIGNMENTS, SCOPE_DATES)
+    con = get_db_connection(scrape_database.SCRAPE_CACHE_DB)
+    changes_before = con.total_changes
+    assert len(get_cached_course_assignments('EECS16B', TEST_DATE, touch=False)) == 1
+    assert con.total_changes == changes_before
+    get_cached_course_assignments('EECS16B', TEST_DATE)
+    assert con.total_changes == changes_before + 1
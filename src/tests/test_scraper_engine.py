@@ -0,0 +1,141 @@
+'''This module tests declaring course scrapers with the scraping engine.'''
+
+from datetime import date
+import sys
+import os
+import pytest
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.scrapers.engine import CourseScraper, Field, Rule, SCRAPERS
+from services.scrapers.engine import match_fields, parse_schedule, scrape_course
+from services.scrapers.engine import scrape_course_stream, split_rows, RowSplitter
+from services.assignment_data import TEST_FILES
+from services.dates import format_date_code
+from services.constants import YEAR
+
+WEBSITE_TEXT = '''
+<table>
+    <tr><td class="date">1/15</td><td class="hw"><a href="hw1">Homework 1</a> due 1/19</td></tr>
+    <tr><td class="date">1/22</td><td class="hw"><a href="hw2">Homework 2</a> due 1/26</td>
+        <td><b>Midterm</b></td></tr>
+    <tr><td class="date">1/29</td><td class="hw"><a href="hw3">Homework 3</a> due 2/2</td></tr>
+</table>
+'''
+
+def row_dates(matched_tags: dict) -> dict:
+    '''Returns the date assignments of a row are assigned.'''
+    if matched_tags['date'] is None:
+        return None
+    assigned_date = format_date_code(matched_tags['date'].text)
+    return {'assigned_date': assigned_date, 'row_scope_date': assigned_date}
+
+TEST_SCRAPER = CourseScraper(
+    course_code='TEST101',
+    row_name='tr',
+    row_attrs={},
+    fields=[
+        Field('date', 'td', lambda tag: tag.get('class') == ['date']),
+        Field('homework', 'td', lambda tag: tag.get('class') == ['hw']),
+        Field('bold', 'b', first=False)
+    ],
+    row_context=row_dates,
+    rules=[
+        Rule('homework', 'assigned_date', lambda homework_td, row_context: [(
+            'Homework',
+            homework_td.a.text,
+            format_date_code(homework_td.text.split()[-1]).isoformat(),
+            [(homework_td.a['href'], homework_td.a.text)])]),
+        Rule('bold', 'assigned_date', lambda bold_tags, row_context: [
+            ('Exam', bold_tag.text, row_context['assigned_date'].isoformat(), [(None, None)])
+            for bold_tag in bold_tags])
+    ]
+)
+
+def test_match_fields():
+    '''Tests that fields match the first or all matching tags of a row.'''
+    row = BeautifulSoup(WEBSITE_TEXT, 'html.parser').find_all('tr')[1]
+    matched_tags = match_fields(row, TEST_SCRAPER.fields)
+    assert matched_tags['date'].text == '1/22'
+    assert matched_tags['homework'].a.text == 'Homework 2'
+    assert [bold_tag.text for bold_tag in matched_tags['bold']] == ['Midterm']
+    row = BeautifulSoup(WEBSITE_TEXT, 'html.parser').find_all('tr')[0]
+    assert match_fields(row, TEST_SCRAPER.fields)['bold'] is None
+
+def test_scrape_declared_course():
+    '''Tests scraping a course declared only through fields and rules.'''
+    assignments_info = scrape_course(TEST_SCRAPER, WEBSITE_TEXT, None)
+    assert assignments_info.assignment_names == ['Homework 1', 'Homework 2', 'Midterm', 'Homework 3']
+    assert assignments_info.assignment_courses == ['TEST101'] * 4
+    assert assignments_info.due_dates[1] == f'{YEAR}-01-26'
+    assert assignments_info.scope_dates[2] == f'{YEAR}-01-22'
+
+def test_scrape_declared_course_in_scope():
+    '''Tests that rows of a declared course past the current date are not scraped.'''
+    assignments_info = scrape_course(TEST_SCRAPER, WEBSITE_TEXT, date(YEAR, 1, 22))
+    assert assignments_info.assignment_names == ['Homework 1', 'Homework 2', 'Midterm']
+
+@pytest.mark.parametrize('course_code', ['EECS16B', 'COMPSCI61B', 'DATAC8'])
+@pytest.mark.parametrize('parser', [
+    parser for parser in ['lxml', 'html5lib'] if builder_registry.lookup(parser)
+])
+def test_parser_backends(course_code: str, parser: str):
+    '''Tests that every installed parser scrapes exactly what a full html.parser parse scrapes.'''
+    with open(TEST_FILES[course_code], 'r', encoding='utf-8') as file:
+        website_text = file.read()
+    scraper = SCRAPERS[course_code]
+    full_parse = BeautifulSoup(website_text, 'html.parser')
+    rows = full_parse.find_all(scraper.row_name, attrs=scraper.row_attrs)
+    assert len(parse_schedule(scraper, website_text, parser).find_all(
+        scraper.row_name, attrs=scraper.row_attrs)) == len(rows)
+    assert scrape_course(scraper, website_text, None, parser) == \
+        scrape_course(scraper, website_text, None, 'html.parser')
+
+def website_chunks(website_text: str, chunk_size: int, read_chunks: list):
+    '''Yields website_text in chunks of chunk_size characters, recording every chunk read.'''
+    for start in range(0, len(website_text), chunk_size):
+        read_chunks.append(start)
+        yield website_text[start:start + chunk_size]
+
+@pytest.mark.parametrize('course_code', ['EECS16B', 'COMPSCI61B', 'DATAC8'])
+@pytest.mark.parametrize('curr_date', [
+    date(YEAR, 1, 21), date(YEAR, 3, 1), date(YEAR, 4, 15), None
+])
+def test_scrape_course_stream(course_code: str, curr_date: date):
+    '''Tests that scraping a course website read in chunks scrapes exactly what scraping the
+    whole course website scrapes.'''
+    with open(TEST_FILES[course_code], 'r', encoding='utf-8') as file:
+        website_text = file.read()
+    scraper = SCRAPERS[course_code]
+    assert scrape_course_stream(scraper, website_chunks(website_text, 1000, []), curr_date) == \
+        scrape_course(scraper, website_text, curr_date)
+
+@pytest.mark.parametrize('course_code', ['EECS16B', 'COMPSCI61B', 'DATAC8'])
+def test_scrape_course_stream_stops_early(course_code: str):
+    '''Tests that a streamed course website is not read past the current date.'''
+    with open(TEST_FILES[course_code], 'r', encoding='utf-8') as file:
+        website_text = file.read()
+    read_chunks = []
+    chunks = website_chunks(website_text, 1000, read_chunks)
+    scrape_course_stream(SCRAPERS[course_code], chunks, date(YEAR, 1, 21))
+    assert len(read_chunks) < len(range(0, len(website_text), 1000))
+
+@pytest.mark.parametrize('course_code', ['EECS16B', 'COMPSCI61B', 'DATAC8'])
+def test_row_splitter_drops_read_text(course_code: str):
+    '''Tests that splitting rows of a course website read in small chunks only keeps the html
+    text of about one row instead of the whole course website.'''
+    with open(TEST_FILES[course_code], 'r', encoding='utf-8') as file:
+        website_text = file.read()
+    row_splitter = RowSplitter(SCRAPERS[course_code])
+    rows = []
+    kept_text = 0
+    for chunk in website_chunks(website_text, 7, []):
+        row_splitter.feed(chunk)
+        rows.extend(row_splitter.pop_rows())
+        kept_text = max(kept_text, len(row_splitter.text))
+    row_splitter.close()
+    rows.extend(row_splitter.pop_rows())
+    assert rows == list(split_rows(SCRAPERS[course_code], [website_text]))
+    assert kept_text < 2 * max(len(row) for row in rows)